@@ -52,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'survey.metrics.RequestMetricsMiddleware',  # first, so timings include the other middleware
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -86,8 +87,20 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # Wizard sessions, in their own WAL-mode file (survey/routers.py):
+    # python manage.py migrate --database=sessions
+    'sessions': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': get_env_variable('SESSION_DB_PATH', str(BASE_DIR / 'sessions.sqlite3')),
+        'OPTIONS': {
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 10,
+        },
+    },
 }
+DATABASE_ROUTERS = ['survey.routers.SessionRouter']
 
 # Internationalization
 LANGUAGE_CODE = 'en-us'
@@ -99,16 +112,85 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+STATICFILES_FINDERS = [
+    'django.contrib.staticfiles.finders.FileSystemFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+    'survey.staticfiles.PlotlyJsFinder',  # plotly.min.js from the plotly package
+]
 
-# Session settings
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Session settings: write-through cache in front of the sessions database, with
+# wizard answers stored in the compact coded format (survey/session_store.py).
+# The cache must be shared by every worker process (a stale per-process copy would
+# serve old wizard answers), so the default is file based; use LocMemCache only
+# with a single worker.
+SESSION_ENGINE = 'survey.session_store'
+SESSION_SERIALIZER = 'survey.session_codec.CompactSessionSerializer'
+SESSION_CACHE_ALIAS = 'sessions'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sessions': {
+        'BACKEND': get_env_variable('SESSION_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': get_env_variable('SESSION_CACHE_LOCATION', str(BASE_DIR / 'cache' / 'sessions')),
+        'OPTIONS': {'MAX_ENTRIES': int(get_env_variable('SESSION_CACHE_MAX_ENTRIES', '5000'))},
+    },
+}
 SESSION_COOKIE_AGE = 86400
 SESSION_COOKIE_SECURE = not DEBUG
 SESSION_EXPIRE_AT_BROWSER_CLOSE = not DEBUG
 
+# Autosave deltas (survey/autosave.py): session saves inside the window are
+# written to the sessions database once (the cache is updated immediately)
+AUTOSAVE = {
+    'COALESCE_SECONDS': float(get_env_variable('AUTOSAVE_COALESCE_SECONDS', '2')),
+    'MAX_OPS': int(get_env_variable('AUTOSAVE_MAX_OPS', '100')),
+}
+
 # CSRF settings
 CSRF_COOKIE_SECURE = not DEBUG
 
+# Analytics cache (survey/analytics_cache.py)
+ANALYTICS_CACHE = {
+    'MAX_ENTRIES': int(get_env_variable('ANALYTICS_CACHE_MAX_ENTRIES', '64')),
+    'VERSION_TTL': float(get_env_variable('ANALYTICS_CACHE_VERSION_TTL', '2')),
+    'STALE_WHILE_REVALIDATE': get_env_variable('ANALYTICS_CACHE_SWR', 'True').lower() == 'true',
+}
+
+# Server-Sent Events feed for the analytics dashboard (survey/live_updates.py). Off by default:
+# under a synchronous WSGI server each open stream holds a worker for STREAM_MAX_SECONDS, so
+# only enable it where streams do not compete with the survey for workers (ASGI, threaded
+# workers). When off, the dashboard polls api_dashboard_stats, which answers 304 while unchanged.
+DASHBOARD_LIVE_UPDATES = {
+    'ENABLED': get_env_variable('DASHBOARD_LIVE_UPDATES_ENABLED', 'False').lower() == 'true',
+    'KEEPALIVE_SECONDS': float(get_env_variable('DASHBOARD_LIVE_KEEPALIVE_SECONDS', '15')),
+    'STREAM_MAX_SECONDS': float(get_env_variable('DASHBOARD_LIVE_STREAM_MAX_SECONDS', '300')),
+    'RETRY_MS': int(get_env_variable('DASHBOARD_LIVE_RETRY_MS', '3000')),
+}
+
+# Per-view latency / SQL query histograms (survey/metrics.py, /admin/metrics/)
+REQUEST_METRICS = {
+    'ENABLED': get_env_variable('REQUEST_METRICS_ENABLED', 'True').lower() == 'true',
+    'SAMPLE_SIZE': int(get_env_variable('REQUEST_METRICS_SAMPLE_SIZE', '1024')),
+}
+
+# Dashboard analytics method timings (survey/profiling.py); ?profile=1 works either way
+ANALYTICS_PROFILING = {
+    'ENABLED': get_env_variable('ANALYTICS_PROFILING_ENABLED', 'False').lower() == 'true',
+    'BUFFER_SIZE': int(get_env_variable('ANALYTICS_PROFILING_BUFFER_SIZE', '200')),
+    'DUMP_DIR': get_env_variable('ANALYTICS_PROFILING_DUMP_DIR', str(LOG_DIR / 'profiles')),
+}
+
+# Background export jobs (survey/exports.py, process_export_jobs command)
+EXPORT_JOB_DIR = get_env_variable('EXPORT_JOB_DIR', str(BASE_DIR / 'exports'))
+EXPORT_JOB_RETENTION_HOURS = int(get_env_variable('EXPORT_JOB_RETENTION_HOURS', '24'))
+# Running jobs older than this are failed by the worker (their worker died mid-export)
+EXPORT_JOB_TIMEOUT_MINUTES = int(get_env_variable('EXPORT_JOB_TIMEOUT_MINUTES', '60'))
+
+# Analytics engine (survey/analytics_engines.py): 'pandas' (in-memory) or 'sql' (push-down);
+# deployments opt in to the SQL engine with ANALYTICS_ENGINE=sql
+ANALYTICS_ENGINE = get_env_variable('ANALYTICS_ENGINE', 'pandas')
+
 # Security settings
 SECURE_SSL_REDIRECT = not DEBUG
 SECURE_HSTS_SECONDS = 31536000 if not DEBUG else 0
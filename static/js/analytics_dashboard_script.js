@@ -33,6 +33,10 @@ class Dashboard {
         this.isTouchDevice = 'ontouchstart' in window || navigator.maxTouchPoints > 0;
         this.updateCount = 0;
         this.lastUpdateTime = null;
+        this.statsEtag = null;
+        this.eventSource = null;
+        this.pollTimer = null;
+        this.liveFeedStarted = false;
         this.config = window.DASHBOARD_CONFIG;
         this.updateInterval = this.config.updateInterval || 30000;
         this.positiveKeywords = ['great', 'excellent', 'good', 'awesome', 'positive', 'satisfied'];
@@ -50,14 +54,75 @@ class Dashboard {
             this.setupEventListeners();
             this.checkNetworkStatus();
             this.analyzeSentiment();
+            this.renderCharts();
             this.update();
-            this.updateInterval = setInterval(() => this.update(), this.updateInterval);
+            this.connectLiveFeed();
         } catch (error) {
             console.error('Dashboard initialization failed:', error);
             this.handleFatalError('Failed to initialize dashboard');
         }
     }
 
+    connectLiveFeed() {
+        // With live updates enabled, Server-Sent Events push a delta whenever a response is submitted;
+        // otherwise (no events URL) the dashboard polls the stats endpoint, which answers 304 while unchanged
+        if (!window.EventSource || !this.config.apiEventsUrl) {
+            this.startPolling();
+            return;
+        }
+        this.eventSource = new EventSource(this.config.apiEventsUrl);
+        this.eventSource.addEventListener('stats', (event) => {
+            try {
+                this.applyLiveDelta(JSON.parse(event.data));
+            } catch (error) {
+                console.error('Invalid live update:', error);
+            }
+        });
+        this.eventSource.onerror = () => {
+            // EventSource retries on its own; fall back to polling only once it gives up
+            if (this.eventSource.readyState === EventSource.CLOSED) {
+                this.eventSource = null;
+                this.startPolling();
+            }
+        };
+    }
+
+    startPolling() {
+        if (!this.pollTimer) {
+            this.pollTimer = setInterval(() => this.update(), this.updateInterval);
+        }
+    }
+
+    applyLiveDelta(delta) {
+        const isFirstEvent = !this.liveFeedStarted;
+        this.liveFeedStarted = true;
+        this.updateUI({
+            summary: { total_responses: delta.total_responses },
+            quota_status: delta.quota_status || {}
+        });
+        if (!isFirstEvent && delta.new_responses > 0) {
+            const noun = delta.new_responses === 1 ? 'response' : 'responses';
+            this.announceUpdate(`${delta.new_responses} new ${noun} received`);
+        }
+    }
+
+    renderCharts() {
+        if (typeof Plotly === 'undefined') {
+            console.warn('Plotly is not loaded; charts will not be rendered.');
+            return;
+        }
+        document.querySelectorAll('.plotly-chart[data-figure-id]').forEach(element => {
+            const source = document.getElementById(element.dataset.figureId);
+            if (!source) return;
+            try {
+                const figure = JSON.parse(source.textContent);
+                Plotly.newPlot(element, figure.data || [], figure.layout || {}, { responsive: true });
+            } catch (error) {
+                console.error(`Failed to render chart ${element.id}:`, error);
+            }
+        });
+    }
+
     setupEventListeners() {
         window.addEventListener('online', () => this.checkNetworkStatus());
         window.addEventListener('offline', () => this.checkNetworkStatus());
@@ -88,6 +153,70 @@ class Dashboard {
         if (this.refreshBtn) {
             this.refreshBtn.addEventListener('click', () => this.update());
         }
+
+        if (this.config.exportJobUrl) {
+            document.querySelectorAll('.export-job-form').forEach(form => {
+                form.addEventListener('submit', (e) => {
+                    e.preventDefault();
+                    this.startExportJob(form);
+                });
+            });
+        }
+    }
+
+    async startExportJob(form) {
+        const button = form.querySelector('button');
+        const body = new URLSearchParams({ type: form.dataset.exportType || 'excel' });
+        if (button) button.disabled = true;
+        this.setExportStatus('Queuing export...');
+
+        try {
+            const response = await fetch(this.config.exportJobUrl, {
+                method: 'POST',
+                headers: { 'X-CSRFToken': this.csrfToken },
+                body: body,
+                signal: AbortSignal.timeout(this.config.timeout || 10000)
+            });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+            }
+            const job = await response.json();
+            await this.pollExportJob(job.status_url);
+        } catch (error) {
+            console.error('Export job failed:', error);
+            this.setExportStatus(`Export failed: ${error.message}`);
+        } finally {
+            if (button) button.disabled = false;
+        }
+    }
+
+    async pollExportJob(statusUrl) {
+        const interval = this.config.exportPollInterval || 2000;
+        while (true) {
+            const response = await fetch(statusUrl, { signal: AbortSignal.timeout(this.config.timeout || 10000) });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+            }
+            const job = await response.json();
+            if (job.status === 'failed') {
+                throw new Error(job.error || 'export worker reported an error');
+            }
+            if (job.download_url) {
+                this.setExportStatus('Export ready, downloading...');
+                this.announceUpdate('Export ready');
+                window.location.href = job.download_url;
+                return;
+            }
+            this.setExportStatus(job.status === 'pending'
+                ? 'Export queued, waiting for the export worker...'
+                : `Exporting... ${job.progress}% (${job.rows_done}/${job.rows_total} responses)`);
+            await new Promise(resolve => setTimeout(resolve, interval));
+        }
+    }
+
+    setExportStatus(message) {
+        const status = document.getElementById('export-job-status');
+        if (status) status.textContent = message;
     }
 
     toggleReadMore(button) {
@@ -314,21 +443,24 @@ class Dashboard {
         this.setLoadingState(true);
 
         try {
+            // Conditional GET: the server answers 304 while no new responses have arrived
+            const headers = this.statsEtag ? { 'If-None-Match': this.statsEtag } : {};
             const response = await fetch(this.config.apiStatsUrl, {
-                method: 'POST',
-                headers: {
-                    'X-CSRFToken': this.csrfToken,
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({ action: 'update_dashboard' }),
+                method: 'GET',
+                headers,
+                cache: 'no-store',
                 signal: AbortSignal.timeout(this.config.timeout || 10000)
             });
 
+            if (response.status === 304) {
+                return;
+            }
             if (!response.ok) {
                 throw new Error(`HTTP ${response.status}: ${response.statusText}`);
             }
 
             const data = await response.json();
+            this.statsEtag = response.headers.get('ETag');
             this.validateData(data);
             this.updateUI(data);
             this.announceUpdate('Dashboard updated successfully');
@@ -11,9 +11,16 @@ document.addEventListener('DOMContentLoaded', function () {
         saveUrl: form.dataset.saveUrl || '/final-remarks/',
         confirmationUrl: form.dataset.confirmationUrl || '/confirmation/',
         backUrl: form.dataset.backUrl || '/cross-system-perspectives/',
+        autosaveUrl: form.dataset.autosaveUrl || '',
         csrfSelector: '[name=csrfmiddlewaretoken]'
     };
 
+    /* Autosave state: last version the server accepted and the values it holds */
+    const autosaveState = {
+        version: parseInt(form.dataset.autosaveVersion, 10) || 0,
+        saved: {}
+    };
+
     console.log('Final Remarks Config:', config);
 
     /* Debounce with cancel support */
@@ -132,6 +139,7 @@ document.addEventListener('DOMContentLoaded', function () {
             if (data.status === 'success') {
                 console.log('Draft saved successfully');
                 hideSaveIndicator(saveIndicator, true);
+                autosaveState.saved = { final_remarks: finalRemarks, survey_feedback: surveyFeedback };
                 
                 // Clean up backup on successful save
                 try {
@@ -158,6 +166,78 @@ document.addEventListener('DOMContentLoaded', function () {
         }
     }
 
+    /* Current values of the autosaved fields, keyed by session key */
+    function currentDraftValues() {
+        const values = {};
+        ['final_remarks', 'survey_feedback'].forEach(name => {
+            const el = document.getElementById(name);
+            if (el) values[name] = el.value.trim();
+        });
+        return values;
+    }
+
+    /* Autosave only the fields that changed since the last accepted save.
+       Each request carries the next version; the server rejects versions it
+       has already passed (409) and coalesces bursts into one session write. */
+    async function autosaveDraft(rebased = false) {
+        if (!config.autosaveUrl) return saveDraft();
+
+        const values = currentDraftValues();
+        const ops = Object.keys(values)
+            .filter(name => autosaveState.saved[name] !== values[name])
+            .map(name => ({ op: 'replace', path: '/' + name, value: values[name] }));
+        if (ops.length === 0) return true;
+
+        try {
+            localStorage.setItem('final_remarks_backup', values.final_remarks || '');
+            localStorage.setItem('survey_feedback_backup', values.survey_feedback || '');
+        } catch (e) {
+            console.warn('Cannot access localStorage:', e);
+        }
+
+        const csrf = getCsrfToken();
+        if (!csrf) {
+            console.error('CSRF token not found');
+            return false;
+        }
+
+        const version = autosaveState.version + 1;
+        try {
+            const response = await fetch(config.autosaveUrl, {
+                method: 'POST',
+                body: JSON.stringify({ version: version, ops: ops }),
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': csrf,
+                    'X-Requested-With': 'XMLHttpRequest'
+                }
+            });
+            const data = await response.json();
+
+            if (response.status === 409) {
+                // Another tab or a reordered request got there first: adopt its version and resend everything once
+                autosaveState.version = Math.max(autosaveState.version, data.version || 0);
+                autosaveState.saved = {};
+                if (!rebased) return autosaveDraft(true);
+                throw new Error(data.message || 'Autosave conflict');
+            }
+            if (!response.ok || data.status !== 'success') {
+                throw new Error(data.message || `HTTP error! status: ${response.status}`);
+            }
+
+            autosaveState.version = Math.max(autosaveState.version, data.version);
+            ops.forEach(op => { autosaveState.saved[op.path.slice(1)] = op.value; });
+            try {
+                localStorage.removeItem('final_remarks_backup');
+                localStorage.removeItem('survey_feedback_backup');
+            } catch (e) {}
+            return true;
+        } catch (error) {
+            console.error('Autosave error:', error);
+            return false;
+        }
+    }
+
     /* Back navigation handler */
     async function handleBackNavigation() {
         console.log('Back navigation triggered');
@@ -354,6 +434,7 @@ document.addEventListener('DOMContentLoaded', function () {
     }
 
     // Initialize everything
+    autosaveState.saved = currentDraftValues();
     syncLocalStorageToSession();
 
     // Modal click outside to close
@@ -374,7 +455,7 @@ document.addEventListener('DOMContentLoaded', function () {
 
     if (fieldsToWatch.length > 0) {
         const debouncedSave = debounce(() => {
-            saveDraft().catch(error => {
+            autosaveDraft().catch(error => {
                 console.error('Auto-save failed:', error);
             });
         }, 2000);
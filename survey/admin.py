@@ -6,16 +6,18 @@ from django.http import HttpResponseRedirect
 from django.contrib import messages
 from django.db.models import Q
 import json
-from .models import SurveyResponse
+from .codebook import decode_responses
+from .models import ExportJob, SurveyResponse
+from .questionnaire import SECTION_FIELDS
 
 @admin.register(SurveyResponse)
 class SurveyResponseAdmin(admin.ModelAdmin):
     list_display = [
-        'full_name', 'professional_role', 'province', 'submission_date', 
+        'full_name', 'professional_role_display', 'province_display', 'submission_date', 
         'reference_number', 'completion_percentage', 'survey_completion_status'
     ]
     list_filter = [
-        'professional_role', 'province', 'submission_date', 'kii_consent',
+        'is_legal', 'is_customs', 'province', 'submission_date', 'kii_consent',
         #'completion_status'
     ]
     search_fields = ['full_name', 'email', 'reference_number', 'mobile', 'district']
@@ -31,6 +33,9 @@ class SurveyResponseAdmin(admin.ModelAdmin):
     list_max_show_all = 200
     show_full_result_count = True
 
+    # Coded fields shown in the changelist, decoded once per page in get_changelist_instance
+    list_decoded_fields = ['professional_role', 'province']
+
     fieldsets = (
         ('Respondent Information', {
             'fields': (
@@ -87,7 +92,7 @@ class SurveyResponseAdmin(admin.ModelAdmin):
     def get_list_display(self, request):
         """Dynamic list display based on user permissions."""
         base_display = [
-            'full_name', 'professional_role', 'province', 'submission_date', 
+            'full_name', 'professional_role_display', 'province_display', 'submission_date', 
             'reference_number'
         ]
         
@@ -98,6 +103,29 @@ class SurveyResponseAdmin(admin.ModelAdmin):
             
         return base_display
 
+    def get_changelist_instance(self, request):
+        """Decode the coded list columns of the current page in one pass."""
+        changelist = super().get_changelist_instance(request)
+        decode_responses(changelist.result_list, self.list_decoded_fields)
+        return changelist
+
+    def _decoded_label(self, obj, field):
+        """Label decoded for the changelist page, decoding this object alone if it was not."""
+        decoded = getattr(obj, 'decoded_labels', None) or {}
+        if field not in decoded:
+            decode_responses([obj], [field])
+        return obj.decoded_labels[field] or '-'
+
+    def professional_role_display(self, obj):
+        return self._decoded_label(obj, 'professional_role')
+    professional_role_display.short_description = 'Professional Role'
+    professional_role_display.admin_order_field = 'professional_role'
+
+    def province_display(self, obj):
+        return self._decoded_label(obj, 'province')
+    province_display.short_description = 'Province'
+    province_display.admin_order_field = 'province'
+
     def completion_percentage(self, obj):
         """Display completion percentage with progress bar in list view."""
         percentage = self._calculate_completion_percentage(obj)
@@ -120,7 +148,7 @@ class SurveyResponseAdmin(admin.ModelAdmin):
         completed_weight = 0
         
         # Generic questions (weight: 30%)
-        generic_fields = ['g1_policy_impact', 'g2_system_impact', 'g3_technical_issues', 'g5_digital_literacy']
+        generic_fields = SECTION_FIELDS['generic']
         generic_weight = 30 / len(generic_fields)
         for field in generic_fields:
             total_weight += generic_weight
@@ -129,16 +157,16 @@ class SurveyResponseAdmin(admin.ModelAdmin):
 
         # Role-specific questions (weight: 50%)
         role_weight = 50
-        if obj.professional_role in ['legal', 'both']:
-            legal_fields = ['lp1_digital_support', 'lp2_challenges', 'lp3_challenges', 'lp4_challenges', 'lp5_tax_types']
+        if obj.is_legal:
+            legal_fields = SECTION_FIELDS['legal']
             legal_field_weight = role_weight / len(legal_fields)
             for field in legal_fields:
                 total_weight += legal_field_weight
                 if getattr(obj, field):
                     completed_weight += legal_field_weight
                     
-        if obj.professional_role in ['customs', 'both']:
-            customs_fields = ['ca1_training', 'ca2_system_integration', 'ca3_challenges', 'ca4_effectiveness', 'ca5_policy_impact', 'ca6_biggest_challenge']
+        if obj.is_customs:
+            customs_fields = SECTION_FIELDS['customs']
             customs_field_weight = role_weight / len(customs_fields)
             for field in customs_fields:
                 total_weight += customs_field_weight
@@ -146,7 +174,7 @@ class SurveyResponseAdmin(admin.ModelAdmin):
                     completed_weight += customs_field_weight
 
         # Cross-system and final remarks (weight: 20%)
-        final_fields = ['cross_system_answers', 'final_remarks']
+        final_fields = SECTION_FIELDS['final']
         final_weight = 20 / len(final_fields)
         for field in final_fields:
             total_weight += final_weight
@@ -165,12 +193,12 @@ class SurveyResponseAdmin(admin.ModelAdmin):
             status_parts.append('G')
 
         # Role-specific questions
-        if obj.professional_role in ['legal', 'both']:
+        if obj.is_legal:
             if any([obj.lp1_digital_support, obj.lp2_challenges, obj.lp3_challenges, 
                    obj.lp4_challenges, obj.lp5_tax_types]):
                 status_parts.append('LP')
 
-        if obj.professional_role in ['customs', 'both']:
+        if obj.is_customs:
             if any([obj.ca1_training, obj.ca2_system_integration, obj.ca3_challenges, 
                    obj.ca4_effectiveness, obj.ca5_policy_impact, obj.ca6_biggest_challenge]):
                 status_parts.append('CA')
@@ -207,16 +235,10 @@ class SurveyResponseAdmin(admin.ModelAdmin):
 
     def _section_completion(self, obj, section):
         """Calculate completion percentage for specific sections."""
-        if section == 'generic':
-            fields = ['g1_policy_impact', 'g2_system_impact', 'g3_technical_issues', 'g5_digital_literacy']
+        if section in ('generic', 'final'):
+            fields = SECTION_FIELDS[section]
         elif section == 'role':
-            fields = []
-            if obj.professional_role in ['legal', 'both']:
-                fields.extend(['lp1_digital_support', 'lp2_challenges', 'lp3_challenges', 'lp4_challenges', 'lp5_tax_types'])
-            if obj.professional_role in ['customs', 'both']:
-                fields.extend(['ca1_training', 'ca2_system_integration', 'ca3_challenges', 'ca4_effectiveness', 'ca5_policy_impact', 'ca6_biggest_challenge'])
-        elif section == 'final':
-            fields = ['cross_system_answers', 'final_remarks']
+            fields = (SECTION_FIELDS['legal'] if obj.is_legal else ()) + (SECTION_FIELDS['customs'] if obj.is_customs else ())
         else:
             return 0
             
@@ -244,7 +266,7 @@ class SurveyResponseAdmin(admin.ModelAdmin):
         )
 
         # Role-specific questions
-        if obj.professional_role in ['legal', 'both']:
+        if obj.is_legal:
             legal_complete = any([
                 obj.lp1_digital_support, obj.lp2_challenges, obj.lp3_challenges,
                 obj.lp4_challenges, obj.lp5_tax_types
@@ -255,7 +277,7 @@ class SurveyResponseAdmin(admin.ModelAdmin):
                 f"❌ Legal Practitioner Questions ({self._section_completion(obj, 'role')}%)"
             )
 
-        if obj.professional_role in ['customs', 'both']:
+        if obj.is_customs:
             customs_complete = any([
                 obj.ca1_training, obj.ca2_system_integration, obj.ca3_challenges,
                 obj.ca4_effectiveness, obj.ca5_policy_impact, obj.ca6_biggest_challenge
@@ -320,7 +342,7 @@ class SurveyResponseAdmin(admin.ModelAdmin):
             indicators.append("✅ All JSON fields valid")
 
         # Role-specific field completeness
-        if obj.professional_role in ['legal', 'both']:
+        if obj.is_legal:
             legal_fields = ['lp1_digital_support', 'lp2_challenges', 'lp3_challenges', 'lp4_challenges']
             missing_legal = [field for field in legal_fields if not getattr(obj, field)]
             if missing_legal:
@@ -328,7 +350,7 @@ class SurveyResponseAdmin(admin.ModelAdmin):
             else:
                 indicators.append("✅ Legal fields complete")
 
-        if obj.professional_role in ['customs', 'both']:
+        if obj.is_customs:
             customs_fields = ['ca1_training', 'ca2_system_integration', 'ca3_challenges', 'ca4_effectiveness']
             missing_customs = [field for field in customs_fields if not getattr(obj, field)]
             if missing_customs:
@@ -443,31 +465,23 @@ class SurveyResponseAdmin(admin.ModelAdmin):
 
     # Admin Actions
     def export_selected_responses(self, request, queryset):
-        """Admin action to export selected responses."""
-        from .admin_dashboard import SurveyAnalytics
-        
+        """Admin action to queue an Excel export of the selected responses."""
         try:
-            analytics = SurveyAnalytics()
-            if analytics.load_data():
-                filename = analytics.export_to_excel()
-                if filename:
-                    self.message_user(
-                        request, 
-                        f"Successfully exported {queryset.count()} responses to {filename}", 
-                        messages.SUCCESS
-                    )
-                else:
-                    self.message_user(
-                        request, 
-                        "Failed to export responses", 
-                        messages.ERROR
-                    )
-            else:
-                self.message_user(
-                    request, 
-                    "Failed to load data for export", 
-                    messages.ERROR
-                )
+            job = ExportJob.objects.create(
+                export_type='excel',
+                requested_by=request.user,
+                response_ids=list(queryset.values_list('id', flat=True)),
+            )
+            job_url = reverse('admin:survey_exportjob_change', args=[job.pk])
+            self.message_user(
+                request,
+                format_html(
+                    'Queued <a href="{}">export job #{}</a> for {} responses. '
+                    'It is built in the background; the download link appears there when ready.',
+                    job_url, job.pk, len(job.response_ids)
+                ),
+                messages.SUCCESS
+            )
         except Exception as e:
             self.message_user(
                 request, 
@@ -556,4 +570,27 @@ class SurveyResponseAdmin(admin.ModelAdmin):
         """Custom CSS for admin interface."""
         css = {
             'all': ('admin/css/survey_admin.css',)
-        }
\ No newline at end of file
+        }
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'export_type', 'status', 'progress_display', 'requested_by', 'created_at', 'download_link']
+    list_filter = ['status', 'export_type']
+    readonly_fields = [
+        'export_type', 'status', 'requested_by', 'response_ids', 'rows_total', 'rows_done',
+        'file_path', 'filename', 'error', 'created_at', 'started_at', 'finished_at'
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+    def progress_display(self, obj):
+        return f"{obj.progress}%"
+    progress_display.short_description = "Progress"
+
+    def download_link(self, obj):
+        if obj.status != ExportJob.STATUS_COMPLETED or not obj.file_path:
+            return "-"
+        return format_html('<a href="{}">{}</a>', reverse('survey:export_job_download', args=[obj.pk]), obj.filename)
+    download_link.short_description = "Download"
@@ -34,12 +34,9 @@ class CustomAdminSite(admin.AdminSite):
             submission_date__gte=timezone.now() - timezone.timedelta(days=7)
         ).count()
         
-        # Completion metrics
+        # Completion metrics (single GROUP BY, no full-table load)
         from .admin_dashboard import SurveyAnalytics
-        analytics = SurveyAnalytics()
-        quota_status = {}
-        if analytics.load_data():
-            quota_status = analytics.get_quota_status()
+        quota_status = SurveyAnalytics().get_quota_status(source='sql')
         
         extra_context.update({
             'total_responses': total_responses,
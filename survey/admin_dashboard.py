@@ -2,16 +2,63 @@
 import json
 import logging
 from datetime import datetime, timedelta
+from types import MappingProxyType
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from django.db import connection
-from plotly.offline import plot
+
+from survey.models import ROLE_FLAG_FIELDS, json_path_sql
+from survey.questionnaire import EXPERIENCE_YEARS, G1_ASPECTS, G2_ASPECTS, MATRIX_SCORES
 
 logger = logging.getLogger(__name__)
 
+# JSON grid columns flattened into wide categorical columns named '<prefix>__<key>'
+GRID_COLUMNS = {
+    'g1_policy_impact': 'g1',
+    'g2_system_impact': 'g2',
+    'lp2_challenges': 'lp2',
+    'lp3_challenges': 'lp3',
+    'lp4_challenges': 'lp4',
+    'ca3_challenges': 'ca3',
+    'ca4_effectiveness': 'ca4',
+    'cross_system_answers': 'xs',
+}
+
+# Column headers of the export sheets built from get_quota_rows / get_generic_question_rows
+QUOTA_EXPORT_COLUMNS = ['Province', 'Role', 'Achieved', 'Target', 'Percentage', 'Risk']
+GENERIC_EXPORT_COLUMNS = ['Question', 'Dimension', 'Option', 'Count']
+
+
+def role_category_sql(alias=''):
+    """SQL expression giving the canonical role ('legal', 'customs', 'both' or NULL) from the role flags.
+
+    Args:
+        alias (str): Table alias to qualify the flag columns with.
+
+    Returns:
+        str: CASE expression over the indexed is_legal / is_customs columns.
+    """
+    prefix = f'{alias}.' if alias else ''
+    return (
+        f"CASE WHEN {prefix}is_legal AND {prefix}is_customs THEN 'both' "
+        f"WHEN {prefix}is_legal THEN 'legal' WHEN {prefix}is_customs THEN 'customs' END"
+    )
+
 class SurveyAnalytics:
     """Handles analytics for survey data, including quotas, statistics, and visualizations."""
+
+    # Engine name used by survey.analytics_engines; this engine computes everything in pandas
+    engine = 'pandas'
+    requires_dataframe = True
+
+    # Questionnaire mappings the analytics use (survey.questionnaire); shared and read-only
+    field_mappings = MappingProxyType({
+        'g1_policy_impact_keys': G1_ASPECTS.codes,
+        'g2_system_impact_keys': G2_ASPECTS.codes,
+        'experience_categories': EXPERIENCE_YEARS,
+        'sentiment_scores': MATRIX_SCORES,
+    })
     
     def __init__(self):
         """Initialize with empty DataFrame and quota targets."""
@@ -23,40 +70,34 @@ class SurveyAnalytics:
             'punjab': {'legal': 6, 'customs': 6},
             'sindh': {'legal': 6, 'customs': 6}
         }
-        # Field mappings validated against data
-        self.field_mappings = {
-            'g1_policy_impact_keys': ['service_delivery', 'compliance_burden', 'dispute_resolution', 'client_satisfaction'],
-            'g2_system_impact_keys': ['workflow_efficiency', 'data_accuracy', 'system_reliability', 'user_experience'],
-            'experience_categories': {
-                'Less than 1 year': (0, 1),
-                '1-5 years': (1, 5),
-                '6-10 years': (6, 10),
-                'More than 10 years': (11, 50)
-            },
-            'sentiment_scores': {
-                'very_positive': 2, 'positive': 1, 'neutral': 0,
-                'negative': -1, 'very_negative': -2, 'n/a': 0, 'dont_know': 0
-            }
-        }
         # Cache for JSON key validation
         self.json_keys_cache = {'g1_policy_impact': set(), 'g2_system_impact': set()}
+        # Watermarks for incremental (delta) loading
+        self._loaded_columns = None
+        self._last_id = None
+        self._last_submission_date = None
 
-    def load_data(self, force_reload=False, columns=None):
+    def load_data(self, force_reload=False, columns=None, incremental=False):
         """Load survey data from the database with selective column loading.
 
         Args:
             force_reload (bool): If True, reload data even if already loaded.
             columns (list): Optional list of columns to load (default: all).
+            incremental (bool): If True and data is already loaded, fetch only rows added
+                or (re)submitted since the last load and merge them into the DataFrame.
 
         Returns:
             bool: True if data is loaded successfully, False otherwise.
         """
+        if self.df is not None and incremental:
+            return self._load_delta()
+
         if self.df is not None and not force_reload:
             return True
 
         try:
             all_columns = [
-                'id', 'full_name', 'email', 'district', 'mobile', 'professional_role', 'province',
+                'id', 'full_name', 'email', 'district', 'mobile', 'professional_role', 'is_legal', 'is_customs', 'province',
                 'experience_legal', 'experience_customs', 'practice_areas', 'kii_consent',
                 'g1_policy_impact', 'g2_system_impact', 'g3_technical_issues', 'g4_disruption',
                 'g5_digital_literacy', 'lp1_digital_support', 'lp2_challenges', 'lp3_challenges',
@@ -74,10 +115,14 @@ class SurveyAnalytics:
                 columns = [col[0] for col in cursor.description]
                 data = cursor.fetchall()
 
-            self.df = pd.DataFrame(data, columns=columns)
-            
+            df = pd.DataFrame(data, columns=columns)
+            self._last_id = None
+            self._last_submission_date = None
+            self._update_watermarks(df)
+            self._loaded_columns = selected_columns
+
             # Enhanced data processing
-            self._enhance_data_processing()
+            self.df = self._enhance_data_processing(df)
             
             logger.info(f"Successfully loaded {len(self.df)} survey responses with {len(self.df.columns)} fields")
             return True
@@ -86,10 +131,80 @@ class SurveyAnalytics:
             logger.error(f"Error loading survey data: {str(e)}", exc_info=True)
             return False
 
-    def _enhance_data_processing(self):
-        """Enhanced data processing with better NULL handling and type conversions."""
-        if self.df is None:
-            return
+    def _update_watermarks(self, raw_df):
+        """Remember the highest id and submission_date seen, using raw (unparsed) values."""
+        if 'id' in raw_df.columns and not raw_df.empty:
+            self._last_id = max(self._last_id or 0, int(raw_df['id'].max()))
+        if 'submission_date' in raw_df.columns:
+            latest = raw_df['submission_date'].dropna()
+            if not latest.empty:
+                latest = str(latest.max())
+                if self._last_submission_date is None or latest > self._last_submission_date:
+                    self._last_submission_date = latest
+
+    def _load_delta(self):
+        """Merge rows with id above the last seen id, or a newer submission_date, into self.df.
+
+        Responses are append-only after submission, so a refresh costs O(new rows). If the
+        table shrank (rows deleted) the delta cannot be applied and a full reload is done.
+
+        Returns:
+            bool: True if data is loaded successfully, False otherwise.
+        """
+        columns = self._loaded_columns
+        if not columns or 'id' not in columns or 'submission_date' not in columns:
+            return self.load_data(force_reload=True, columns=columns)
+
+        try:
+            query = (
+                f"SELECT {', '.join(columns)} FROM survey_surveyresponse "
+                f"WHERE id > %s OR submission_date > %s ORDER BY submission_date DESC"
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(query, [self._last_id or 0, self._last_submission_date or ''])
+                fetched_columns = [col[0] for col in cursor.description]
+                data = cursor.fetchall()
+                cursor.execute("SELECT COUNT(*) FROM survey_surveyresponse")
+                row_count = cursor.fetchone()[0]
+
+            if data:
+                delta_df = pd.DataFrame(data, columns=fetched_columns)
+                self._update_watermarks(delta_df)
+                delta_df = self._enhance_data_processing(delta_df)
+
+                unchanged = self.df[~self.df['id'].isin(delta_df['id'])]
+                merged = pd.concat([delta_df, unchanged], ignore_index=True).sort_values(
+                    'submission_date', ascending=False, ignore_index=True
+                )
+                # Concatenating categoricals with different categories yields object columns
+                grid_columns = [col for col in merged.columns if '__' in col]
+                merged[grid_columns] = merged[grid_columns].astype('category')
+                self.df = merged
+
+            if len(self.df) != row_count:
+                logger.info(f"Row count changed outside append-only path ({len(self.df)} != {row_count}), reloading")
+                return self.load_data(force_reload=True, columns=columns)
+
+            logger.info(f"Incrementally loaded {len(data)} survey responses ({len(self.df)} total)")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error loading survey data delta: {str(e)}", exc_info=True)
+            return False
+
+    def _enhance_data_processing(self, df=None):
+        """Enhanced data processing with better NULL handling and type conversions.
+
+        Args:
+            df (DataFrame): Frame to process (default: self.df). Only these rows are touched.
+
+        Returns:
+            DataFrame: The processed frame.
+        """
+        if df is None:
+            df = self.df
+        if df is None:
+            return None
 
         # Parse JSON fields and update key cache
         json_columns = [
@@ -99,17 +214,77 @@ class SurveyAnalytics:
         ]
 
         for col in json_columns:
-            if col in self.df.columns:
-                self.df[col] = self.df[col].apply(
-                    lambda x: self._safe_json_loads(x, col) if pd.notna(x) and x not in ['[]', '{}', ''] else {}
-                )
+            if col in df.columns:
+                df[col] = self._parse_json_column(df[col], col)
+
+        # Flatten grids into wide categorical columns for vectorized analysis
+        df = self._flatten_grid_columns(df)
 
         # Convert datetime with timezone handling
-        if 'submission_date' in self.df.columns:
-            self.df['submission_date'] = pd.to_datetime(self.df['submission_date'], errors='coerce')
+        if 'submission_date' in df.columns:
+            df['submission_date'] = pd.to_datetime(df['submission_date'], errors='coerce')
             
         # Create derived columns
-        self._create_derived_columns()
+        self._create_derived_columns(df)
+        return df
+
+    def _parse_json_column(self, series, column):
+        """Parse a column of JSON strings with one batched json.loads call.
+
+        Falls back to row-by-row parsing only if the batch contains invalid JSON.
+
+        Returns:
+            Series: Parsed values, with {} for NULL/empty entries.
+        """
+        present = series.notna() & ~series.isin(['[]', '{}', ''])
+        values = series[present]
+        if values.empty:
+            return pd.Series([{} for _ in range(len(series))], index=series.index, dtype=object)
+
+        try:
+            decoded = json.loads('[' + ','.join(values.astype(str)) + ']')
+        except (json.JSONDecodeError, TypeError):
+            decoded = [self._safe_json_loads(value, column) for value in values]
+
+        decoded_iter = iter(decoded)
+        return pd.Series(
+            [next(decoded_iter) if is_present else {} for is_present in present],
+            index=series.index, dtype=object
+        )
+
+    def _flatten_grid_columns(self, df):
+        """Add one categorical column per grid key (e.g. 'g1__service_delivery') for each JSON grid."""
+        wide_frames = []
+        for column, prefix in GRID_COLUMNS.items():
+            if column not in df.columns or df.empty:
+                continue
+
+            grids = df[column].tolist()
+            malformed = [i for i, grid in enumerate(grids) if not isinstance(grid, dict)]
+            if malformed:
+                # JSON null, double-encoded strings or lists: flatten as unanswered rather than fail the load
+                logger.warning(f"{len(malformed)} non-object values in {column} treated as empty")
+                for i in malformed:
+                    grids[i] = {}
+            wide = pd.DataFrame.from_records(grids, index=df.index)
+            if prefix == 'xs':
+                # cross_system_answers also carries bookkeeping keys (skipped, timestamps)
+                wide = wide[[key for key in wide.columns if str(key).startswith('xs')]]
+            if column in self.json_keys_cache:
+                self.json_keys_cache[column].update(wide.columns)
+
+            wide.columns = [f'{prefix}__{key}' for key in wide.columns]
+            wide_frames.append(wide.astype('category'))
+
+        if wide_frames:
+            df = pd.concat([df, *wide_frames], axis=1)
+        return df
+
+    def _grid_columns(self, column, df=None):
+        """Return the wide column names flattened from a JSON grid column."""
+        df = self.df if df is None else df
+        prefix = f'{GRID_COLUMNS[column]}__'
+        return [col for col in df.columns if col.startswith(prefix)]
 
     def _safe_json_loads(self, json_str, column):
         """Safely parse JSON strings and update key cache."""
@@ -125,11 +300,24 @@ class SurveyAnalytics:
             logger.warning(f"Failed to parse JSON in {column}: {json_str[:100]}... Error: {e}")
             return {}
 
-    def _create_derived_columns(self):
+    def _create_derived_columns(self, df):
         """Create derived columns for enhanced analysis."""
+        # professional_role is stored comma-separated ('legal,customs'); 'role' holds the canonical
+        # legal/customs/both category (as role_category_sql) from the role flags maintained on save,
+        # leaving the stored answer untouched for exports
+        if 'is_legal' in df.columns and 'is_customs' in df.columns:
+            is_legal = df['is_legal'].fillna(False).astype(bool)
+            is_customs = df['is_customs'].fillna(False).astype(bool)
+            df['role'] = (
+                pd.Series(None, index=df.index, dtype=object)
+                .mask(is_legal, 'legal')
+                .mask(is_customs, 'customs')
+                .mask(is_legal & is_customs, 'both')
+            )
+
         # Role categorization
-        if 'professional_role' in self.df.columns:
-            self.df['role_category'] = self.df['professional_role'].map({
+        if 'role' in df.columns:
+            df['role_category'] = df['role'].map({
                 'legal': 'Legal Only',
                 'customs': 'Customs Only',
                 'both': 'Dual Role'
@@ -138,29 +326,95 @@ class SurveyAnalytics:
         # Experience numeric mapping
         experience_map = {k: (v[0] + v[1]) / 2 for k, v in self.field_mappings['experience_categories'].items()}
         
-        if 'experience_legal' in self.df.columns:
-            self.df['experience_legal_numeric'] = (
-                self.df['experience_legal']
+        if 'experience_legal' in df.columns:
+            df['experience_legal_numeric'] = (
+                df['experience_legal']
                 .map(experience_map)
                 .fillna(0)
             )
             
-        if 'experience_customs' in self.df.columns:
-            self.df['experience_customs_numeric'] = (
-                self.df['experience_customs']
+        if 'experience_customs' in df.columns:
+            df['experience_customs_numeric'] = (
+                df['experience_customs']
                 .map(experience_map)
                 .fillna(0)
             )
 
-    def get_quota_status(self):
+    def get_quota_status(self, source='dataframe'):
         """Calculate the current status against sampling quotas with enhanced reporting.
 
+        Args:
+            source (str): 'dataframe' counts from the loaded DataFrame; 'sql' runs a single
+                GROUP BY against the database without loading the DataFrame.
+
         Returns:
             dict: Quota status by province and role with detailed metrics.
         """
-        if self.df is None and not self.load_data():
-            return {}
+        if source == 'sql':
+            achieved_counts = self._quota_counts_from_sql()
+            if achieved_counts is None:
+                return {}
+        else:
+            if self.df is None and not self.load_data():
+                return {}
+            achieved_counts = self._quota_counts_from_df()
+
+        return self._build_quota_status(achieved_counts)
+
+    def _quota_roles(self):
+        """Return every role that has a quota target, in first-seen order."""
+        return list(dict.fromkeys(role for targets in self.quota_targets.values() for role in targets))
+
+    def _quota_counts_from_df(self):
+        """Count achieved responses for every province x role cell in one groupby.
+
+        A respondent counts towards each role they hold (the is_legal / is_customs flags).
+
+        Returns:
+            dict: {(province, role): achieved}
+        """
+        flags = pd.DataFrame({
+            role: self.df[ROLE_FLAG_FIELDS[role]].fillna(False).astype(bool)
+            if role in ROLE_FLAG_FIELDS else pd.Series(False, index=self.df.index)
+            for role in self._quota_roles()
+        })
+        counts = flags.groupby(self.df['province']).sum()
+        return {(province, role): int(count) for (province, role), count in counts.stack().items()}
+
+    def _quota_counts_from_sql(self):
+        """Count achieved responses for every province x role cell with a single SQL GROUP BY.
+
+        Returns:
+            dict: {(province, role): achieved}, or None if the query failed.
+        """
+        roles = self._quota_roles()
+        # Answered from the (province, is_legal, is_customs) index alone
+        role_sums = ', '.join(
+            f"SUM(CASE WHEN {ROLE_FLAG_FIELDS[role]} THEN 1 ELSE 0 END)" if role in ROLE_FLAG_FIELDS else '0'
+            for role in roles
+        )
+        query = f"""
+        SELECT province, {role_sums}
+        FROM survey_surveyresponse
+        WHERE province IS NOT NULL
+        GROUP BY province
+        """
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(query)
+                results = cursor.fetchall()
+        except Exception as e:
+            logger.error(f"Error counting quotas in SQL: {e}")
+            return None
 
+        return {
+            (row[0], role): int(count or 0)
+            for row in results
+            for role, count in zip(roles, row[1:])
+        }
+
+    def _build_quota_status(self, achieved_counts):
+        """Build the quota status dict from {(province, role): achieved} counts."""
         quota_status = {}
         total_achieved = 0
         total_target = 0
@@ -168,16 +422,9 @@ class SurveyAnalytics:
 
         for province, targets in self.quota_targets.items():
             quota_status[province] = {}
-            province_df = self.df[self.df['province'] == province]
 
             for role, target in targets.items():
-                if role == 'legal':
-                    achieved = len(province_df[province_df['professional_role'].isin(['legal', 'both'])])
-                elif role == 'customs':
-                    achieved = len(province_df[province_df['professional_role'].isin(['customs', 'both'])])
-                else:
-                    achieved = len(province_df[province_df['professional_role'] == role])
-                    
+                achieved = achieved_counts.get((province, role), 0)
                 percentage = (achieved / target * 100) if target > 0 else 0
                 status = "Completed" if achieved >= target else "In Progress"
                 remaining = max(0, target - achieved)
@@ -221,9 +468,9 @@ class SurveyAnalytics:
             return {}
 
         total_responses = len(self.df)
-        role_distribution = self.df['professional_role'].value_counts().to_dict()
+        role_distribution = self.df['role'].value_counts().to_dict()
         province_distribution = self.df['province'].value_counts().to_dict()
-        district_distribution = self.df['district'].value_counts().head(10).to_dict()
+        district_distribution = self._top_counts(self.df['district'].value_counts(), 10)
         
         response_dates = pd.to_datetime(self.df['submission_date'])
         daily_responses = response_dates.dt.date.value_counts()
@@ -235,11 +482,13 @@ class SurveyAnalytics:
         ) if total_responses > 0 else 0
 
         completeness_metrics = {}
-        key_columns = ['professional_role', 'province', 'g1_policy_impact', 'g2_system_impact']
-        for column in key_columns:
-            if column in self.df.columns:
+        # Role completeness counts respondents with a recognised role, as the SQL engine does
+        key_columns = {'professional_role': 'role', 'province': 'province',
+                       'g1_policy_impact': 'g1_policy_impact', 'g2_system_impact': 'g2_system_impact'}
+        for metric, column in key_columns.items():
+            if column in self.df.columns and total_responses > 0:
                 completeness = round(self.df[column].notna().sum() / total_responses * 100, 1)
-                completeness_metrics[column] = completeness
+                completeness_metrics[metric] = completeness
 
         return {
             'total_responses': total_responses,
@@ -275,26 +524,41 @@ class SurveyAnalytics:
         Returns:
             dict: Daily response counts with trend metrics.
         """
-        if self.df is None or 'submission_date' not in self.df.columns:
+        if self.df is None and not self.load_data():
+            return {}
+        if 'submission_date' not in self.df.columns:
             return {}
 
-        self.df['submission_date'] = pd.to_datetime(self.df['submission_date'], errors='coerce')
+        # Convert locally: the DataFrame may be shared between threads by the analytics cache
+        submission_dates = pd.to_datetime(self.df['submission_date'], errors='coerce')
         start_date = datetime.now() - timedelta(days=days)
-        recent_df = self.df[self.df['submission_date'] >= start_date]
-        
-        timeline = recent_df.groupby(recent_df['submission_date'].dt.date).size()
+        recent_dates = submission_dates[submission_dates >= start_date]
         
+        timeline = recent_dates.groupby(recent_dates.dt.date).size()
+        daily_counts = {str(date): int(count) for date, count in timeline.to_dict().items()}
+        return self._build_timeline(daily_counts, days)
+
+    def _build_timeline(self, daily_counts, days):
+        """Build the timeline payload from date-ordered daily counts.
+
+        Args:
+            daily_counts (dict): 'YYYY-MM-DD' -> response count, in date order.
+            days (int): Number of days covered by the timeline.
+
+        Returns:
+            dict: Daily response counts with trend metrics.
+        """
         trend = "Stable"
-        if len(timeline) >= 2:
-            values = list(timeline.values)
+        if len(daily_counts) >= 2:
+            values = list(daily_counts.values())
             if values[-1] > values[0]:
                 trend = "Increasing"
             elif values[-1] < values[0]:
                 trend = "Decreasing"
 
         return {
-            'daily_counts': {str(date): int(count) for date, count in timeline.to_dict().items()},
-            'total_period_responses': int(timeline.sum()),
+            'daily_counts': daily_counts,
+            'total_period_responses': sum(daily_counts.values()),
             'trend': trend,
             'period_days': days
         }
@@ -312,13 +576,11 @@ class SurveyAnalytics:
         
         # G1: Policy Impact
         if 'g1_policy_impact' in self.df.columns:
-            g1_analysis = self._analyze_json_field(self.df['g1_policy_impact'], 'G1 Policy Impact')
-            analysis['g1_policy_impact'] = g1_analysis
+            analysis['g1_policy_impact'] = self._analyze_json_field('g1_policy_impact', 'G1 Policy Impact')
 
         # G2: System Impact
         if 'g2_system_impact' in self.df.columns:
-            g2_analysis = self._analyze_json_field(self.df['g2_system_impact'], 'G2 System Impact')
-            analysis['g2_system_impact'] = g2_analysis
+            analysis['g2_system_impact'] = self._analyze_json_field('g2_system_impact', 'G2 System Impact')
 
         # Single-choice questions
         single_choice_fields = {
@@ -330,59 +592,95 @@ class SurveyAnalytics:
         for field, label in single_choice_fields.items():
             if field in self.df.columns:
                 counts = self.df[field].value_counts().to_dict()
-                analysis[field] = {
-                    'distribution': counts,
-                    'total_responses': sum(counts.values()),
-                    'most_common': max(counts.items(), key=lambda x: x[1])[0] if counts else 'N/A',
-                    'completion_rate': round(self.df[field].notna().sum() / len(self.df) * 100, 1)
-                }
+                analysis[field] = self._summarize_choice(counts, len(self.df))
 
         return analysis
 
-    def _analyze_json_field(self, series, field_name):
-        """Enhanced analysis for JSON field data."""
-        if series.empty:
+    def _analyze_json_field(self, column, field_name):
+        """Enhanced analysis for JSON field data, computed on the flattened grid columns."""
+        if self.df.empty:
             return {}
-            
-        all_responses = []
+
+        wide = self.df[self._grid_columns(column)]
+        prefix_length = len(GRID_COLUMNS[column]) + 2
+
         key_distributions = {}
-        
-        for response in series:
-            if isinstance(response, dict) and response:
-                all_responses.append(response)
-                for key, value in response.items():
-                    if key not in key_distributions:
-                        key_distributions[key] = {}
-                    key_distributions[key][value] = key_distributions[key].get(value, 0) + 1
-        
-        total_score = 0
-        total_rated = 0
-        sentiment_scores = self.field_mappings['sentiment_scores']
-        
-        for response in all_responses:
-            for value in response.values():
-                if value in sentiment_scores:
-                    total_score += sentiment_scores[value]
-                    total_rated += 1
-        
-        avg_sentiment = round(total_score / total_rated, 2) if total_rated > 0 else 0
-        
+        for col in wide.columns:
+            counts = wide[col].value_counts()
+            key_distributions[col[prefix_length:]] = counts[counts > 0].to_dict()
+
+        total_responses = int(wide.notna().any(axis=1).sum())
+        return self._summarize_grid(key_distributions, total_responses, len(self.df))
+
+    def _top_counts(self, counts, limit):
+        """Return the ``limit`` largest counts as a dict, breaking ties by value.
+
+        Args:
+            counts (pd.Series): Value -> count.
+            limit (int): Number of entries to keep.
+
+        Returns:
+            dict: Deterministically ordered top counts.
+        """
+        counts = counts.sort_index(kind='stable').sort_values(ascending=False, kind='stable')
+        return counts.head(limit).to_dict()
+
+    def _most_common(self, counts):
+        """Return the most frequent value in ``counts`` (ties broken by value), or 'N/A'."""
+        if not counts:
+            return 'N/A'
+        return min(counts.items(), key=lambda item: (-item[1], str(item[0])))[0]
+
+    def _summarize_choice(self, counts, total_rows):
+        """Summarize a single-choice question from its answer counts.
+
+        Args:
+            counts (dict): Answer -> count (answered rows only).
+            total_rows (int): Number of survey responses.
+
+        Returns:
+            dict: Distribution, totals, modal answer and completion rate.
+        """
+        answered = sum(counts.values())
+        return {
+            'distribution': counts,
+            'total_responses': answered,
+            'most_common': self._most_common(counts),
+            'completion_rate': round(answered / total_rows * 100, 1) if total_rows else 0
+        }
+
+    def _summarize_grid(self, key_distributions, total_responses, total_rows):
+        """Summarize a JSON grid question from its per-key rating counts.
+
+        Args:
+            key_distributions (dict): Grid key -> {rating: count}.
+            total_responses (int): Rows that answered at least one key.
+            total_rows (int): Number of survey responses.
+
+        Returns:
+            dict: Distributions with sentiment, completion rate and modal rating.
+        """
+        # Rating totals across every key of the grid drive sentiment and the modal rating
+        key_counts = [pd.Series(counts, dtype='int64') for counts in key_distributions.values() if counts]
+        rating_counts = (
+            pd.concat(key_counts).groupby(level=0).sum() if key_counts else pd.Series(dtype='int64')
+        )
+        scores = rating_counts.index.map(self.field_mappings['sentiment_scores'])
+        rated = rating_counts[scores.notna()]
+        total_rated = rated.sum()
+        avg_sentiment = (
+            round(float((rated * scores[scores.notna()].astype(float)).sum()) / total_rated, 2)
+            if total_rated > 0 else 0
+        )
+
         return {
             'key_distributions': key_distributions,
-            'total_responses': len(all_responses),
+            'total_responses': total_responses,
             'average_sentiment': avg_sentiment,
-            'completion_rate': round(len(all_responses) / len(series) * 100, 1),
-            'most_common_rating': self._get_most_common_rating(key_distributions)
+            'completion_rate': round(total_responses / total_rows * 100, 1) if total_rows else 0,
+            'most_common_rating': rating_counts.idxmax() if not rating_counts.empty else 'N/A'
         }
 
-    def _get_most_common_rating(self, key_distributions):
-        """Find the most common rating across all keys in a JSON field."""
-        all_ratings = {}
-        for key_dist in key_distributions.values():
-            for rating, count in key_dist.items():
-                all_ratings[rating] = all_ratings.get(rating, 0) + count
-        return max(all_ratings.items(), key=lambda x: x[1])[0] if all_ratings else 'N/A'
-
     def get_qualitative_insights(self, max_responses=10):
         """Enhanced extraction of insights from qualitative responses.
 
@@ -422,11 +720,11 @@ class SurveyAnalytics:
         """Create enhanced bar chart for quota status visualization.
 
         Returns:
-            str: HTML div for Plotly chart.
+            dict: Plotly figure JSON (data and layout), rendered client-side; empty if no data.
         """
         quota_status = self.get_quota_status()
         if not quota_status:
-            return "<div>No data available for quota chart</div>"
+            return {}
 
         provinces = []
         legal_achieved = []
@@ -473,7 +771,11 @@ class SurveyAnalytics:
             height=500
         )
 
-        return plot(fig, output_type='div')
+        return self._figure_json(fig)
+
+    def _figure_json(self, fig):
+        """Serialize a Plotly figure to plain JSON data for Plotly.newPlot in the browser."""
+        return json.loads(fig.to_json())
 
     def get_cross_tabulations(self):
         """Generate enhanced cross-tabulations for multi-dimensional analysis.
@@ -485,20 +787,20 @@ class SurveyAnalytics:
             return {}
 
         cross_tabs = {}
-        if 'professional_role' in self.df.columns and 'province' in self.df.columns:
+        if 'role' in self.df.columns and 'province' in self.df.columns:
             role_province_ct = pd.crosstab(
-                self.df['professional_role'], self.df['province'], margins=True, normalize='index'
+                self.df['role'], self.df['province'], margins=True, normalize='index'
             )
             cross_tabs['role_by_province'] = {
-                'counts': pd.crosstab(self.df['professional_role'], self.df['province'], margins=True).to_dict(),
+                'counts': pd.crosstab(self.df['role'], self.df['province'], margins=True).to_dict(),
                 'percentages': role_province_ct.applymap(lambda x: f"{x:.1%}").to_dict()
             }
 
-        if 'g1_policy_impact' in self.df.columns and 'professional_role' in self.df.columns:
-            policy_flat = self.df['g1_policy_impact'].apply(
-                lambda x: next(iter(x.values())) if isinstance(x, dict) and x else 'N/A'
-            )
-            policy_role_ct = pd.crosstab(policy_flat, self.df['professional_role'], margins=True)
+        g1_columns = self._grid_columns('g1_policy_impact') if 'g1_policy_impact' in self.df.columns else []
+        if g1_columns and 'role' in self.df.columns:
+            # First G1 aspect rating per respondent
+            policy_flat = self.df[g1_columns[0]].astype(object).fillna('N/A')
+            policy_role_ct = pd.crosstab(policy_flat, self.df['role'], margins=True)
             cross_tabs['policy_impact_by_role'] = policy_role_ct.to_dict()
 
         experience_analyses = [
@@ -507,14 +809,14 @@ class SurveyAnalytics:
         ]
         
         for exp_field, exp_numeric, label in experience_analyses:
-            if exp_field in self.df.columns and 'professional_role' in self.df.columns:
+            if exp_field in self.df.columns and 'role' in self.df.columns:
                 exp_ct = pd.crosstab(
-                    self.df[exp_field].fillna('Not specified'), self.df['professional_role'], margins=True
+                    self.df[exp_field].fillna('Not specified'), self.df['role'], margins=True
                 )
                 cross_tabs[f'{exp_field}_by_role'] = exp_ct.to_dict()
                 
                 if exp_numeric in self.df.columns:
-                    exp_stats = self.df.groupby('professional_role')[exp_numeric].agg([
+                    exp_stats = self.df.groupby('role')[exp_numeric].agg([
                         'count', 'mean', 'median', 'min', 'max'
                     ]).round(1)
                     cross_tabs[f'{exp_numeric}_stats'] = exp_stats.to_dict()
@@ -529,16 +831,16 @@ class SurveyAnalytics:
         """
         try:
             cross_tabs = {}
-            role_province_query = """
+            role_province_query = f"""
             SELECT
-                professional_role,
+                {role_category_sql()} AS role,
                 province,
                 COUNT(*) as count,
-                ROUND(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER(PARTITION BY professional_role), 1) as percentage
+                ROUND(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER(PARTITION BY {role_category_sql()}), 1) as percentage
             FROM survey_surveyresponse
-            WHERE professional_role IS NOT NULL AND province IS NOT NULL
-            GROUP BY professional_role, province
-            ORDER BY professional_role, province
+            WHERE (is_legal OR is_customs) AND province IS NOT NULL
+            GROUP BY role, province
+            ORDER BY role, province
             """
             with connection.cursor() as cursor:
                 cursor.execute(role_province_query)
@@ -551,29 +853,15 @@ class SurveyAnalytics:
                 role_province_data[role][province] = {'count': count, 'percentage': percentage}
             cross_tabs['sql_role_by_province_enhanced'] = role_province_data
 
-            for key in self.json_keys_cache['g1_policy_impact']:
-                policy_query = f"""
-                SELECT
-                    json_extract(g1_policy_impact, '$.{key}') as policy_impact,
-                    professional_role,
-                    COUNT(*) as count
-                FROM survey_surveyresponse
-                WHERE g1_policy_impact IS NOT NULL 
-                  AND professional_role IS NOT NULL
-                  AND json_extract(g1_policy_impact, '$.{key}') IS NOT NULL
-                GROUP BY json_extract(g1_policy_impact, '$.{key}'), professional_role
-                ORDER BY json_extract(g1_policy_impact, '$.{key}'), professional_role
-                """
-                with connection.cursor() as cursor:
-                    cursor.execute(policy_query)
-                    results = cursor.fetchall()
-                    
+            # G1 rating x role tables, taken from the single batched grid query
+            grid_cross_tabs = self.get_sql_grid_cross_tabs(('g1_policy_impact',))
+            for key, ratings in grid_cross_tabs.get('g1_policy_impact', {}).items():
                 policy_data = {}
-                for rating, role, count in results:
+                for rating, role_counts in ratings.items():
                     rating = rating or 'N/A'
-                    if rating not in policy_data:
-                        policy_data[rating] = {}
-                    policy_data[rating][role] = count
+                    for role, count in role_counts.items():
+                        policy_data.setdefault(rating, {})
+                        policy_data[rating][role] = policy_data[rating].get(role, 0) + count
                 cross_tabs[f'sql_policy_{key}_by_role'] = policy_data
 
             return cross_tabs
@@ -582,11 +870,55 @@ class SurveyAnalytics:
             logger.error(f"Error in enhanced SQL cross-tabs: {e}")
             return {}
 
+    def get_sql_grid_cross_tabs(self, columns=None):
+        """Cross-tabulate JSON grid answers by professional role in a single SQL query.
+
+        Every grid column is unnested with json_each and the branches are combined with
+        UNION ALL, so no per-key queries and no prior load_data() are needed.
+
+        Args:
+            columns (iterable): Grid columns to include (default: every column in GRID_COLUMNS).
+
+        Returns:
+            dict: {column: {key: {value: {role: count}}}}.
+        """
+        columns = [column for column in (columns or GRID_COLUMNS) if column in GRID_COLUMNS]
+        if not columns:
+            return {}
+
+        branches = []
+        for column in columns:
+            # cross_system_answers also carries bookkeeping keys (skipped, timestamps)
+            key_filter = "AND j.key LIKE 'xs%'" if GRID_COLUMNS[column] == 'xs' else ''
+            branches.append(f"""
+            SELECT '{column}' AS grid, j.key, j.value, {role_category_sql('r')} AS role, COUNT(*) AS count
+            FROM survey_surveyresponse r,
+                 json_each(CASE WHEN json_valid(r.{column}) THEN r.{column} END) j
+            WHERE (r.is_legal OR r.is_customs)
+              AND j.value IS NOT NULL
+              {key_filter}
+            GROUP BY j.key, j.value, role
+            """)
+        query = ' UNION ALL '.join(branches) + ' ORDER BY grid, key, value, role'
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(query)
+                results = cursor.fetchall()
+        except Exception as e:
+            logger.error(f"Error in SQL grid cross-tabs: {e}")
+            return {}
+
+        grid_cross_tabs = {column: {} for column in columns}
+        for column, key, value, role, count in results:
+            grid_cross_tabs[column].setdefault(key, {}).setdefault(value, {})[role] = count
+        return grid_cross_tabs
+
     def create_cross_tab_charts(self):
         """Create enhanced visualizations for cross-tabulations.
 
         Returns:
-            dict: HTML divs for Plotly charts with improved styling.
+            dict: Plotly figure JSON per chart, rendered client-side.
         """
         cross_tabs = self.get_cross_tabulations()
         charts = {}
@@ -602,7 +934,7 @@ class SurveyAnalytics:
                 color_continuous_scale="Blues"
             )
             fig.update_layout(xaxis_tickangle=-45, height=400)
-            charts['role_province_heatmap'] = plot(fig, output_type='div')
+            charts['role_province_heatmap'] = self._figure_json(fig)
 
         if 'policy_impact_by_role' in cross_tabs:
             df_policy_role = pd.DataFrame(cross_tabs['policy_impact_by_role'])
@@ -614,7 +946,7 @@ class SurveyAnalytics:
                 labels={'value': 'Count', 'variable': 'Professional Role'}
             )
             fig.update_layout(xaxis_title="Policy Impact Rating", yaxis_title="Number of Responses", showlegend=True)
-            charts['policy_role_stacked_barchart'] = plot(fig, output_type='div')
+            charts['policy_role_stacked_barchart'] = self._figure_json(fig)
 
         return charts
 
@@ -644,46 +976,15 @@ class SurveyAnalytics:
                             export_df[col] = export_df[col].apply(lambda x: json.dumps(x, ensure_ascii=False) if isinstance(x, dict) else x)
                     export_df.to_excel(writer, sheet_name='Raw Data', index=False)
 
-                summary_data = []
-                stats = self.get_summary_stats()
-                for key, value in stats.items():
-                    if isinstance(value, dict):
-                        for subkey, subvalue in value.items():
-                            summary_data.append([f"{key}_{subkey}", subvalue])
-                    else:
-                        summary_data.append([key, value])
-                summary_df = pd.DataFrame(summary_data, columns=['Metric', 'Value'])
+                summary_df = pd.DataFrame(self.get_summary_rows(), columns=['Metric', 'Value'])
                 summary_df.to_excel(writer, sheet_name='Summary', index=False)
 
-                quota_data = []
-                quota_status = self.get_quota_status()
-                for province, roles in quota_status.items():
-                    if province == 'total':
-                        total_info = roles
-                        quota_data.append(['TOTAL', 'All Roles', total_info['achieved'], total_info['target'],
-                                         f"{total_info['percentage']}%", total_info.get('completion_status', 'N/A')])
-                    else:
-                        for role, status in roles.items():
-                            quota_data.append([
-                                province.upper(), role.title(), status['achieved'], status['target'],
-                                f"{status['percentage']}%", status['completion_risk']
-                            ])
-                quota_df = pd.DataFrame(quota_data, columns=['Province', 'Role', 'Achieved', 'Target', 'Percentage', 'Risk'])
+                quota_df = pd.DataFrame(self.get_quota_rows(), columns=QUOTA_EXPORT_COLUMNS)
                 quota_df.to_excel(writer, sheet_name='Quota Status', index=False)
 
-                generic_analysis = self.get_generic_questions_analysis()
-                generic_data = []
-                for question, results in generic_analysis.items():
-                    if 'key_distributions' in results:
-                        for key, distributions in results['key_distributions'].items():
-                            for rating, count in distributions.items():
-                                generic_data.append([question, key, rating, count])
-                    elif 'distribution' in results:
-                        for option, count in results['distribution'].items():
-                            generic_data.append([question, 'Overall', option, count])
-                
+                generic_data = self.get_generic_question_rows()
                 if generic_data:
-                    generic_df = pd.DataFrame(generic_data, columns=['Question', 'Dimension', 'Option', 'Count'])
+                    generic_df = pd.DataFrame(generic_data, columns=GENERIC_EXPORT_COLUMNS)
                     generic_df.to_excel(writer, sheet_name='Generic Questions', index=False)
 
                 cross_tabs = self.get_cross_tabulations()
@@ -700,6 +1001,45 @@ class SurveyAnalytics:
             logger.error(f"Error exporting to Excel: {e}")
             return None
 
+    def get_summary_rows(self):
+        """Flatten summary statistics into [metric, value] rows for export sheets."""
+        summary_data = []
+        for key, value in self.get_summary_stats().items():
+            if isinstance(value, dict):
+                for subkey, subvalue in value.items():
+                    summary_data.append([f"{key}_{subkey}", subvalue])
+            else:
+                summary_data.append([key, value])
+        return summary_data
+
+    def get_quota_rows(self):
+        """Flatten quota status into rows matching QUOTA_EXPORT_COLUMNS."""
+        quota_data = []
+        for province, roles in self.get_quota_status().items():
+            if province == 'total':
+                quota_data.append(['TOTAL', 'All Roles', roles['achieved'], roles['target'],
+                                   f"{roles['percentage']}%", roles.get('completion_status', 'N/A')])
+            else:
+                for role, status in roles.items():
+                    quota_data.append([
+                        province.upper(), role.title(), status['achieved'], status['target'],
+                        f"{status['percentage']}%", status['completion_risk']
+                    ])
+        return quota_data
+
+    def get_generic_question_rows(self):
+        """Flatten generic question analysis into rows matching GENERIC_EXPORT_COLUMNS."""
+        generic_data = []
+        for question, results in self.get_generic_questions_analysis().items():
+            if 'key_distributions' in results:
+                for key, distributions in results['key_distributions'].items():
+                    for rating, count in distributions.items():
+                        generic_data.append([question, key, rating, count])
+            elif 'distribution' in results:
+                for option, count in results['distribution'].items():
+                    generic_data.append([question, 'Overall', option, count])
+        return generic_data
+
     def export_to_spss_format(self):
         """Enhanced export to SPSS-compatible format with better variable handling.
 
@@ -741,25 +1081,24 @@ class SurveyAnalytics:
             dict: Nested analytics with role, province, policy impact, and experience dimensions.
         """
         try:
-            advanced_query = """
+            # Grouped in the column order of sr_advanced_analytics_idx, and filtered on the same
+            # json_valid() condition, so SQLite reads the groups from that index
+            policy_impact = json_path_sql('g1_service_delivery')
+            system_impact = json_path_sql('g2_workflow_efficiency')
+            advanced_query = f"""
             SELECT
-                professional_role,
+                {role_category_sql()} AS role,
                 province,
-                json_extract(g1_policy_impact, '$.service_delivery') as policy_impact,
-                json_extract(g2_system_impact, '$.workflow_efficiency') as system_impact,
+                {policy_impact} as policy_impact,
+                {system_impact} as system_impact,
                 experience_legal,
                 COUNT(*) as response_count
             FROM survey_surveyresponse
-            WHERE professional_role IS NOT NULL
+            WHERE (is_legal OR is_customs)
               AND province IS NOT NULL
-              AND g1_policy_impact IS NOT NULL
-              AND JSON_VALID(g1_policy_impact)
-            GROUP BY professional_role, province, 
-                     json_extract(g1_policy_impact, '$.service_delivery'),
-                     json_extract(g2_system_impact, '$.workflow_efficiency'),
-                     experience_legal
-            ORDER BY professional_role, province, 
-                     json_extract(g1_policy_impact, '$.service_delivery')
+              AND json_valid(g1_policy_impact)
+            GROUP BY is_legal, is_customs, province, {policy_impact}, {system_impact}, experience_legal
+            ORDER BY role, province, policy_impact
             """
             with connection.cursor() as cursor:
                 cursor.execute(advanced_query)
@@ -804,8 +1143,10 @@ class SurveyAnalytics:
             'anomalies': []
         }
         
-        # Completeness analysis
+        # Completeness analysis (flattened grid columns are covered by their JSON column)
         for column in self.df.columns:
+            if '__' in column:
+                continue
             non_null_count = self.df[column].notna().sum()
             completeness = round(non_null_count / len(self.df) * 100, 1)
             quality_report['completeness'][column] = {
@@ -815,9 +1156,9 @@ class SurveyAnalytics:
             }
         
         # Consistency checks
-        if 'professional_role' in self.df.columns:
-            valid_roles = ['legal', 'customs', 'both']
-            invalid_roles = self.df[~self.df['professional_role'].isin(valid_roles)]['professional_role'].unique()
+        if 'professional_role' in self.df.columns and 'role' in self.df.columns:
+            # Stored roles are comma-separated; a value is invalid if it yields no recognised role
+            invalid_roles = self.df[self.df['role'].isna()]['professional_role'].unique()
             if len(invalid_roles) > 0:
                 quality_report['anomalies'].append(f"Invalid professional roles found: {list(invalid_roles)}")
 
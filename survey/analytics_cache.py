@@ -0,0 +1,245 @@
+# survey/analytics_cache.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection, connections
+
+from survey.analytics_engines import create_analytics
+
+logger = logging.getLogger(__name__)
+
+# Cheap fingerprint of survey_surveyresponse: any insert, delete or (re)submission changes it.
+DATA_VERSION_QUERY = "SELECT MAX(id), MAX(submission_date), COUNT(*) FROM survey_surveyresponse"
+
+# SurveyAnalytics methods whose results are memoized per data version.
+CACHED_METHOD_PREFIXES = ('get_', 'create_')
+
+
+class AnalyticsCache:
+    """Process-wide cache of SurveyAnalytics results keyed on a cheap data version.
+
+    One SurveyAnalytics instance is shared by every caller and refreshed
+    incrementally when the data version changes. Results of its
+    ``get_*``/``create_*`` methods are kept in a bounded LRU map until the data
+    version changes. With stale-while-revalidate enabled, a stale entry is
+    returned immediately and recomputed on a background thread.
+
+    Results are returned as stored, shared by every caller: treat them as
+    read-only and copy the parts you change.
+    """
+
+    def __init__(self, max_entries=64, version_ttl=2.0, stale_while_revalidate=True):
+        """Initialize an empty cache.
+
+        Args:
+            max_entries (int): Maximum number of memoized results kept (LRU eviction).
+            version_ttl (float): Seconds a data version is trusted before re-querying it.
+            stale_while_revalidate (bool): Serve stale results while refreshing in the background.
+        """
+        self.max_entries = max_entries
+        self.version_ttl = version_ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self._entries = OrderedDict()  # (method, args, kwargs) -> (version, result)
+        self._lock = threading.RLock()  # guards _entries, _version and _refreshing
+        self._compute_lock = threading.RLock()  # serializes access to the shared SurveyAnalytics
+        self._version = None
+        self._version_checked_at = 0.0
+        self._analytics = None
+        self._analytics_version = None
+        self._refreshing = set()
+
+    def get_data_version(self, force=False):
+        """Return the current data version, re-querying it at most every ``version_ttl`` seconds.
+
+        Args:
+            force (bool): If True, always query the database.
+
+        Returns:
+            tuple: (max id, last submission_date, row count).
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._version is not None and now - self._version_checked_at < self.version_ttl:
+                return self._version
+
+        with connection.cursor() as cursor:
+            cursor.execute(DATA_VERSION_QUERY)
+            max_id, last_submission, row_count = cursor.fetchone()
+        version = (max_id or 0, str(last_submission or ''), row_count or 0)
+
+        with self._lock:
+            self._version = version
+            self._version_checked_at = now
+        return version
+
+    def invalidate(self):
+        """Force the next lookup to re-read the data version (e.g. right after a submission)."""
+        with self._lock:
+            self._version_checked_at = 0.0
+
+    def clear(self):
+        """Drop every memoized result and the shared SurveyAnalytics instance."""
+        with self._compute_lock, self._lock:
+            self._entries.clear()
+            self._analytics = None
+            self._analytics_version = None
+            self._version = None
+            self._version_checked_at = 0.0
+
+    def analytics(self, allow_stale=True):
+        """Return a SurveyAnalytics stand-in whose results are served from this cache.
+
+        Args:
+            allow_stale (bool): If False, never serve a stale result, even with
+                stale-while-revalidate enabled (e.g. for responses tagged with the data version).
+        """
+        return CachedSurveyAnalytics(self, allow_stale=allow_stale)
+
+    def get_shared_analytics(self, force_reload=False):
+        """Return the shared SurveyAnalytics instance loaded for the current data version.
+
+        Returns:
+            SurveyAnalytics: Loaded instance, or None if the data could not be loaded.
+        """
+        version = self.get_data_version(force=force_reload)
+        with self._compute_lock:
+            return self._load_shared(version, force_reload=force_reload)
+
+    def call(self, method_name, *args, **kwargs):
+        """Return ``SurveyAnalytics.<method_name>(*args, **kwargs)`` for the current data version.
+
+        Returns:
+            Any: The memoized result, shared with other callers (do not mutate it).
+        """
+        return self.lookup(method_name, args, kwargs)
+
+    def lookup(self, method_name, args=(), kwargs=None, allow_stale=True):
+        """Return the memoized result of ``method_name`` (see ``call``).
+
+        Args:
+            method_name (str): SurveyAnalytics method name.
+            args (tuple): Positional arguments.
+            kwargs (dict): Keyword arguments.
+            allow_stale (bool): Serve a stale result while refreshing it, if enabled on the cache.
+
+        Returns:
+            Any: The memoized result, shared with other callers (do not mutate it).
+        """
+        key = (method_name, tuple(args), tuple(sorted((kwargs or {}).items())))
+        version = self.get_data_version()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry_version, result = entry
+                if entry_version == version:
+                    return result
+                if self.stale_while_revalidate and allow_stale:
+                    self._schedule_refresh(key)
+                    return result
+
+        return self._compute(key)
+
+    def _load_shared(self, version, force_reload=False):
+        """Load (or reuse) the shared SurveyAnalytics instance. Caller holds _compute_lock."""
+        if self._analytics is not None and self._analytics_version == version and not force_reload:
+            return self._analytics
+
+        if self._analytics is not None and not force_reload:
+            # Responses are append-only after submission: merge just the new rows
+            analytics = self._analytics
+            if analytics.df is not None and not analytics.load_data(incremental=True):
+                return None
+        else:
+            # The SQL engine loads its DataFrame lazily, only for methods that need it
+            analytics = create_analytics()
+            if analytics.requires_dataframe and not analytics.load_data():
+                return None
+        self._analytics = analytics
+        self._analytics_version = version
+        logger.debug(f"Analytics cache loaded data version {version}")
+        return analytics
+
+    def _compute(self, key):
+        """Compute and store the result for ``key`` at the current data version."""
+        method_name, args, kwargs = key
+        with self._compute_lock:
+            # Read the version under the lock, right before loading: a response committed
+            # while waiting for the lock is then part of both the tag and the data
+            version = self.get_data_version(force=True)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == version:
+                    return entry[1]
+
+            analytics = self._load_shared(version)
+            if analytics is None:
+                return {}
+            result = getattr(analytics, method_name)(*args, **dict(kwargs))
+
+            with self._lock:
+                self._entries[key] = (version, result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    logger.debug(f"Analytics cache evicted {evicted[0]}")
+            return result
+
+    def _schedule_refresh(self, key):
+        """Recompute ``key`` on a background thread unless a refresh is already running. Caller holds _lock."""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._compute(key)
+            except Exception as e:
+                logger.error(f"Background analytics refresh failed for {key[0]}: {e}", exc_info=True)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+                connections.close_all()
+
+        threading.Thread(target=refresh, name=f"analytics-refresh-{key[0]}", daemon=True).start()
+
+
+class CachedSurveyAnalytics:
+    """Drop-in replacement for SurveyAnalytics that serves results from an AnalyticsCache.
+
+    ``get_*``/``create_*`` calls are memoized per data version; any other attribute
+    (exports, ``df``, ``quota_targets``) is read from the shared loaded instance.
+    """
+
+    def __init__(self, cache, allow_stale=True):
+        self._cache = cache
+        self._allow_stale = allow_stale
+
+    def load_data(self, force_reload=False, columns=None):
+        """Ensure the shared instance is loaded. Mirrors SurveyAnalytics.load_data."""
+        return self._cache.get_shared_analytics(force_reload=force_reload) is not None
+
+    def __getattr__(self, name):
+        if name.startswith(CACHED_METHOD_PREFIXES):
+            def cached_method(*args, **kwargs):
+                return self._cache.lookup(name, args, kwargs, allow_stale=self._allow_stale)
+            return cached_method
+
+        analytics = self._cache.get_shared_analytics()
+        if analytics is None:
+            raise AttributeError(f"Survey data is not available for attribute '{name}'")
+        return getattr(analytics, name)
+
+
+_cache_settings = getattr(settings, 'ANALYTICS_CACHE', {})
+
+# Shared by every view in this process.
+analytics_cache = AnalyticsCache(
+    max_entries=_cache_settings.get('MAX_ENTRIES', 64),
+    version_ttl=_cache_settings.get('VERSION_TTL', 2.0),
+    stale_while_revalidate=_cache_settings.get('STALE_WHILE_REVALIDATE', True),
+)
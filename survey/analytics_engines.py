@@ -0,0 +1,200 @@
+# survey/analytics_engines.py
+import logging
+from datetime import datetime, timedelta
+
+import pandas as pd
+from django.conf import settings
+from django.db import connection
+
+from survey.admin_dashboard import SurveyAnalytics, role_category_sql
+
+logger = logging.getLogger(__name__)
+
+# Columns counted for data completeness in the summary (name -> SQL expression); JSON grids are
+# normalized to {} on load, so the pandas engine always reports them as complete.
+COMPLETENESS_COLUMNS = {'professional_role': role_category_sql(), 'province': 'province'}
+JSON_COMPLETENESS_COLUMNS = ['g1_policy_impact', 'g2_system_impact']
+
+GENERIC_GRID_FIELDS = ['g1_policy_impact', 'g2_system_impact']
+GENERIC_CHOICE_FIELDS = ['g3_technical_issues', 'g4_disruption', 'g5_digital_literacy']
+
+
+class SqlSurveyAnalytics(SurveyAnalytics):
+    """SurveyAnalytics engine that pushes counting work down to the database.
+
+    ``get_summary_stats``, ``get_generic_questions_analysis``, ``get_quota_status`` and
+    ``get_response_timeline`` run as GROUP BY / json_each queries and return the same
+    dict structures as the pandas engine without loading the survey table. Every other
+    method falls back to the inherited pandas implementation, which loads the DataFrame
+    on first use.
+    """
+
+    engine = 'sql'
+    requires_dataframe = False
+
+    def _fetchall(self, query, params=None):
+        """Run ``query`` and return all rows."""
+        with connection.cursor() as cursor:
+            cursor.execute(query, params or [])
+            return cursor.fetchall()
+
+    def _value_counts(self, column, limit=None):
+        """Return {value: count} for a column or SQL expression, most frequent first (ties broken by value)."""
+        query = f"""
+        SELECT {column}, COUNT(*) AS count
+        FROM survey_surveyresponse
+        WHERE {column} IS NOT NULL
+        GROUP BY {column}
+        ORDER BY count DESC, {column}
+        """
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        return {value: count for value, count in self._fetchall(query)}
+
+    def get_summary_stats(self):
+        """Generate comprehensive summary statistics for the survey in SQL.
+
+        Returns:
+            dict: Same structure as SurveyAnalytics.get_summary_stats.
+        """
+        try:
+            completeness_sql = ', '.join(f'COUNT({expression})' for expression in COMPLETENESS_COLUMNS.values())
+            (total_responses, kii_consents, earliest, latest, *column_counts), = self._fetchall(f"""
+            SELECT COUNT(*),
+                   SUM(CASE WHEN kii_consent = 'yes' THEN 1 ELSE 0 END),
+                   MIN(submission_date),
+                   MAX(submission_date),
+                   {completeness_sql}
+            FROM survey_surveyresponse
+            """)
+            daily_counts = [count for _, count in self._fetchall("""
+            SELECT date(submission_date), COUNT(*)
+            FROM survey_surveyresponse
+            WHERE submission_date IS NOT NULL
+            GROUP BY date(submission_date)
+            """)]
+
+            role_distribution = self._value_counts(role_category_sql())
+            province_distribution = self._value_counts('province')
+            district_distribution = self._value_counts('district', limit=10)
+        except Exception as e:
+            logger.error(f"Error computing summary stats in SQL: {e}")
+            return {}
+
+        total_responses = total_responses or 0
+        completeness_metrics = {}
+        if total_responses:
+            for column, count in zip(COMPLETENESS_COLUMNS, column_counts):
+                completeness_metrics[column] = round(count / total_responses * 100, 1)
+            for column in JSON_COMPLETENESS_COLUMNS:
+                completeness_metrics[column] = 100.0
+
+        earliest = pd.Timestamp(earliest) if earliest else pd.NaT
+        latest = pd.Timestamp(latest) if latest else pd.NaT
+
+        return {
+            'total_responses': total_responses,
+            'role_distribution': role_distribution,
+            'province_distribution': province_distribution,
+            'district_distribution': district_distribution,
+            'latest_submission': self._format_datetime(latest),
+            'earliest_submission': self._format_datetime(earliest),
+            'avg_daily_responses': round(sum(daily_counts) / len(daily_counts), 1) if daily_counts else 0,
+            'max_daily_responses': max(daily_counts) if daily_counts else 0,
+            'kii_consent_rate': round((kii_consents or 0) / total_responses * 100, 1) if total_responses else 0,
+            'data_completeness': completeness_metrics,
+            'survey_duration_days': (latest - earliest).days if total_responses > 1 else 0
+        }
+
+    def get_quota_status(self, source='sql'):
+        """Calculate quota status; defaults to the single GROUP BY query."""
+        return super().get_quota_status(source=source)
+
+    def get_response_timeline(self, days=7):
+        """Get the response timeline with one GROUP BY over the recent window.
+
+        Args:
+            days (int): Number of days to include in timeline.
+
+        Returns:
+            dict: Same structure as SurveyAnalytics.get_response_timeline.
+        """
+        # submission_date is stored as naive text, compared like the pandas engine does
+        start_date = datetime.now() - timedelta(days=days)
+        try:
+            rows = self._fetchall("""
+            SELECT date(submission_date), COUNT(*)
+            FROM survey_surveyresponse
+            WHERE submission_date >= %s
+            GROUP BY date(submission_date)
+            ORDER BY date(submission_date)
+            """, [start_date.strftime('%Y-%m-%d %H:%M:%S.%f')])
+        except Exception as e:
+            logger.error(f"Error computing response timeline in SQL: {e}")
+            return {}
+
+        return self._build_timeline({day: count for day, count in rows}, days)
+
+    def get_generic_questions_analysis(self):
+        """Analyze generic questions (G1-G5) with json_each and GROUP BY queries.
+
+        Returns:
+            dict: Same structure as SurveyAnalytics.get_generic_questions_analysis.
+        """
+        try:
+            total_rows = self._fetchall("SELECT COUNT(*) FROM survey_surveyresponse")[0][0]
+            analysis = {}
+            for column in GENERIC_GRID_FIELDS:
+                analysis[column] = self._analyze_grid_sql(column, total_rows)
+            for field in GENERIC_CHOICE_FIELDS:
+                analysis[field] = self._summarize_choice(self._value_counts(field), total_rows)
+            return analysis
+        except Exception as e:
+            logger.error(f"Error in SQL generic questions analysis: {e}")
+            return {}
+
+    def _analyze_grid_sql(self, column, total_rows):
+        """Per-key rating counts for a JSON grid column, summarized like the pandas engine."""
+        if not total_rows:
+            return {}
+
+        # Invalid JSON is treated as an empty grid, matching SurveyAnalytics._safe_json_loads
+        grid = f"CASE WHEN json_valid(r.{column}) THEN r.{column} END"
+        rows = self._fetchall(f"""
+        SELECT j.key, j.value, COUNT(*)
+        FROM survey_surveyresponse r, json_each({grid}) j
+        WHERE j.value IS NOT NULL
+        GROUP BY j.key, j.value
+        """)
+        (total_responses,), = self._fetchall(f"""
+        SELECT COUNT(*)
+        FROM survey_surveyresponse r
+        WHERE EXISTS (SELECT 1 FROM json_each({grid}) j WHERE j.value IS NOT NULL)
+        """)
+
+        key_distributions = {}
+        for key, value, count in rows:
+            key_distributions.setdefault(key, {})[value] = count
+        return self._summarize_grid(key_distributions, total_responses, total_rows)
+
+
+ANALYTICS_ENGINES = {
+    SurveyAnalytics.engine: SurveyAnalytics,
+    SqlSurveyAnalytics.engine: SqlSurveyAnalytics,
+}
+
+
+def create_analytics(engine=None):
+    """Create a SurveyAnalytics instance for the configured engine.
+
+    Args:
+        engine (str): 'pandas' or 'sql' (default: settings.ANALYTICS_ENGINE).
+
+    Returns:
+        SurveyAnalytics: A new, unloaded analytics instance.
+    """
+    engine = engine or getattr(settings, 'ANALYTICS_ENGINE', SurveyAnalytics.engine)
+    if engine not in ANALYTICS_ENGINES:
+        logger.warning(f"Unknown analytics engine '{engine}', falling back to pandas")
+        engine = SurveyAnalytics.engine
+    return ANALYTICS_ENGINES[engine]()
@@ -0,0 +1,168 @@
+# survey/autosave.py
+"""Versioned, delta-based autosave of wizard answers (POST /save-progress/).
+
+The client sends only what changed, as JSON-patch-style operations, together
+with a version number it increments on every change:
+
+    {"version": 7, "ops": [
+        {"op": "replace", "path": "/generic_answers/g1/service_delivery", "value": "major_challenge"},
+        {"op": "remove", "path": "/role_specific_answers/ca6_improvement"},
+        {"op": "replace", "path": "/final_remarks", "value": "Draft text"}
+    ]}
+
+A request whose version is not newer than the one already applied to the
+session is stale (reordered or duplicated) and is rejected with the current
+version, so the client can rebase and resend. Accepted requests are saved with
+``SessionStore.save_deferred()``; saves of the same session inside the
+coalescing window reach the database as one write.
+
+Unlike RFC 6902, "add" and "replace" both set the value and create missing
+intermediate objects, and "remove" of a missing path is not an error: an
+autosave delta describes the desired state, not an edit script.
+"""
+from django.conf import settings
+from django.utils import timezone
+
+_autosave_settings = getattr(settings, 'AUTOSAVE', {})
+
+# Maximum operations accepted in one request
+AUTOSAVE_MAX_OPS = _autosave_settings.get('MAX_OPS', 100)
+
+AUTOSAVE_VERSION_KEY = 'autosave_version'
+
+WIZARD_SECTIONS = ('respondent_info', 'generic_answers', 'role_specific_answers', 'cross_system_answers')
+# Session keys the client may patch; paths below them are at most MAX_PATH_DEPTH deep
+AUTOSAVE_ROOTS = WIZARD_SECTIONS + ('final_remarks', 'survey_feedback')
+MAX_PATH_DEPTH = 3
+OPERATIONS = ('add', 'replace', 'remove')
+
+
+class PatchError(ValueError):
+    """The autosave request is malformed or touches a path outside AUTOSAVE_ROOTS."""
+
+
+class StaleVersion(Exception):
+    """The autosave request is not newer than the version already applied."""
+
+    def __init__(self, current):
+        super().__init__(f"Version is not newer than {current}")
+        self.current = current
+
+
+def parse_path(path):
+    """Split a JSON pointer into its unescaped tokens and check it is patchable.
+
+    Args:
+        path (str): JSON pointer such as '/generic_answers/g1/service_delivery'.
+
+    Returns:
+        list: Path tokens; the first one is a key in AUTOSAVE_ROOTS.
+    """
+    if not isinstance(path, str) or not path.startswith('/'):
+        raise PatchError(f"Invalid path: {path!r}")
+    tokens = [token.replace('~1', '/').replace('~0', '~') for token in path[1:].split('/')]
+    if tokens[0] not in AUTOSAVE_ROOTS:
+        raise PatchError(f"Path not allowed: {path}")
+    if len(tokens) > MAX_PATH_DEPTH or not all(tokens):
+        raise PatchError(f"Invalid path: {path}")
+    return tokens
+
+
+def apply_ops(session, ops):
+    """Apply autosave operations to the session.
+
+    Each touched section is copied, patched and assigned back, so the session
+    store sees the change (and re-measures only that key).
+
+    Args:
+        session: request.session
+        ops (list): Operations as described in the module docstring.
+
+    Returns:
+        set: Session keys that were changed.
+    """
+    if not isinstance(ops, list) or not ops:
+        raise PatchError("ops must be a non-empty list")
+    if len(ops) > AUTOSAVE_MAX_OPS:
+        raise PatchError(f"Too many operations ({len(ops)} > {AUTOSAVE_MAX_OPS})")
+
+    parsed = []
+    for op in ops:
+        if not isinstance(op, dict) or op.get('op') not in OPERATIONS:
+            raise PatchError(f"Unsupported operation: {op!r}")
+        if op['op'] != 'remove' and 'value' not in op:
+            raise PatchError(f"Missing value for {op.get('path')}")
+        parsed.append((op['op'], parse_path(op.get('path')), op.get('value')))
+
+    sections = {}
+    for operation, (root, *keys), value in parsed:
+        if not keys:
+            sections[root] = None if operation == 'remove' else value
+            continue
+        if root not in sections:
+            current = session.get(root)
+            sections[root] = dict(current) if isinstance(current, dict) else {}
+        target = sections[root]
+        if not isinstance(target, dict):
+            raise PatchError(f"/{root} is not an object")
+        for key in keys[:-1]:
+            child = target.get(key)
+            # Copy nested dicts too: the session's own objects stay untouched until assignment
+            child = dict(child) if isinstance(child, dict) else {}
+            if operation == 'remove' and key not in target:
+                break
+            target[key] = child
+            target = child
+        else:
+            if operation == 'remove':
+                target.pop(keys[-1], None)
+            else:
+                target[keys[-1]] = value
+
+    for root, value in sections.items():
+        if value is None:
+            session.pop(root, None)
+        else:
+            session[root] = value
+    if 'final_remarks' in sections:
+        session['final_remarks_timestamp'] = timezone.now().isoformat()
+    return set(sections)
+
+
+def apply_autosave(session, version, ops):
+    """Check the request version and apply its operations.
+
+    Args:
+        session: request.session, loaded inside SessionStore.exclusive() so the version check
+            and the save that follows cannot interleave with another request's.
+        version (int): Client version of this delta; None for legacy whole-section saves.
+        ops (list): Operations to apply.
+
+    Returns:
+        tuple: (version now stored in the session, changed session keys)
+    """
+    current = session.get(AUTOSAVE_VERSION_KEY, 0)
+    if version is not None:
+        if type(version) is not int or version < 0:
+            raise PatchError(f"Invalid version: {version!r}")
+        if version <= current:
+            raise StaleVersion(current)
+    changed = apply_ops(session, ops)
+    if version is not None:
+        session[AUTOSAVE_VERSION_KEY] = version
+        current = version
+    return current, changed
+
+
+def legacy_ops(data):
+    """Turn the old whole-section payload of save_progress_view into replace operations.
+
+    Like before, final remarks are not accepted this way.
+    """
+    if not isinstance(data, dict):
+        raise PatchError("Payload must be an object")
+    return [
+        {'op': 'replace', 'path': f'/{key}', 'value': value}
+        for key, value in data.items()
+        if key in WIZARD_SECTIONS
+    ]
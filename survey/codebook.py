@@ -0,0 +1,193 @@
+# survey/codebook.py
+"""Codebook of coded survey answers: question labels and value labels used by exports.
+
+The bulk decoders map whole columns of codes to labels through a categorical
+remap: each column is factorized once and only its distinct codes are looked
+up, so decoding a chunk of rows costs one pass per column instead of one dict
+comprehension per object (decode_codes, decode_frame, decode_responses).
+"""
+import json
+
+import pandas as pd
+
+from survey.admin_dashboard import GRID_COLUMNS
+from survey.models import SurveyResponse
+from survey.questionnaire import CHOICE, GRID, MULTI, QUESTIONS
+
+# Low-cardinality free-form answers that are still worth dictionary-encoding (no value labels)
+CATEGORICAL_FIELDS = ['district', 'professional_role', 'experience_legal', 'experience_customs', 'practice_areas']
+
+# Single-choice answers: field -> {code: label}
+CHOICE_VALUE_LABELS = {
+    field: dict(question.options.labels) for field, question in QUESTIONS.items()
+    if question.kind == CHOICE and field not in CATEGORICAL_FIELDS
+}
+
+# Multiple-choice answers stored as comma-separated codes: field -> {code: label}
+MULTI_VALUE_LABELS = {
+    field: dict(question.options.labels) for field, question in QUESTIONS.items() if question.kind == MULTI
+}
+MULTI_SEPARATOR = ','
+
+# JSON grids: field -> (row key labels, value labels)
+GRID_LABELS = {
+    field: (dict(question.rows.labels), dict(question.options.labels)) for field, question in QUESTIONS.items()
+    if question.kind == GRID
+}
+
+
+def question_label(field_name, key=None):
+    """Return the question label for a field, or for one row of a JSON grid.
+
+    Args:
+        field_name (str): SurveyResponse field name.
+        key (str): Grid row key, for JSON grid columns.
+
+    Returns:
+        str: Human-readable label.
+    """
+    help_text = str(SurveyResponse._meta.get_field(field_name).help_text or field_name)
+    if key is None:
+        return help_text
+    row_labels = GRID_LABELS.get(field_name, ({}, {}))[0]
+    return f"{help_text.split(':')[0]}: {row_labels.get(key, key)}"
+
+
+def value_labels(field_name):
+    """Return {code: label} for a coded field or JSON grid (empty if it has no labels)."""
+    if field_name in GRID_LABELS:
+        return GRID_LABELS[field_name][1]
+    return CHOICE_VALUE_LABELS.get(field_name, {})
+
+
+# Wide grid column prefix ('lp2') -> grid field ('lp2_challenges')
+GRID_FIELDS_BY_PREFIX = {prefix: field for field, prefix in GRID_COLUMNS.items()}
+
+
+def column_label(column):
+    """Return the question label for a flattened export column (field name or '<prefix>__<key>')."""
+    prefix, _, key = column.partition('__')
+    if key and prefix in GRID_FIELDS_BY_PREFIX:
+        return question_label(GRID_FIELDS_BY_PREFIX[prefix], key)
+    return question_label(column)
+
+
+def column_value_labels(column):
+    """Return ({code: label}, separator) for a flat field or a wide '<prefix>__<key>' grid column.
+
+    Returns:
+        tuple: Labels (empty if the column is not coded) and the multi-code separator (or None).
+    """
+    if column in MULTI_VALUE_LABELS:
+        return MULTI_VALUE_LABELS[column], MULTI_SEPARATOR
+    prefix, _, key = column.partition('__')
+    if key and prefix in GRID_FIELDS_BY_PREFIX:
+        return GRID_LABELS[GRID_FIELDS_BY_PREFIX[prefix]][1], None
+    return CHOICE_VALUE_LABELS.get(column, {}), None
+
+
+def _scalar(value):
+    """Return a categorizable value: lists and objects (malformed cells) become their JSON text."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def decode_codes(values, labels, separator=None):
+    """Decode a column of codes to labels through a categorical remap.
+
+    Args:
+        values (iterable): Codes; None/NaN stay missing.
+        labels (dict): {code: label}; codes without a label are kept as they are.
+        separator (str): For multi-code values ('legal,customs'), the code separator;
+            the labels are joined with ', '.
+
+    Returns:
+        pandas.Categorical: The labels, with one category per distinct label.
+    """
+    categorical = values if isinstance(values, pd.Categorical) else pd.Categorical(values)
+    if separator:
+        new_categories = [
+            ', '.join(labels.get(code.strip(), code.strip()) for code in str(category).split(separator) if code.strip())
+            for category in categorical.categories
+        ]
+    else:
+        new_categories = [labels.get(category, category) for category in categorical.categories]
+    if len(set(new_categories)) == len(new_categories):
+        return categorical.rename_categories(new_categories)
+    # Two codes share a label (or a code equals another code's label): merge their categories
+    mapping = dict(zip(categorical.categories, new_categories))
+    return pd.Categorical(pd.Series(categorical).map(mapping))
+
+
+def decoded_list(values, labels, separator=None):
+    """decode_codes() as a list aligned with ``values``; missing values are returned unchanged."""
+    values = [_scalar(value) for value in values]
+    categorical = decode_codes(pd.Categorical(values), labels, separator)
+    categories = list(categorical.categories)
+    return [categories[code] if code >= 0 else value for code, value in zip(categorical.codes, values)]
+
+
+def decode_frame(df, columns=None):
+    """Replace the coded columns of a DataFrame with categorical label columns, in place.
+
+    Flat fields are matched by name and grid cells by their '<prefix>__<key>' column,
+    as produced by the analytics DataFrame and the flattened exports.
+
+    Args:
+        df (DataFrame): Frame to decode.
+        columns (iterable): Columns to consider (default: all).
+
+    Returns:
+        DataFrame: ``df``.
+    """
+    for column in columns if columns is not None else list(df.columns):
+        labels, separator = column_value_labels(column)
+        if labels:
+            codes = df[column].astype(object).map(_scalar)
+            codes = codes.where(codes.notna() & (codes != ''), None)
+            df[column] = decode_codes(codes, labels, separator)
+    return df
+
+
+def decode_responses(responses, fields):
+    """Decode coded fields of many SurveyResponse objects in one pass per field.
+
+    The labels are stored on each object as ``decoded_labels`` ({field: labels}),
+    which the model's get_*_display methods return instead of decoding again.
+    Grids are decoded in long form: every (row, code) cell of every object is
+    remapped at once, then regrouped per object.
+
+    Args:
+        responses (iterable): SurveyResponse objects (e.g. one admin changelist page).
+        fields (iterable): Coded field names (choice, multiple-choice or grid).
+
+    Returns:
+        list: The objects.
+    """
+    responses = list(responses)
+    for response in responses:
+        if getattr(response, 'decoded_labels', None) is None:
+            response.decoded_labels = {}
+    for field in fields:
+        question = QUESTIONS[field]
+        if question.kind == GRID:
+            owners, rows, codes = [], [], []
+            for position, response in enumerate(responses):
+                grid = getattr(response, field)
+                for row, code in (grid.items() if isinstance(grid, dict) else ()):
+                    owners.append(position)
+                    rows.append(row)
+                    codes.append(code)
+            row_labels = decoded_list(rows, question.rows.labels)
+            code_labels = decoded_list(codes, question.options.labels)
+            decoded = [{} for _ in responses]
+            for position, row, code in zip(owners, row_labels, code_labels):
+                decoded[position][row] = code
+        else:
+            values = [getattr(response, field) for response in responses]
+            separator = MULTI_SEPARATOR if question.kind == MULTI else None
+            decoded = decoded_list(values, question.options.labels, separator)
+        for response, labels in zip(responses, decoded):
+            response.decoded_labels[field] = labels
+    return responses
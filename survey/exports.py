@@ -0,0 +1,520 @@
+# survey/exports.py
+import csv
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, models
+from django.utils import timezone
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+from survey.admin_dashboard import GENERIC_EXPORT_COLUMNS, GRID_COLUMNS, QUOTA_EXPORT_COLUMNS
+from survey.analytics_engines import create_analytics
+from survey.codebook import (
+    CATEGORICAL_FIELDS, CHOICE_VALUE_LABELS, column_label, decode_frame, question_label, value_labels,
+)
+from survey.models import SurveyResponse
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the database cursor per round trip
+EXPORT_CHUNK_SIZE = 2000
+# Exports smaller than this stay in memory; larger ones roll over to a temp file on disk
+EXPORT_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Columnar export formats: format -> (file extension, content type)
+COLUMNAR_FORMATS = {
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('arrow', 'application/vnd.apache.arrow.file'),
+}
+
+
+def iter_response_rows(chunk_size=EXPORT_CHUNK_SIZE, response_ids=None, progress=None):
+    """Yield the column names, then every survey response row, fetched in chunks.
+
+    Uses the backend's chunked (server-side where supported) cursor so only one chunk
+    of rows is held in memory at a time.
+
+    Args:
+        chunk_size (int): Rows per fetchmany() call.
+        response_ids (list): Only export these response ids (default: every response).
+        progress (callable): Called with the number of rows fetched so far after each chunk.
+
+    Yields:
+        list: Column names first, then one tuple per response.
+    """
+    query = "SELECT * FROM survey_surveyresponse"
+    params = []
+    if response_ids is not None:
+        # One JSON parameter instead of one bind variable per id
+        query += " WHERE id IN (SELECT value FROM json_each(%s))"
+        params.append(json.dumps(list(response_ids)))
+    query += " ORDER BY id"
+
+    rows_done = 0
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(query, params)
+        yield [col[0] for col in cursor.description]
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+            rows_done += len(rows)
+            if progress:
+                progress(rows_done)
+
+
+def _excel_value(value):
+    """Make a database value safe for an openpyxl cell."""
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub('', value)
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        # openpyxl cannot write timezone-aware datetimes
+        return timezone.make_naive(value)
+    return value
+
+
+def write_excel_export(output, analytics=None, include_raw_data=True, chunk_size=EXPORT_CHUNK_SIZE,
+                       response_ids=None, progress=None, include_labelled_data=True):
+    """Write the survey Excel export to ``output`` using write-only worksheets.
+
+    Raw rows are streamed from the database cursor, and the Summary, Quota Status and
+    Generic Questions sheets come from the SQL analytics engine, so memory use does
+    not grow with the number of responses. The Labelled Data sheet holds the same
+    rows with grids flattened and codes decoded to labels, one chunk at a time.
+
+    Args:
+        output: Path or binary file object to save the workbook to.
+        analytics (SurveyAnalytics): Source of the summary sheets (default: SQL engine).
+        include_raw_data (bool): Whether to include the raw data sheet.
+        chunk_size (int): Rows fetched per database round trip.
+        response_ids (list): Only export these responses in the raw and labelled data sheets.
+        progress (callable): Called with the number of raw rows written so far.
+        include_labelled_data (bool): Whether to include the labelled data sheet.
+    """
+    analytics = analytics or create_analytics('sql')
+    workbook = Workbook(write_only=True)
+
+    if include_raw_data:
+        sheet = workbook.create_sheet('Raw Data')
+        row_count = -1
+        for row in iter_response_rows(chunk_size=chunk_size, response_ids=response_ids, progress=progress):
+            sheet.append([_excel_value(value) for value in row])
+            row_count += 1
+        logger.info(f"Streamed {row_count} responses into Excel export")
+
+    if include_labelled_data:
+        sheet = workbook.create_sheet('Labelled Data')
+        for row in iter_labelled_rows(chunk_size=chunk_size, response_ids=response_ids,
+                                      progress=None if include_raw_data else progress):
+            sheet.append([_excel_value(value) for value in row])
+
+    sheet = workbook.create_sheet('Summary')
+    sheet.append(['Metric', 'Value'])
+    for row in analytics.get_summary_rows():
+        sheet.append(row)
+
+    sheet = workbook.create_sheet('Quota Status')
+    sheet.append(QUOTA_EXPORT_COLUMNS)
+    for row in analytics.get_quota_rows():
+        sheet.append(row)
+
+    generic_rows = analytics.get_generic_question_rows()
+    if generic_rows:
+        sheet = workbook.create_sheet('Generic Questions')
+        sheet.append(GENERIC_EXPORT_COLUMNS)
+        for row in generic_rows:
+            sheet.append(row)
+
+    workbook.save(output)
+
+
+def stream_excel_export(analytics=None, include_raw_data=True, chunk_size=EXPORT_CHUNK_SIZE):
+    """Write the survey Excel export into a spooled temp file.
+
+    Returns:
+        tuple: (file object positioned at 0, download filename).
+    """
+    output = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE, suffix='.xlsx')
+    write_excel_export(output, analytics=analytics, include_raw_data=include_raw_data, chunk_size=chunk_size)
+    output.seek(0)
+
+    return output, export_filename('excel')
+
+
+def export_filename(export_type):
+    """Return a timestamped download filename for an export type (excel, spss, parquet or arrow)."""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    if export_type == 'excel':
+        return f"fbr_survey_export_{timestamp}.xlsx"
+    if export_type in COLUMNAR_FORMATS:
+        return f"fbr_survey_{timestamp}.{COLUMNAR_FORMATS[export_type][0]}"
+    return f"fbr_survey_spss_{timestamp}.csv"
+
+
+class Echo:
+    """File-like object whose write() returns the value, so csv.writer rows can be yielded."""
+
+    def write(self, value):
+        return value
+
+
+def get_grid_keys(columns=None):
+    """Return the keys present in each JSON grid column, from one json_each query.
+
+    Args:
+        columns (iterable): Grid columns to inspect (default: every column in GRID_COLUMNS).
+
+    Returns:
+        dict: {column: sorted list of keys}.
+    """
+    columns = [column for column in (columns or GRID_COLUMNS) if column in GRID_COLUMNS]
+    branches = []
+    for column in columns:
+        key_filter = "WHERE j.key LIKE 'xs%'" if GRID_COLUMNS[column] == 'xs' else ''
+        branches.append(f"""
+        SELECT DISTINCT '{column}', j.key
+        FROM survey_surveyresponse r,
+             json_each(CASE WHEN json_valid(r.{column}) THEN r.{column} END) j
+        {key_filter}
+        """)
+
+    grid_keys = {column: [] for column in columns}
+    if not branches:
+        return grid_keys
+    with connection.cursor() as cursor:
+        cursor.execute(' UNION ALL '.join(branches) + ' ORDER BY 1, 2')
+        for column, key in cursor.fetchall():
+            grid_keys[column].append(key)
+    return grid_keys
+
+
+def _flat_columns(grid_keys):
+    """Return (field names, flattened column names) for the concrete SurveyResponse fields."""
+    names = [field.name for field in SurveyResponse._meta.concrete_fields]
+    columns = []
+    for name in names:
+        if name in grid_keys:
+            columns.extend(f'{GRID_COLUMNS[name]}__{key}' for key in grid_keys[name])
+        else:
+            columns.append(name)
+    return names, columns
+
+
+def iter_flat_chunks(grid_keys, chunk_size=EXPORT_CHUNK_SIZE, response_ids=None):
+    """Yield lists of up to ``chunk_size`` response rows with JSON grids flattened.
+
+    Rows come from ``values_list(...).iterator(chunk_size=...)``; every grid key becomes
+    its own ``<prefix>__<key>`` column, as in the analytics DataFrame. Other JSON fields
+    are written as JSON text.
+
+    Args:
+        grid_keys (dict): {grid column: keys}, from get_grid_keys().
+        chunk_size (int): Rows fetched per database round trip.
+        response_ids (list): Only export these response ids (default: every response).
+
+    Yields:
+        list: Flattened rows, in the column order of _flat_columns(grid_keys).
+    """
+    names, _ = _flat_columns(grid_keys)
+    json_fields = {
+        field.name for field in SurveyResponse._meta.concrete_fields if isinstance(field, models.JSONField)
+    }
+    queryset = SurveyResponse.objects.order_by('id')
+    if response_ids is not None:
+        queryset = queryset.filter(id__in=response_ids)
+
+    chunk = []
+    for row in queryset.values_list(*names).iterator(chunk_size=chunk_size):
+        line = []
+        for name, value in zip(names, row):
+            if name in grid_keys:
+                grid = value if isinstance(value, dict) else {}
+                line.extend(grid.get(key) for key in grid_keys[name])
+            elif name in json_fields:
+                line.append(json.dumps(value, ensure_ascii=False) if value else '')
+            else:
+                line.append(value)
+        chunk.append(line)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_csv_export(chunk_size=EXPORT_CHUNK_SIZE, bom=False, response_ids=None, progress=None):
+    """Yield the survey responses as CSV lines, flattening JSON grids on the fly.
+
+    Args:
+        chunk_size (int): Rows fetched per database round trip.
+        bom (bool): Start with a UTF-8 byte order mark (for SPSS/Excel).
+        response_ids (list): Only export these response ids (default: every response).
+        progress (callable): Called with the number of rows written so far after each chunk.
+
+    Yields:
+        str: The BOM (if requested), the header line, then one line per response.
+    """
+    if bom:
+        yield '\ufeff'
+
+    writer = csv.writer(Echo())
+    grid_keys = get_grid_keys()
+    yield writer.writerow(_flat_columns(grid_keys)[1])
+
+    rows_done = 0
+    for chunk in iter_flat_chunks(grid_keys, chunk_size=chunk_size, response_ids=response_ids):
+        for line in chunk:
+            yield writer.writerow(line)
+        rows_done += len(chunk)
+        if progress:
+            progress(rows_done)
+
+
+def iter_labelled_rows(chunk_size=EXPORT_CHUNK_SIZE, response_ids=None, progress=None):
+    """Yield the question labels, then every response with its codes decoded to labels.
+
+    Each chunk of flattened rows is loaded into a DataFrame and decoded column by column
+    with codebook.decode_frame, so a label lookup happens once per distinct code in the
+    chunk rather than once per cell.
+
+    Args:
+        chunk_size (int): Rows fetched and decoded per round trip.
+        response_ids (list): Only export these response ids (default: every response).
+        progress (callable): Called with the number of rows decoded so far after each chunk.
+
+    Yields:
+        list: Header labels first, then one list of values per response.
+    """
+    grid_keys = get_grid_keys()
+    columns = _flat_columns(grid_keys)[1]
+    yield [column_label(column) for column in columns]
+
+    rows_done = 0
+    for chunk in iter_flat_chunks(grid_keys, chunk_size=chunk_size, response_ids=response_ids):
+        df = decode_frame(pd.DataFrame(chunk, columns=columns, dtype=object))
+        df = df.astype(object).where(df.notna(), None)
+        yield from df.itertuples(index=False, name=None)
+        rows_done += len(chunk)
+        if progress:
+            progress(rows_done)
+
+
+def _import_pyarrow():
+    """Import pyarrow lazily; only the columnar exports need it."""
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401  (registers pyarrow.parquet)
+    except ImportError as e:
+        raise ImproperlyConfigured("Parquet/Arrow exports require the 'pyarrow' package") from e
+    return pyarrow
+
+
+def get_categorical_values(fields, grid_keys):
+    """Return the distinct non-empty values of every dictionary-encoded column.
+
+    Args:
+        fields (list): Scalar field names to inspect.
+        grid_keys (dict): {grid column: [keys]} as returned by get_grid_keys().
+
+    Returns:
+        dict: {field name or (grid column, key): set of values}.
+    """
+    branches = [
+        f"SELECT '{field}', NULL, {field} FROM survey_surveyresponse WHERE {field} <> '' GROUP BY {field}"
+        for field in fields
+    ]
+    for column in grid_keys:
+        branches.append(f"""
+        SELECT DISTINCT '{column}', j.key, j.value
+        FROM survey_surveyresponse r,
+             json_each(CASE WHEN json_valid(r.{column}) THEN r.{column} END) j
+        WHERE j.value IS NOT NULL AND j.value <> '' AND j.type = 'text'
+        """)
+
+    values = {}
+    if not branches:
+        return values
+    with connection.cursor() as cursor:
+        cursor.execute(' UNION ALL '.join(branches))
+        for column, key, value in cursor.fetchall():
+            values.setdefault(column if key is None else (column, key), set()).add(value)
+    return values
+
+
+def _dictionary(labels, observed):
+    """Codebook codes in codebook order, then any other observed values sorted."""
+    return list(labels) + sorted(set(observed) - set(labels))
+
+
+def write_columnar_export(output, export_format='parquet', chunk_size=EXPORT_CHUNK_SIZE,
+                          response_ids=None, progress=None):
+    """Write the responses as a typed, compressed Parquet or Arrow IPC file.
+
+    Every coded answer (single-choice fields and each JSON grid row) becomes a
+    dictionary-encoded column whose dictionary lists the codebook codes first, in
+    questionnaire order; value labels and the question label are stored in the field
+    metadata. Empty strings in coded columns are written as nulls. Rows are streamed
+    from the database and written one record batch (Parquet row group) per chunk.
+
+    Args:
+        output: Path or binary file object.
+        export_format (str): 'parquet' or 'arrow'.
+        chunk_size (int): Rows per record batch / row group.
+        response_ids (list): Only export these response ids (default: every response).
+        progress (callable): Called with the number of rows written so far after each chunk.
+    """
+    pa = _import_pyarrow()
+    fields = list(SurveyResponse._meta.concrete_fields)
+    grid_keys = get_grid_keys()
+    coded_fields = [f.name for f in fields if f.name in CHOICE_VALUE_LABELS or f.name in CATEGORICAL_FIELDS]
+    observed = get_categorical_values(coded_fields, grid_keys)
+
+    # (arrow field, column kind, dictionary index) per output column
+    columns = []
+    for field in fields:
+        name = field.name
+        if name in grid_keys:
+            labels = value_labels(name)
+            for key in grid_keys[name]:
+                dictionary = _dictionary(labels, observed.get((name, key), ()))
+                metadata = {'label': question_label(name, key), 'value_labels': json.dumps(labels)}
+                columns.append((pa.field(f'{GRID_COLUMNS[name]}__{key}', pa.dictionary(pa.int32(), pa.string()),
+                                         metadata=metadata), 'grid', dictionary))
+            continue
+
+        metadata = {'label': question_label(name)}
+        if name in coded_fields:
+            labels = value_labels(name)
+            metadata['value_labels'] = json.dumps(labels)
+            arrow_type, kind, dictionary = (
+                pa.dictionary(pa.int32(), pa.string()), 'coded', _dictionary(labels, observed.get(name, ()))
+            )
+        elif isinstance(field, (models.AutoField, models.BigAutoField, models.IntegerField)):
+            arrow_type, kind, dictionary = pa.int64(), 'plain', None
+        elif isinstance(field, models.BooleanField):
+            arrow_type, kind, dictionary = pa.bool_(), 'plain', None
+        elif isinstance(field, models.DateTimeField):
+            arrow_type, kind, dictionary = pa.timestamp('us', tz='UTC'), 'plain', None
+        elif isinstance(field, models.JSONField):
+            arrow_type, kind, dictionary = pa.string(), 'json', None
+        else:
+            arrow_type, kind, dictionary = pa.string(), 'plain', None
+        columns.append((pa.field(name, arrow_type, metadata=metadata), kind, dictionary))
+
+    schema = pa.schema([column[0] for column in columns], metadata={'source': 'survey_surveyresponse'})
+    dictionaries = [pa.array(column[2], pa.string()) if column[2] is not None else None for column in columns]
+    indexes = [{code: i for i, code in enumerate(column[2])} if column[2] is not None else None for column in columns]
+
+    def record_batch(rows):
+        values = [[] for _ in columns]
+        for row in rows:
+            position = 0
+            for field, value in zip(fields, row):
+                if field.name in grid_keys:
+                    grid = value if isinstance(value, dict) else {}
+                    for key in grid_keys[field.name]:
+                        values[position].append(indexes[position].get(grid.get(key)))
+                        position += 1
+                    continue
+                kind = columns[position][1]
+                if kind == 'coded':
+                    value = indexes[position].get(value)
+                elif kind == 'json':
+                    value = json.dumps(value, ensure_ascii=False) if value else None
+                values[position].append(value)
+                position += 1
+
+        arrays = []
+        for (arrow_field, kind, _), dictionary, column_values in zip(columns, dictionaries, values):
+            if dictionary is not None:
+                arrays.append(pa.DictionaryArray.from_arrays(pa.array(column_values, pa.int32()), dictionary))
+            else:
+                arrays.append(pa.array(column_values, arrow_field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    if export_format == 'parquet':
+        writer = pa.parquet.ParquetWriter(output, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_file(output, schema, options=pa.ipc.IpcWriteOptions(compression='zstd'))
+
+    queryset = SurveyResponse.objects.order_by('id')
+    if response_ids is not None:
+        queryset = queryset.filter(id__in=response_ids)
+    rows_done = 0
+    chunk = []
+    try:
+        for row in queryset.values_list(*[f.name for f in fields]).iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                writer.write_batch(record_batch(chunk))
+                rows_done += len(chunk)
+                chunk = []
+                if progress:
+                    progress(rows_done)
+        if chunk or not rows_done:
+            writer.write_batch(record_batch(chunk))
+            rows_done += len(chunk)
+    finally:
+        writer.close()
+    logger.info(f"Wrote {rows_done} responses to {export_format} export")
+
+
+def stream_columnar_export(export_format='parquet', chunk_size=EXPORT_CHUNK_SIZE):
+    """Write a Parquet/Arrow export into a spooled temp file.
+
+    Returns:
+        tuple: (file object positioned at 0, download filename).
+    """
+    output = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE)
+    write_columnar_export(output, export_format=export_format, chunk_size=chunk_size)
+    output.seek(0)
+    return output, export_filename(export_format)
+
+
+def run_export_job(job, chunk_size=EXPORT_CHUNK_SIZE):
+    """Build the file for an ExportJob that the caller has already marked as running.
+
+    Progress is saved to the job after every chunk so the status endpoint can report it.
+
+    Args:
+        job (ExportJob): The claimed job.
+        chunk_size (int): Rows fetched per database round trip.
+
+    Returns:
+        str: Path of the written file.
+    """
+    queryset = SurveyResponse.objects.all()
+    if job.response_ids is not None:
+        queryset = queryset.filter(id__in=job.response_ids)
+    job.rows_total = queryset.count()
+    job.filename = export_filename(job.export_type)
+    job.file_path = os.path.join(settings.EXPORT_JOB_DIR, f"job_{job.pk}_{job.filename}")
+    job.save(update_fields=['rows_total', 'filename', 'file_path'])
+
+    def progress(rows_done):
+        type(job).objects.filter(pk=job.pk).update(rows_done=rows_done)
+
+    os.makedirs(settings.EXPORT_JOB_DIR, exist_ok=True)
+    if job.export_type == 'excel':
+        write_excel_export(job.file_path, chunk_size=chunk_size, response_ids=job.response_ids, progress=progress)
+    elif job.export_type in COLUMNAR_FORMATS:
+        write_columnar_export(job.file_path, export_format=job.export_type, chunk_size=chunk_size,
+                              response_ids=job.response_ids, progress=progress)
+    else:
+        with open(job.file_path, 'w', encoding='utf-8', newline='') as output:
+            for line in iter_csv_export(chunk_size=chunk_size, bom=True, response_ids=job.response_ids,
+                                        progress=progress):
+                output.write(line)
+
+    job.rows_done = job.rows_total
+    return job.file_path
@@ -0,0 +1,328 @@
+# survey/importer.py
+"""Batch import of offline (paper / spreadsheet) responses, used by the import_responses command.
+
+Input files use the column layout of the CSV export: one column per flat field and
+one ``<prefix>__<key>`` column per grid row (``lp2__tax_appeals``, see GRID_COLUMNS).
+Answers may be written as option codes or as their labels. Each row is checked
+against the questionnaire schema with the same rules as the wizard views. An
+optional ``submission_date`` column keeps the date a response was collected
+(rows without one are dated at import).
+
+Validation does no database access, so read_chunks() can run in the main process
+while validate_chunk() runs in worker processes; building and inserting the
+SurveyResponse objects is left to the caller.
+"""
+import csv
+import json
+import os
+import re
+from datetime import datetime, time
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from survey.admin_dashboard import GRID_COLUMNS
+from survey.questionnaire import G3_VALUES_REQUIRING_G4, GRID, LP5_CHALLENGE_LEVELS, LP5_FUNCTIONS, MULTI, QUESTIONS
+from survey.utils.session_utils import sanitize_input
+from survey.views.respondent_info_views import EMAIL_REGEX, PROVINCE_DISTRICT_MAP
+
+# Rows read from the file per validation task
+IMPORT_CHUNK_SIZE = 2000
+
+IMPORT_FORMATS = ('csv', 'xlsx')
+
+# Required answers per section, as the wizard views require them
+GENERIC_REQUIRED = ('g1_policy_impact', 'g2_system_impact', 'g3_technical_issues', 'g5_digital_literacy')
+ROLE_REQUIRED = {
+    'legal': ('lp1_digital_support', 'lp2_challenges', 'lp3_challenges', 'lp4_challenges'),
+    'customs': (
+        'ca1_training', 'ca2_system_integration', 'ca3_challenges', 'ca4_effectiveness',
+        'ca5_policy_impact', 'ca6_biggest_challenge',
+    ),
+}
+# Free-text columns: field -> max length (None for TextFields)
+TEXT_FIELDS = {
+    'full_name': 200, 'mobile': 20, 'district': 100, 'lp6_priority_improvement': None,
+    'ca6_improvement': None, 'final_remarks': None, 'survey_feedback': None,
+}
+# Columns recognised besides the coded questions and free text
+EXTRA_FIELDS = ('email', 'reference_number', 'lp5_tax_types', 'submission_date')
+
+_EMAIL_RE = re.compile(EMAIL_REGEX)
+
+# Field -> {casefolded label or code: code}, so answers can be written either way
+_OPTION_CODES = {
+    field: {
+        **{str(label).casefold(): code for code, label in question.options.choices},
+        **{str(code).casefold(): code for code in question.options.codes},
+    }
+    for field, question in QUESTIONS.items()
+}
+
+
+def _option_code(field, value):
+    """Return the option code written as ``value`` (code or label), or None if it is not an option."""
+    return _OPTION_CODES[field].get(value.casefold())
+
+
+def import_format(path):
+    """Return 'csv' or 'xlsx' from the file extension, or None if unsupported."""
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    return extension if extension in IMPORT_FORMATS else None
+
+
+def read_chunks(path, chunk_size=IMPORT_CHUNK_SIZE, sheet=None):
+    """Yield the header, then lists of up to ``chunk_size`` (row number, values) pairs.
+
+    CSV files are read with csv.reader (UTF-8, BOM tolerated); XLSX files with a
+    read-only openpyxl workbook, so memory use does not grow with the file size.
+
+    Args:
+        path (str): CSV or XLSX file.
+        chunk_size (int): Rows per chunk.
+        sheet (str): XLSX worksheet name (default: the first sheet).
+
+    Yields:
+        list: The header (column names) first, then chunks of (row number, list of cell strings);
+            row numbers count the header as row 1, as spreadsheets do.
+    """
+    if import_format(path) == 'xlsx':
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+            rows = ([_cell_text(value) for value in row] for row in worksheet.iter_rows(values_only=True))
+            yield from _chunk_rows(rows, chunk_size)
+        finally:
+            workbook.close()
+    else:
+        with open(path, encoding='utf-8-sig', newline='') as handle:
+            yield from _chunk_rows(csv.reader(handle), chunk_size)
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _chunk_rows(rows, chunk_size):
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return
+    yield [column.strip() for column in header]
+    chunk = []
+    for row_number, row in enumerate(rows, start=2):
+        if not any(cell.strip() for cell in row):
+            continue
+        chunk.append((row_number, row))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def check_header(header):
+    """Return the header columns that are not importable (the rest of the file is still read)."""
+    grid_prefixes = {prefix: field for field, prefix in GRID_COLUMNS.items()}
+    unknown = []
+    for column in header:
+        prefix, _, key = column.partition('__')
+        if key and prefix in grid_prefixes:
+            if key not in QUESTIONS[grid_prefixes[prefix]].rows.valid:
+                unknown.append(column)
+        elif column and column not in QUESTIONS and column not in TEXT_FIELDS and column not in EXTRA_FIELDS:
+            unknown.append(column)
+    return unknown
+
+
+def validate_chunk(header, chunk):
+    """Validate a chunk of rows; picklable entry point for the worker processes.
+
+    Returns:
+        list: (row number, values, errors) per row; values are SurveyResponse column values
+            and are only complete when errors is empty.
+    """
+    return [(row_number, *validate_row(dict(zip(header, row)))) for row_number, row in chunk]
+
+
+def validate_row(row):
+    """Validate one input row against the questionnaire schema.
+
+    Args:
+        row (dict): Column name -> cell text, in the export column layout.
+
+    Returns:
+        tuple: (values, errors) - SurveyResponse column values and a list of error messages.
+    """
+    row = {column: sanitize_input(value) for column, value in row.items() if column}
+    values = {}
+    errors = []
+
+    for field, max_length in TEXT_FIELDS.items():
+        value = row.get(field, '')
+        if max_length and len(value) > max_length:
+            errors.append(f"{field} must be {max_length} characters or less")
+        values[field] = value
+    values['mobile'] = values['mobile'] or None
+
+    email = row.get('email', '')
+    if not email or not _EMAIL_RE.match(email):
+        errors.append("Valid email is required")
+    values['email'] = email
+    values['reference_number'] = row.get('reference_number', '')
+    if len(values['reference_number']) > 20:
+        errors.append("reference_number must be 20 characters or less")
+    values['submission_date'], date_error = _parse_submission_date(row.get('submission_date', ''))
+    if date_error:
+        errors.append(date_error)
+    if not values['full_name']:
+        errors.append("Full name is required")
+    if not values['district']:
+        errors.append("District is required")
+
+    for field, question in QUESTIONS.items():
+        if question.kind == GRID:
+            prefix = GRID_COLUMNS[field]
+            grid = {}
+            for key in question.rows.codes:
+                value = row.get(f'{prefix}__{key}', '')
+                if not value:
+                    continue
+                code = _option_code(field, value)
+                if code is None:
+                    errors.append(f"Invalid value for {prefix.upper()} {key}: {value}")
+                grid[key] = code or value
+            values[field] = grid
+        elif question.kind == MULTI:
+            codes = []
+            for value in (part.strip() for part in row.get(field, '').split(',')):
+                if not value:
+                    continue
+                code = _option_code(field, value)
+                if code is None:
+                    errors.append(f"Invalid value for {field}: {value}")
+                elif code not in codes:
+                    codes.append(code)
+            values[field] = ','.join(codes)
+        else:
+            value = row.get(field, '')
+            code = _option_code(field, value) if value else ''
+            if code is None:
+                errors.append(f"Invalid value for {field}: {value}")
+            values[field] = code or ''
+
+    # Respondent information
+    roles = [role for role in values['professional_role'].split(',') if role]
+    if not roles:
+        errors.append("At least one professional role is required")
+    if not values['province']:
+        errors.append("Province is required")
+    elif PROVINCE_DISTRICT_MAP.get(values['district'], values['province']) != values['province']:
+        errors.append(
+            f"District ({values['district']}) does not belong to province ({values['province']})"
+        )
+    for role in ('legal', 'customs'):
+        field = f'experience_{role}'
+        if role in roles and not values[field]:
+            errors.append(f"{field} is required for the {role} role")
+        values[field] = values[field] or None
+    values['practice_areas'] = values['practice_areas'] or None
+    values['kii_consent'] = values['kii_consent'] or None
+
+    # Questions, required as in the wizard: generic for everyone, then the respondent's role sections
+    required = list(GENERIC_REQUIRED)
+    for role in roles:
+        required.extend(ROLE_REQUIRED.get(role, ()))
+    for field in required:
+        question = QUESTIONS[field]
+        if question.kind == GRID:
+            missing = [key for key in question.rows.codes if key not in values[field]]
+            if missing:
+                errors.append(f"Please complete all rows in {GRID_COLUMNS[field].upper()} (missing: {', '.join(missing)})")
+        elif not values[field]:
+            errors.append(f"{field} is required")
+
+    if values['g3_technical_issues'] in G3_VALUES_REQUIRING_G4:
+        if not values['g4_disruption']:
+            errors.append("g4_disruption is required for this g3_technical_issues answer")
+    else:
+        values['g4_disruption'] = None
+
+    values['lp5_tax_types'] = {}
+    if 'legal' in roles:
+        values['lp5_tax_types'], lp5_errors = _parse_lp5(row.get('lp5_tax_types', ''), values)
+        errors.extend(lp5_errors)
+    values['lp5_visible'] = bool(values['lp5_tax_types'])
+
+    # Sections the wizard does not show for the respondent's roles stay empty
+    for role, fields in ROLE_REQUIRED.items():
+        if role not in roles:
+            for field in fields:
+                values[field] = {} if QUESTIONS[field].kind == GRID else ''
+    if 'legal' not in roles:
+        values['lp6_priority_improvement'] = ''
+    if 'customs' not in roles:
+        values['ca6_improvement'] = ''
+
+    return values, errors
+
+
+def _parse_submission_date(text):
+    """Parse the optional submission_date column (ISO date or date-time, as in the CSV export).
+
+    Returns:
+        tuple: (datetime or None when blank, error message or None). Naive values are taken
+            to be in the project time zone.
+    """
+    if not text:
+        return None, None
+    try:
+        value = parse_datetime(text)
+        if value is None:
+            date = parse_date(text)
+            value = datetime.combine(date, time.min) if date else None
+    except ValueError:
+        value = None
+    if value is None:
+        return None, f"Invalid submission_date: {text} (expected YYYY-MM-DD or YYYY-MM-DD HH:MM[:SS])"
+    if settings.USE_TZ and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    if value > (timezone.now() if settings.USE_TZ else datetime.now()):
+        return None, f"submission_date {text} is in the future"
+    return value, None
+
+
+def _parse_lp5(text, values):
+    """Parse the optional LP5 column (JSON as in the CSV export) for the LP2-LP4 functions rated a challenge."""
+    challenging = {
+        function for field in ('lp2_challenges', 'lp3_challenges', 'lp4_challenges')
+        for function, level in values[field].items() if level in LP5_CHALLENGE_LEVELS
+    }
+    if not text:
+        return {}, []
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return {}, ["lp5_tax_types is not valid JSON"]
+    if not isinstance(data, dict):
+        return {}, ["lp5_tax_types must be a JSON object"]
+
+    tax_types, errors = {}, []
+    for function, taxes in data.items():
+        if function not in LP5_FUNCTIONS or not isinstance(taxes, dict):
+            errors.append(f"Invalid lp5_tax_types entry: {function}")
+        elif function not in challenging:
+            errors.append(f"lp5_tax_types lists {function}, which is not rated a moderate or major challenge")
+        else:
+            tax_types[function] = {
+                'income_tax': bool(taxes.get('income_tax', False)),
+                'sales_tax': bool(taxes.get('sales_tax', False)),
+            }
+    return tax_types, errors
@@ -0,0 +1,139 @@
+# survey/live_updates.py
+import json
+import logging
+import threading
+
+from django.conf import settings
+
+from survey.analytics_cache import analytics_cache
+
+logger = logging.getLogger(__name__)
+
+_live_settings = getattr(settings, 'DASHBOARD_LIVE_UPDATES', {})
+
+# Whether the SSE feed is served; each open stream holds a worker, so it is opt-in
+LIVE_UPDATES_ENABLED = _live_settings.get('ENABLED', False)
+# Seconds between keep-alive comments; also how often other processes' submissions are noticed
+LIVE_KEEPALIVE_SECONDS = _live_settings.get('KEEPALIVE_SECONDS', 15)
+# Streams are closed after this long and the browser reconnects, so no worker is held forever
+LIVE_STREAM_MAX_SECONDS = _live_settings.get('STREAM_MAX_SECONDS', 300)
+# Delay before a browser reconnects to a closed stream (milliseconds)
+LIVE_RETRY_MS = _live_settings.get('RETRY_MS', 3000)
+
+
+class ResponseChangeNotifier:
+    """In-process signal that survey responses have changed.
+
+    The submission path calls ``notify()``; live dashboard streams block in
+    ``wait()`` and wake up immediately instead of polling. Submissions handled by
+    other processes are picked up through the data version check the streams do
+    on every keep-alive.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._sequence = 0
+
+    @property
+    def sequence(self):
+        """Number of notifications so far."""
+        with self._condition:
+            return self._sequence
+
+    def notify(self, response_id=None):
+        """Record a saved response and wake every waiting stream.
+
+        Args:
+            response_id (int): Primary key of the saved SurveyResponse, for logging.
+        """
+        analytics_cache.invalidate()
+        with self._condition:
+            self._sequence += 1
+            sequence = self._sequence
+            self._condition.notify_all()
+        logger.debug(f"Response change notification {sequence} (response {response_id})")
+
+    def wait(self, since, timeout):
+        """Block until a notification arrives after ``since`` or ``timeout`` seconds pass.
+
+        Args:
+            since (int): Sequence number already seen by the caller.
+            timeout (float): Maximum seconds to wait.
+
+        Returns:
+            int: The current sequence number (equal to ``since`` on timeout).
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._sequence != since, timeout=timeout)
+            return self._sequence
+
+
+# Shared by the submission path and every live stream in this process.
+response_notifier = ResponseChangeNotifier()
+
+
+def dashboard_snapshot(analytics):
+    """Return the parts of the dashboard that live updates keep current.
+
+    Args:
+        analytics: SurveyAnalytics (or cached stand-in).
+
+    Returns:
+        dict: total_responses, quota_status and timeline daily counts.
+    """
+    summary = analytics.get_summary_stats() or {}
+    timeline = analytics.get_response_timeline() or {}
+    return {
+        'total_responses': summary.get('total_responses', 0),
+        'quota_status': analytics.get_quota_status() or {},
+        'timeline': timeline.get('daily_counts', {}),
+    }
+
+
+def _changed_cells(previous, current):
+    """Return the entries of nested dict ``current`` that differ from ``previous``, keeping the nesting."""
+    changes = {}
+    for key, value in current.items():
+        old = previous.get(key)
+        if value == old:
+            continue
+        if isinstance(value, dict) and isinstance(old, dict) and value and all(isinstance(v, dict) for v in value.values()):
+            changes[key] = _changed_cells(old, value)
+        else:
+            changes[key] = value
+    return changes
+
+
+def dashboard_delta(previous, current):
+    """Return what changed between two dashboard snapshots, or None if nothing did.
+
+    Args:
+        previous (dict): Earlier snapshot (None for a client that has nothing yet).
+        current (dict): New snapshot.
+
+    Returns:
+        dict: total_responses, new_responses, changed quota_status cells and new or
+            changed timeline buckets.
+    """
+    previous = previous or {'total_responses': 0, 'quota_status': {}, 'timeline': {}}
+    quota_changes = _changed_cells(previous['quota_status'], current['quota_status'])
+    timeline_changes = {
+        day: count for day, count in current['timeline'].items() if previous['timeline'].get(day) != count
+    }
+    if current['total_responses'] == previous['total_responses'] and not quota_changes and not timeline_changes:
+        return None
+    return {
+        'total_responses': current['total_responses'],
+        'new_responses': current['total_responses'] - previous['total_responses'],
+        'quota_status': quota_changes,
+        'timeline': timeline_changes,
+    }
+
+
+def format_event(event, data, event_id=None):
+    """Encode one Server-Sent Events message."""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return '\n'.join(lines) + '\n\n'
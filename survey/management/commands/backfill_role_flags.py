@@ -0,0 +1,50 @@
+# survey/management/commands/backfill_role_flags.py
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from survey.models import ROLE_FLAG_FIELDS, SurveyResponse
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the indexed is_legal / is_customs flags from professional_role. "
+        "Needed for rows written without SurveyResponse.save() (bulk_create, QuerySet.update, raw SQL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows read and updated per batch')
+        parser.add_argument('--dry-run', action='store_true', help='Report how many rows are out of date without saving')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        flag_fields = list(ROLE_FLAG_FIELDS.values())
+        checked = 0
+        changed = []
+        updated = 0
+
+        queryset = SurveyResponse.objects.order_by('id').only('id', 'professional_role', *flag_fields)
+        for response in queryset.iterator(chunk_size=batch_size):
+            checked += 1
+            before = [getattr(response, field) for field in flag_fields]
+            response.set_role_flags()
+            if [getattr(response, field) for field in flag_fields] != before:
+                changed.append(response)
+            if len(changed) >= batch_size:
+                updated += self._save(changed, flag_fields, options['dry_run'])
+                changed = []
+        updated += self._save(changed, flag_fields, options['dry_run'])
+
+        verb = 'would update' if options['dry_run'] else 'updated'
+        logger.info(f"backfill_role_flags checked {checked} responses, {verb} {updated}")
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} responses, {verb} {updated}"))
+
+    def _save(self, responses, flag_fields, dry_run):
+        """Write the recomputed flags for one batch; returns the number of rows."""
+        if responses and not dry_run:
+            with transaction.atomic():
+                SurveyResponse.objects.bulk_update(responses, flag_fields)
+        return len(responses)
@@ -0,0 +1,153 @@
+# survey/management/commands/benchmark_sessions.py
+import logging
+import threading
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connections
+from django.test.utils import override_settings
+
+from survey.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# name -> (SESSION_ENGINE, route sessions to the 'sessions' database?)
+SCENARIOS = {
+    'shared-db': ('django.contrib.sessions.backends.db', False),
+    'isolated-db': ('django.contrib.sessions.backends.db', True),
+    'isolated-cached': (settings.SESSION_ENGINE, True),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate concurrent respondents saving wizard steps while submissions hold the response "
+        "database's write lock, and compare session latency for the old shared-database engine "
+        "with the dedicated sessions store."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--respondents', type=int, default=8, help='Concurrent respondent threads')
+        parser.add_argument('--steps', type=int, default=50, help='Session saves per respondent')
+        parser.add_argument('--payload-kb', type=int, default=4, help='Approximate session size in KB')
+        parser.add_argument('--submitters', type=int, default=1, help='Threads simulating survey submissions')
+        parser.add_argument('--submit-hold-ms', type=float, default=20, help='How long each submission holds the write lock')
+        parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help='Scenario to run (default: all)')
+
+    def handle(self, *args, **options):
+        scenarios = options['scenario'] or list(SCENARIOS)
+        self.stdout.write(
+            f"{options['respondents']} respondents x {options['steps']} steps, ~{options['payload_kb']} KB sessions, "
+            f"{options['submitters']} submitter(s) holding the write lock {options['submit_hold_ms']} ms"
+        )
+        self.stdout.write(f"{'scenario':<16} {'saves/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7} {'submits':>8} {'submit p95':>10}")
+        for name in scenarios:
+            result = self.run_scenario(name, options)
+            latency = result['latency'].summary()
+            submit = result['submit_wait'].summary()
+            self.stdout.write(
+                f"{name:<16} {result['throughput']:>8.1f} {latency['p50']:>8} {latency['p95']:>8} {latency['p99']:>8} "
+                f"{latency['max']:>8} {result['errors']:>7} {submit['count']:>8} {submit['p95']:>10}"
+            )
+
+    def run_scenario(self, name, options):
+        """Run one scenario and return its session latency / submission wait histograms."""
+        engine, isolated = SCENARIOS[name]
+        routers = settings.DATABASE_ROUTERS if isolated else []
+        with override_settings(SESSION_ENGINE=engine, DATABASE_ROUTERS=routers):
+            created_table = False if isolated else self._ensure_session_table('default')
+            store_class = import_module(engine).SessionStore
+            latency = Histogram(options['respondents'] * options['steps'])
+            submit_wait = Histogram(100000)
+            errors = []
+            lock = threading.Lock()
+            done = threading.Event()
+            session_keys = []
+
+            def respondent(index):
+                payload = 'x' * (options['payload_kb'] * 1024)
+                try:
+                    session = store_class()
+                    session['respondent_info'] = {'email': f'bench{index}@example.com', 'professional_roles': ['legal']}
+                    session.save()
+                    session_key = session.session_key
+                    with lock:
+                        session_keys.append(session_key)
+                    for step in range(options['steps']):
+                        start = time.perf_counter()
+                        try:
+                            session = store_class(session_key=session_key)
+                            answers = session.get('generic_answers', {})
+                            answers[f'q{step % 20}'] = payload[: len(payload) // 20]
+                            session['generic_answers'] = answers
+                            session['progress'] = step
+                            session.save()
+                        except DatabaseError as e:
+                            with lock:
+                                errors.append(str(e))
+                            continue
+                        with lock:
+                            latency.record((time.perf_counter() - start) * 1000)
+                finally:
+                    connections.close_all()
+
+            def submitter():
+                hold = options['submit_hold_ms'] / 1000
+                try:
+                    while not done.is_set():
+                        start = time.perf_counter()
+                        with connections['default'].cursor() as cursor:
+                            cursor.execute('BEGIN IMMEDIATE')
+                            with lock:
+                                submit_wait.record((time.perf_counter() - start) * 1000)
+                            time.sleep(hold)
+                            cursor.execute('ROLLBACK')
+                        time.sleep(hold)
+                except DatabaseError as e:
+                    logger.warning(f"Submitter stopped: {e}")
+                finally:
+                    connections.close_all()
+
+            submitters = [threading.Thread(target=submitter) for _ in range(options['submitters'])]
+            respondents = [threading.Thread(target=respondent, args=(index,)) for index in range(options['respondents'])]
+            for thread in submitters:
+                thread.start()
+            start = time.perf_counter()
+            for thread in respondents:
+                thread.start()
+            for thread in respondents:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            done.set()
+            for thread in submitters:
+                thread.join()
+
+            for session_key in session_keys:
+                store_class(session_key=session_key).delete()
+            if created_table:
+                self._drop_session_table('default')
+
+        if errors:
+            logger.warning(f"benchmark_sessions {name}: {len(errors)} failed saves, first: {errors[0]}")
+        return {
+            'latency': latency,
+            'submit_wait': submit_wait,
+            'errors': len(errors),
+            'throughput': latency.count / elapsed if elapsed else 0,
+        }
+
+    def _ensure_session_table(self, alias):
+        """Create django_session in ``alias`` for the shared-database scenario; returns True if created."""
+        connection = connections[alias]
+        if Session._meta.db_table in connection.introspection.table_names():
+            return False
+        with connection.schema_editor() as editor:
+            editor.create_model(Session)
+        return True
+
+    def _drop_session_table(self, alias):
+        with connections[alias].schema_editor() as editor:
+            editor.delete_model(Session)
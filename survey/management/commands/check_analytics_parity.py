@@ -0,0 +1,127 @@
+# survey/management/commands/check_analytics_parity.py
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from survey.analytics_engines import create_analytics
+from survey.models import SurveyResponse
+from survey.views.generic_questions_views import get_generic_questions_context
+
+# Methods the SQL engine pushes down, with the arguments each is compared on
+PARITY_METHODS = [
+    ('get_summary_stats', {}),
+    ('get_generic_questions_analysis', {}),
+    ('get_quota_status', {}),
+    ('get_response_timeline', {'days': 7}),
+    ('get_response_timeline', {'days': 30}),
+]
+
+PROVINCES = ['ajk', 'balochistan', 'gb', 'ict', 'kpk', 'punjab', 'sindh']
+DISTRICTS = ['Lahore', 'Quetta', 'Karachi East', 'Islamabad', 'Peshawar', 'Multan', 'Gilgit']
+ROLES = ['legal', 'customs', 'legal,customs', 'both']
+
+
+class Command(BaseCommand):
+    help = "Compare the pandas and SQL analytics engines and report any output that differs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Number of synthetic responses to add before comparing (rolled back afterwards)')
+        parser.add_argument('--random-seed', type=int, default=42, help='Seed for the synthetic data generator')
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic responses instead of rolling back')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['seed']:
+                self._seed_responses(options['seed'], random.Random(options['random_seed']))
+                self.stdout.write(f"Seeded {options['seed']} synthetic responses")
+
+            failures = self._compare_engines()
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"{failures} analytics method(s) differ between the pandas and SQL engines")
+        self.stdout.write(self.style.SUCCESS("Pandas and SQL analytics engines agree"))
+
+    def _compare_engines(self):
+        """Run every pushed-down method on both engines and report mismatches."""
+        pandas_engine = create_analytics('pandas')
+        sql_engine = create_analytics('sql')
+        failures = 0
+
+        for method_name, kwargs in PARITY_METHODS:
+            label = f"{method_name}({', '.join(f'{k}={v}' for k, v in kwargs.items())})"
+            expected = getattr(pandas_engine, method_name)(**kwargs)
+            actual = getattr(sql_engine, method_name)(**kwargs)
+            differences = self._diff(expected, actual)
+            if differences:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f"FAIL {label}"))
+                for path, pandas_value, sql_value in differences[:10]:
+                    self.stdout.write(f"    {path}: pandas={pandas_value!r} sql={sql_value!r}")
+            else:
+                self.stdout.write(f"ok   {label}")
+
+        if sql_engine.df is not None:
+            failures += 1
+            self.stdout.write(self.style.ERROR("FAIL the SQL engine loaded the survey DataFrame"))
+        return failures
+
+    def _diff(self, expected, actual, path='$'):
+        """Return (path, pandas value, sql value) for every differing leaf."""
+        if isinstance(expected, dict) and isinstance(actual, dict):
+            differences = []
+            if path.endswith('district_distribution') and list(expected) != list(actual):
+                differences.append((f'{path} order', list(expected), list(actual)))
+            for key in sorted(set(expected) | set(actual), key=str):
+                differences.extend(self._diff(expected.get(key), actual.get(key), f'{path}.{key}'))
+            return differences
+        return [] if expected == actual else [(path, expected, actual)]
+
+    def _seed_responses(self, count, rnd):
+        """Insert ``count`` synthetic responses spread over the last two weeks."""
+        context = get_generic_questions_context()
+        g1_aspects = [key for key, _ in context['g1_aspects']]
+        g2_aspects = [key for key, _ in context['g2_aspects']]
+        matrix = [key for key, _ in context['g1_matrix_options']]
+
+        def choice(options, blank_rate=0.0):
+            return None if rnd.random() < blank_rate else rnd.choice(options)
+
+        def grid(aspects):
+            if rnd.random() < 0.1:
+                return {}
+            return {key: rnd.choice(matrix) for key in aspects if rnd.random() > 0.1}
+
+        batch_id = timezone.now().strftime('%H%M%S')
+        responses = [
+            SurveyResponse(
+                full_name=f'Parity Check {i}',
+                email=f'parity{i}@example.com',
+                province=rnd.choice(PROVINCES),
+                district=rnd.choice(DISTRICTS),
+                professional_role=rnd.choice(ROLES),
+                kii_consent=choice(['yes', 'no'], blank_rate=0.2),
+                g1_policy_impact=grid(g1_aspects),
+                g2_system_impact=grid(g2_aspects),
+                g3_technical_issues=choice([key for key, _ in context['g3_options']]),
+                g4_disruption=choice([key for key, _ in context['g4_options']], blank_rate=0.3),
+                g5_digital_literacy=choice([key for key, _ in context['g5_options']]),
+                reference_number=f'PAR{batch_id}{i:07d}',
+            )
+            for i in range(count)
+        ]
+        for response in responses:
+            response.set_role_flags()  # bulk_create() bypasses save()
+        created = SurveyResponse.objects.bulk_create(responses, batch_size=500)
+
+        now = timezone.now()
+        for response in created:
+            SurveyResponse.objects.filter(pk=response.pk).update(
+                submission_date=now - timedelta(days=rnd.randint(0, 14), minutes=rnd.randint(0, 1439))
+            )
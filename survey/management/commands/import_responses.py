@@ -0,0 +1,179 @@
+# survey/management/commands/import_responses.py
+import csv
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connections, transaction
+
+from survey.importer import IMPORT_CHUNK_SIZE, check_header, import_format, read_chunks, validate_chunk
+from survey.models import SurveyResponse, prepare_bulk_create
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Import offline (paper / spreadsheet) survey responses from a CSV or XLSX file in the CSV export "
+        "column layout. Rows are validated against the questionnaire in a process pool and inserted with "
+        "bulk_create; rejected rows are written to a reject report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file to import')
+        parser.add_argument('--sheet', help='XLSX worksheet to read (default: the first sheet)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows inserted per transaction')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help='Rows validated per worker task')
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Validation processes (0 or 1 validates in this process)',
+        )
+        parser.add_argument(
+            '--reject-report', help='CSV file for rejected rows (default: <path>.rejects.csv next to the input)'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Validate and write the reject report without saving')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f"File not found: {path}")
+        if import_format(path) is None:
+            raise CommandError("Only .csv and .xlsx files can be imported")
+        if options['batch_size'] < 1 or options['chunk_size'] < 1:
+            raise CommandError("--batch-size and --chunk-size must be positive")
+
+        started = time.monotonic()
+        chunks = read_chunks(path, chunk_size=options['chunk_size'], sheet=options['sheet'])
+        header = next(chunks, None)
+        if not header:
+            raise CommandError(f"{path} is empty")
+        unknown = check_header(header)
+        if unknown:
+            self.stdout.write(self.style.WARNING(f"Ignoring unknown columns: {', '.join(unknown)}"))
+
+        report_path = options['reject_report'] or f"{os.path.splitext(path)[0]}.rejects.csv"
+        self.imported = 0
+        self.rejected = 0
+        self.seen_references = set()
+        with open(report_path, 'w', encoding='utf-8', newline='') as report:
+            self.report = csv.writer(report)
+            self.report.writerow(['row', 'errors', *header])
+            batch = []
+            for row_number, row, values, errors in self._validated_rows(header, chunks, options['workers']):
+                if errors:
+                    self._reject(row_number, row, errors)
+                    continue
+                batch.append((row_number, row, values))
+                if len(batch) >= options['batch_size']:
+                    self._insert(batch, options['dry_run'])
+                    batch = []
+            self._insert(batch, options['dry_run'])
+
+        elapsed = time.monotonic() - started
+        verb = 'would import' if options['dry_run'] else 'imported'
+        logger.info(f"import_responses {path}: {verb} {self.imported}, rejected {self.rejected} in {elapsed:.1f}s")
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb.capitalize()} {self.imported} responses, rejected {self.rejected} in {elapsed:.1f}s"
+        ))
+        if self.rejected:
+            self.stdout.write(f"Reject report: {report_path}")
+
+    def _validated_rows(self, header, chunks, workers):
+        """Yield (row number, raw row, values, errors) in file order, validating chunks in a process pool.
+
+        At most two chunks per worker are in flight, so the file is read only as fast as it is validated.
+        """
+        if workers <= 1:
+            for chunk in chunks:
+                yield from self._merge(chunk, validate_chunk(header, chunk))
+            return
+
+        # Forked workers must not inherit open database connections; validation does not use them
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append((chunk, executor.submit(validate_chunk, header, chunk)))
+                if len(pending) >= workers * 2:
+                    chunk, future = pending.popleft()
+                    yield from self._merge(chunk, future.result())
+            while pending:
+                chunk, future = pending.popleft()
+                yield from self._merge(chunk, future.result())
+
+    def _merge(self, chunk, results):
+        for (_, row), (row_number, values, errors) in zip(chunk, results):
+            yield row_number, row, values, errors
+
+    def _reject(self, row_number, row, errors):
+        self.rejected += 1
+        self.report.writerow([row_number, '; '.join(errors), *row])
+
+    def _insert(self, batch, dry_run):
+        """Insert one batch of valid rows in a transaction; rows that cannot be stored are rejected."""
+        accepted = []
+        references = [values['reference_number'] for _, _, values in batch if values['reference_number']]
+        existing = set(
+            SurveyResponse.objects.filter(reference_number__in=references).values_list('reference_number', flat=True)
+        )
+        for row_number, row, values in batch:
+            reference = values['reference_number']
+            if reference and (reference in existing or reference in self.seen_references):
+                self._reject(row_number, row, [f"Reference number {reference} has already been imported"])
+                continue
+            if reference:
+                self.seen_references.add(reference)
+            values = dict(values)
+            submission_date = values.pop('submission_date')
+            accepted.append((row_number, row, SurveyResponse(**values), submission_date))
+        if not accepted:
+            return
+
+        responses = prepare_bulk_create([response for _, _, response, _ in accepted])
+        if dry_run:
+            self.imported += len(responses)
+            return
+        dated = [(response, submission_date) for _, _, response, submission_date in accepted if submission_date]
+        try:
+            with transaction.atomic():
+                SurveyResponse.objects.bulk_create(responses)
+                self._restore_submission_dates(dated)
+            self.imported += len(responses)
+        except IntegrityError:
+            # A reference number was taken concurrently: retry row by row, drawing new numbers for the
+            # rows that did not bring their own, so only rows clashing on a file reference are lost
+            for row_number, row, response, submission_date in accepted:
+                if response.reference_number not in self.seen_references:
+                    response.reference_number = ''
+                try:
+                    with transaction.atomic():
+                        response.save(force_insert=True)
+                        if submission_date:
+                            self._restore_submission_dates([(response, submission_date)])
+                    self.imported += 1
+                except IntegrityError as e:
+                    self._reject(row_number, row, [f"Could not be stored: {e}"])
+
+    def _restore_submission_dates(self, dated):
+        """Set the collection dates from the file on inserted rows (auto_now_add set them to now on insert).
+
+        Args:
+            dated (list): (inserted SurveyResponse, submission datetime) pairs.
+        """
+        if not dated:
+            return
+        missing_pks = [response for response, _ in dated if response.pk is None]
+        if missing_pks:
+            # Backends that do not return ids from bulk_create: look them up by the unique reference number
+            pks = dict(SurveyResponse.objects.filter(
+                reference_number__in=[response.reference_number for response in missing_pks]
+            ).values_list('reference_number', 'pk'))
+            for response in missing_pks:
+                response.pk = pks[response.reference_number]
+        for response, submission_date in dated:
+            response.submission_date = submission_date
+        SurveyResponse.objects.bulk_update([response for response, _ in dated], ['submission_date'])
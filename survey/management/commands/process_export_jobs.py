@@ -0,0 +1,93 @@
+# survey/management/commands/process_export_jobs.py
+import logging
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from survey.exports import run_export_job
+from survey.models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Run queued export jobs (the export worker). Runs until interrupted unless --once is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Process the pending jobs, then exit')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between queue checks')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Export worker started (files in {settings.EXPORT_JOB_DIR})")
+        while True:
+            close_old_connections()
+            self._fail_stale_jobs()
+            self._delete_expired_files()
+
+            job = self._claim_next_job()
+            if job is not None:
+                self._run(job)
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
+
+    def _claim_next_job(self):
+        """Atomically move the oldest pending job to running; None if the queue is empty."""
+        for job in ExportJob.objects.filter(status=ExportJob.STATUS_PENDING).order_by('created_at')[:5]:
+            claimed = ExportJob.objects.filter(pk=job.pk, status=ExportJob.STATUS_PENDING).update(
+                status=ExportJob.STATUS_RUNNING, started_at=timezone.now()
+            )
+            if claimed:
+                job.refresh_from_db()
+                return job
+        return None
+
+    def _run(self, job):
+        self.stdout.write(f"Running {job}")
+        try:
+            run_export_job(job)
+            job.status = ExportJob.STATUS_COMPLETED
+            self.stdout.write(self.style.SUCCESS(f"Finished {job.filename} ({job.rows_total} responses)"))
+        except Exception as e:
+            logger.error(f"Export job {job.pk} failed: {e}", exc_info=True)
+            job.status = ExportJob.STATUS_FAILED
+            job.error = str(e)
+            self._remove_file(job)
+            self.stdout.write(self.style.ERROR(f"Export job {job.pk} failed: {e}"))
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'rows_done', 'file_path', 'finished_at'])
+
+    def _fail_stale_jobs(self):
+        """Fail running jobs older than EXPORT_JOB_TIMEOUT_MINUTES (their worker died) and remove their partial files."""
+        cutoff = timezone.now() - timedelta(minutes=settings.EXPORT_JOB_TIMEOUT_MINUTES)
+        for job in ExportJob.objects.filter(status=ExportJob.STATUS_RUNNING, started_at__lt=cutoff):
+            failed = ExportJob.objects.filter(pk=job.pk, status=ExportJob.STATUS_RUNNING).update(
+                status=ExportJob.STATUS_FAILED, finished_at=timezone.now(),
+                error=f"Export did not finish within {settings.EXPORT_JOB_TIMEOUT_MINUTES} minutes",
+            )
+            if failed:
+                logger.warning(f"Export job {job.pk} timed out while running; marked as failed")
+                self._remove_file(job)
+                job.save(update_fields=['file_path'])
+
+    def _remove_file(self, job):
+        """Delete the job's (possibly partial) file and clear file_path; the caller saves the job."""
+        if job.file_path and os.path.exists(job.file_path):
+            os.remove(job.file_path)
+        job.file_path = ''
+
+    def _delete_expired_files(self):
+        """Remove files of completed or failed jobs older than EXPORT_JOB_RETENTION_HOURS."""
+        cutoff = timezone.now() - timedelta(hours=settings.EXPORT_JOB_RETENTION_HOURS)
+        expired = ExportJob.objects.filter(
+            status__in=[ExportJob.STATUS_COMPLETED, ExportJob.STATUS_FAILED], finished_at__lt=cutoff
+        ).exclude(file_path='')
+        for job in expired:
+            self._remove_file(job)
+            job.save(update_fields=['file_path'])
@@ -0,0 +1,185 @@
+# survey/metrics.py
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+_metrics_settings = getattr(settings, 'REQUEST_METRICS', {})
+
+# Record per-view latency / query / size samples (RequestMetricsMiddleware)
+REQUEST_METRICS_ENABLED = _metrics_settings.get('ENABLED', True)
+# Samples kept per view and measure; percentiles cover this most recent window
+REQUEST_METRICS_SAMPLE_SIZE = _metrics_settings.get('SAMPLE_SIZE', 1024)
+
+# Measures recorded for every request, in display order
+MEASURES = ('latency_ms', 'query_count', 'query_ms', 'response_bytes')
+PERCENTILES = (50, 95, 99)
+
+
+class Histogram:
+    """Fixed-size window of recent samples with lifetime count, total and maximum.
+
+    ``record()`` is an O(1) append; percentiles are only computed when a summary
+    is read, so recording stays cheap on the request path.
+    """
+
+    def __init__(self, size):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def summary(self):
+        """Return count, mean, max and p50/p95/p99 (nearest rank over the sample window)."""
+        ordered = sorted(self.samples)
+        summary = {
+            'count': self.count,
+            'mean': round(self.total / self.count, 2) if self.count else 0,
+            'max': round(self.max, 2),
+        }
+        for percentile in PERCENTILES:
+            if ordered:
+                rank = max(int(round(percentile / 100 * len(ordered))) - 1, 0)
+                summary[f'p{percentile}'] = round(ordered[rank], 2)
+            else:
+                summary[f'p{percentile}'] = 0
+        return summary
+
+
+class RequestMetrics:
+    """In-process per-view histograms of latency, SQL query count, SQL time and response size.
+
+    Each worker process keeps its own numbers; they reset when the process restarts.
+    """
+
+    def __init__(self, sample_size=REQUEST_METRICS_SAMPLE_SIZE):
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._views = {}
+        self.started_at = time.time()
+
+    def record(self, view_name, status_code, **measures):
+        """Add one request's measures to the histograms of ``view_name``.
+
+        Args:
+            view_name (str): Resolved view name, e.g. 'survey:final_remarks'.
+            status_code (int): HTTP status of the response.
+            **measures: Values for the names in MEASURES; None values are skipped.
+        """
+        with self._lock:
+            view = self._views.get(view_name)
+            if view is None:
+                view = self._views[view_name] = {
+                    'histograms': {measure: Histogram(self.sample_size) for measure in MEASURES},
+                    'errors': 0,
+                }
+            for measure, value in measures.items():
+                if value is not None:
+                    view['histograms'][measure].record(value)
+            if status_code >= 500:
+                view['errors'] += 1
+
+    def snapshot(self):
+        """Return the p50/p95/p99 summaries of every view, busiest first.
+
+        Returns:
+            dict: started_at, sample_size and a list of views with one summary per measure.
+        """
+        with self._lock:
+            views = [
+                {
+                    'view': view_name,
+                    'requests': view['histograms']['latency_ms'].count,
+                    'errors': view['errors'],
+                    **{measure: histogram.summary() for measure, histogram in view['histograms'].items()},
+                }
+                for view_name, view in self._views.items()
+            ]
+        views.sort(key=lambda view: view['requests'], reverse=True)
+        return {
+            'started_at': self.started_at,
+            'sample_size': self.sample_size,
+            'views': views,
+        }
+
+    def reset(self):
+        """Forget every sample recorded so far."""
+        with self._lock:
+            self._views = {}
+            self.started_at = time.time()
+
+
+# Shared by the middleware and the metrics views of this process.
+request_metrics = RequestMetrics()
+
+
+class QueryCounter:
+    """connection.execute_wrapper hook that counts queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+class RequestMetricsMiddleware:
+    """Record latency, query count, query time and response size per resolved view.
+
+    Listed first in MIDDLEWARE so the timings include the other middleware (session
+    saves, authentication). Streaming responses are measured up to the point the
+    response is returned; queries run while the body streams are not counted, and
+    their size is unknown. Requests that do not resolve to a view are ignored.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not REQUEST_METRICS_ENABLED:
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        latency = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return response
+
+        if getattr(response, 'streaming', False):
+            response_bytes = None
+        else:
+            response_bytes = len(response.content)
+        try:
+            request_metrics.record(
+                match.view_name or match._func_path,
+                response.status_code,
+                latency_ms=latency * 1000,
+                query_count=counter.count,
+                query_ms=counter.seconds * 1000,
+                response_bytes=response_bytes,
+            )
+        except Exception as e:
+            logger.error(f"Failed to record request metrics for {request.path}: {e}")
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survey', '0009_exportjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='export_type',
+            field=models.CharField(choices=[('excel', 'Excel'), ('spss', 'SPSS (CSV)'), ('parquet', 'Parquet'), ('arrow', 'Arrow IPC')], default='excel', max_length=10),
+        ),
+    ]
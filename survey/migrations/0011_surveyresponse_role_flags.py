@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-17 21:19
+
+from django.db import migrations, models
+
+# Same rule as survey.models.parse_professional_roles: comma-separated roles, legacy 'both' = both roles
+BACKFILL_ROLE_FLAGS_SQL = """
+UPDATE survey_surveyresponse SET
+    is_legal = ((',' || REPLACE(COALESCE(professional_role, ''), ' ', '') || ',') LIKE '%,legal,%'
+                OR (',' || REPLACE(COALESCE(professional_role, ''), ' ', '') || ',') LIKE '%,both,%'),
+    is_customs = ((',' || REPLACE(COALESCE(professional_role, ''), ' ', '') || ',') LIKE '%,customs,%'
+                  OR (',' || REPLACE(COALESCE(professional_role, ''), ' ', '') || ',') LIKE '%,both,%')
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survey', '0010_exportjob_columnar_types'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='surveyresponse',
+            name='is_customs',
+            field=models.BooleanField(db_index=True, default=False, help_text='Respondent holds the customs agent role'),
+        ),
+        migrations.AddField(
+            model_name='surveyresponse',
+            name='is_legal',
+            field=models.BooleanField(db_index=True, default=False, help_text='Respondent holds the legal practitioner role'),
+        ),
+        migrations.AddIndex(
+            model_name='surveyresponse',
+            index=models.Index(fields=['province', 'is_legal', 'is_customs'], name='survey_resp_prov_roles_idx'),
+        ),
+        migrations.RunSQL(BACKFILL_ROLE_FLAGS_SQL, migrations.RunSQL.noop),
+    ]
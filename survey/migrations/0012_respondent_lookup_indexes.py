@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-17 21:20
+
+from django.db import migrations, models
+
+
+def backfill_email_normalized(apps, schema_editor):
+    """Fill email_normalized for existing rows (same rule as survey.models.normalize_email)."""
+    SurveyResponse = apps.get_model('survey', 'SurveyResponse')
+    batch = []
+    for response in SurveyResponse.objects.only('id', 'email').iterator(chunk_size=1000):
+        response.email_normalized = (response.email or '').strip().lower()
+        batch.append(response)
+        if len(batch) >= 1000:
+            SurveyResponse.objects.bulk_update(batch, ['email_normalized'])
+            batch = []
+    if batch:
+        SurveyResponse.objects.bulk_update(batch, ['email_normalized'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survey', '0011_surveyresponse_role_flags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='surveyresponse',
+            name='email_normalized',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AlterField(
+            model_name='surveyresponse',
+            name='submission_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.RunPython(backfill_email_normalized, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-17 21:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('survey', '0012_respondent_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='surveyresponse',
+            index=models.Index(models.Func(models.F('g1_policy_impact'), models.Value('$.service_delivery'), function='json_extract', output_field=models.TextField()), condition=models.Q(models.Func(models.F('g1_policy_impact'), function='json_valid', output_field=models.BooleanField())), name='sr_g1_service_delivery_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='surveyresponse',
+            index=models.Index(models.Func(models.F('g2_system_impact'), models.Value('$.workflow_efficiency'), function='json_extract', output_field=models.TextField()), condition=models.Q(models.Func(models.F('g2_system_impact'), function='json_valid', output_field=models.BooleanField())), name='sr_g2_workflow_efficiency_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='surveyresponse',
+            index=models.Index(models.F('is_legal'), models.F('is_customs'), models.F('province'), models.Func(models.F('g1_policy_impact'), models.Value('$.service_delivery'), function='json_extract', output_field=models.TextField()), models.Func(models.F('g2_system_impact'), models.Value('$.workflow_efficiency'), function='json_extract', output_field=models.TextField()), models.F('experience_legal'), condition=models.Q(models.Func(models.F('g1_policy_impact'), function='json_valid', output_field=models.BooleanField())), name='sr_advanced_analytics_idx'),
+        ),
+    ]
@@ -1,33 +1,86 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import BooleanField, F, Func, Q, TextField, Value
 import uuid
 import json
 
+from survey.questionnaire import (
+    GRID, KII_CONSENT, LP5_FUNCTIONS, PROVINCES, QUESTIONS, XS_LEVELS, XS_QUESTIONS, choice_label, grid_display,
+)
+
+# Role -> indexed boolean column recording membership in it
+ROLE_FLAG_FIELDS = {'legal': 'is_legal', 'customs': 'is_customs'}
+
+
+def parse_professional_roles(value):
+    """Return the set of roles in a professional_role value ('legal', 'legal,customs', legacy 'both')."""
+    roles = {role.strip() for role in (value or '').split(',') if role.strip()}
+    if 'both' in roles:
+        roles.discard('both')
+        roles.update(ROLE_FLAG_FIELDS)
+    return roles
+
+
+# JSON paths the analytics SQL groups on: name -> (column, key). Each path gets an expression
+# index (SurveyResponse.Meta.indexes); raw SQL must spell the path with json_path_sql() so that
+# SQLite matches it to the indexed expression instead of parsing every row's JSON.
+ANALYTICS_JSON_PATHS = {
+    'g1_service_delivery': ('g1_policy_impact', 'service_delivery'),
+    'g2_workflow_efficiency': ('g2_system_impact', 'workflow_efficiency'),
+}
+
+
+def json_path_sql(name, alias=''):
+    """Return the SQL for an ANALYTICS_JSON_PATHS entry, e.g. json_extract(g1_policy_impact, '$.service_delivery')."""
+    column, key = ANALYTICS_JSON_PATHS[name]
+    prefix = f'{alias}.' if alias else ''
+    return f"json_extract({prefix}{column}, '$.{key}')"
+
+
+def json_path_expression(name):
+    """Return the ANALYTICS_JSON_PATHS entry as an ORM expression (compiles to json_path_sql())."""
+    column, key = ANALYTICS_JSON_PATHS[name]
+    return Func(F(column), Value(f'$.{key}'), function='json_extract', output_field=TextField())
+
+
+def json_valid_condition(column):
+    """Index condition json_valid(column); queries filtering on it can use the partial index."""
+    return Q(Func(F(column), function='json_valid', output_field=BooleanField()))
+
+
+def normalize_email(email):
+    """Return the email in the form used for respondent lookups (trimmed, lower-case)."""
+    return (email or '').strip().lower()
+
+
+def new_reference_number():
+    """Return a new random reference number ('FBR' + 8 hex digits)."""
+    return f"FBR{str(uuid.uuid4())[:8].upper()}"
+
+
 class SurveyResponse(models.Model):
     # Basic Information
     full_name = models.CharField(max_length=200, help_text="RI1: Respondent's full name")
     email = models.EmailField(help_text="RI2: Respondent's email address")
+    # normalize_email(email), set in save(); indexed for resolving returning respondents
+    email_normalized = models.CharField(max_length=254, blank=True, default='', db_index=True, editable=False)
     mobile = models.CharField(max_length=20, blank=True, null=True, help_text="RI3: Mobile number (optional)")  # O - FIXED: Added null=True
     province = models.CharField(
         max_length=20,
-        choices=[
-            ('ajk', 'Azad Jammu and Kashmir'),
-            ('balochistan', 'Balochistan'),
-            ('gb', 'Gilgit-Baltistan'),
-            ('ict', 'ICT'),
-            ('kpk', 'Khyber Pakhtunkhwa'),
-            ('punjab', 'Punjab'),
-            ('sindh', 'Sindh'),
-        ],
+        choices=list(PROVINCES.choices),
         help_text="RI4: Province of residence"
     )
     district = models.CharField(max_length=100, help_text="RI5: District of residence (standard or custom)")
 
     # Professional Information
     professional_role = models.CharField(max_length=20, help_text="RI6: Professional role(s) as comma-separated values (e.g., 'legal', 'customs', 'legal,customs')")  # R
+    # Role membership parsed from professional_role in save(); indexed for quota and cross-tab filters
+    is_legal = models.BooleanField(default=False, db_index=True, help_text="Respondent holds the legal practitioner role")
+    is_customs = models.BooleanField(default=False, db_index=True, help_text="Respondent holds the customs agent role")
     experience_legal = models.CharField(max_length=20, blank=True, null=True, help_text="RI8: Years of experience as Legal Practitioner (if applicable)")  # O - CORRECT
     experience_customs = models.CharField(max_length=20, blank=True, null=True, help_text="RI9: Years of experience as Customs Agent (if applicable)")  # O - CORRECT
     practice_areas = models.CharField(max_length=100, blank=True, null=True, help_text="RI7: Primary practice areas as comma-separated values (e.g., 'income_tax,sales_tax')")  # O - FIXED: Added null=True
-    kii_consent = models.CharField(max_length=3, choices=[('yes', 'Yes'), ('no', 'No')], blank=True, null=True, help_text="RI10: Consent for follow-up interview")  # O - FIXED: Added null=True
+    kii_consent = models.CharField(max_length=3, choices=list(KII_CONSENT.choices), blank=True, null=True, help_text="RI10: Consent for follow-up interview")  # O - FIXED: Added null=True
 
     # Generic Questions (G1-G5)
     g1_policy_impact = models.JSONField(default=dict, help_text="G1: Policy impact matrix (e.g., {'service_delivery': 'positive', ...})")  # R
@@ -89,167 +142,95 @@ class SurveyResponse(models.Model):
     )  # O - CORRECT
 
     # Metadata
-    submission_date = models.DateTimeField(auto_now_add=True)
+    submission_date = models.DateTimeField(auto_now_add=True, db_index=True)
     reference_number = models.CharField(max_length=20, unique=True)
+    # Token of the final-remarks form that submitted this row; makes resubmits idempotent (survey/submission.py)
+    submission_token = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
 
     def __str__(self):
         return f"{self.full_name} - {self.reference_number}"
 
     def save(self, *args, **kwargs):
         if not self.reference_number:
-            self.reference_number = f"FBR{str(uuid.uuid4())[:8].upper()}"
+            self.reference_number = new_reference_number()
+        self.set_role_flags()
+        self.email_normalized = normalize_email(self.email)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'professional_role' in update_fields:
+                update_fields |= set(ROLE_FLAG_FIELDS.values())
+            if 'email' in update_fields:
+                update_fields.add('email_normalized')
+            kwargs['update_fields'] = update_fields
         super().save(*args, **kwargs)
 
-    # Display Methods for G1-G5
+    def set_role_flags(self):
+        """Set is_legal / is_customs from professional_role.
+
+        save() calls this; rows written with bulk_create() must go through
+        prepare_bulk_create(), and rows changed with QuerySet.update() must be fixed up
+        with the backfill_role_flags command.
+        """
+        roles = parse_professional_roles(self.professional_role)
+        for role, field in ROLE_FLAG_FIELDS.items():
+            setattr(self, field, role in roles)
+
+    @property
+    def role_category(self):
+        """Canonical role: 'legal', 'customs', 'both', or '' if no role is recorded."""
+        if self.is_legal and self.is_customs:
+            return 'both'
+        return 'legal' if self.is_legal else 'customs' if self.is_customs else ''
+
+    # Display Methods (labels from survey.questionnaire, or pre-decoded in bulk by
+    # survey.codebook.decode_responses into self.decoded_labels)
+    def _display(self, field):
+        decoded = getattr(self, 'decoded_labels', None)
+        if decoded and field in decoded:
+            return decoded[field]
+        if QUESTIONS[field].kind == GRID:
+            return grid_display(field, getattr(self, field))
+        return choice_label(field, getattr(self, field))
+
     def get_g1_policy_impact_display(self):
-        mapping = {
-            'very_positive': 'Very Positive', 'positive': 'Positive', 'neutral': 'Neutral',
-            'negative': 'Negative', 'very_negative': 'Very Negative', 'na': 'N/A', 'dont_know': 'Don\'t Know'
-        }
-        return {k: mapping.get(v, v) for k, v in (self.g1_policy_impact or {}).items()}
+        return self._display('g1_policy_impact')
 
     def get_g2_system_impact_display(self):
-        mapping = {
-            'very_positive': 'Very Positive', 'positive': 'Positive', 'neutral': 'Neutral',
-            'negative': 'Negative', 'very_negative': 'Very Negative', 'na': 'N/A', 'dont_know': 'Don\'t Know'
-        }
-        return {k: mapping.get(v, v) for k, v in (self.g2_system_impact or {}).items()}
+        return self._display('g2_system_impact')
 
     def get_g3_technical_issues_display(self):
-        mapping = {
-            'daily': 'Daily', 'weekly': 'Weekly', 'monthly': 'Monthly', 'rarely': 'Rarely',
-            'never': 'Never', 'dont_know': 'Don\'t Know'
-        }
-        return mapping.get(self.g3_technical_issues, self.g3_technical_issues)
+        return self._display('g3_technical_issues')
 
     def get_g4_disruption_display(self):
-        mapping = {
-            'very_significantly': 'Very significantly', 'significantly': 'Significantly',
-            'minimally': 'Minimally', 'not_at_all': 'Not at all'
-        }
-        return mapping.get(self.g4_disruption, self.g4_disruption) if self.g4_disruption else ''
+        return self._display('g4_disruption') if self.g4_disruption else ''
 
     def get_g5_digital_literacy_display(self):
-        mapping = {
-            'very_significantly': 'Very significantly', 'significantly': 'Significantly', 'neutral': 'Neutral',
-            'minimally': 'Minimally', 'not_at_all': 'Not at all', 'dont_know': 'Don\'t Know'
-        }
-        return mapping.get(self.g5_digital_literacy, self.g5_digital_literacy)
+        return self._display('g5_digital_literacy')
 
     # Display Methods for Legal Practitioner Questions
     def get_lp1_digital_support_display(self):
-        mapping = {
-            'great_extent': 'To a great extent',
-            'considerable_extent': 'To a considerable extent', 
-            'moderate_extent': 'To a moderate extent',
-            'slight_extent': 'To a slight extent',
-            'not_at_all': 'Not at all'
-        }
-        return mapping.get(self.lp1_digital_support, self.lp1_digital_support)
+        return self._display('lp1_digital_support')
 
     def get_lp2_challenges_display(self):
         """Format LP2 grid data for display"""
-        if not self.lp2_challenges:
-            return {}
-        
-        function_mapping = {
-            'appeals_commissioner': 'Appeal filings before Commissioner (S.127)',
-            'appellate_tribunal': 'Appellate Tribunal representations (S.132)',
-            'high_court': 'High Court/Supreme Court references',
-            'audit_responses': 'Audit responses & compliance (S.177)',
-            'show_cause': 'Show cause notice responses (S.122)'
-        }
-        
-        level_mapping = {
-            'no_challenge': 'No Challenge',
-            'minor_challenge': 'Minor Challenge', 
-            'moderate_challenge': 'Moderate Challenge',
-            'major_challenge': 'Major Challenge',
-            'dont_perform': "Don't Perform"
-        }
-        
-        return {
-            function_mapping.get(func, func): level_mapping.get(level, level)
-            for func, level in self.lp2_challenges.items()
-        }
+        return self._display('lp2_challenges')
 
     def get_lp3_challenges_display(self):
         """Format LP3 grid data for display"""
-        if not self.lp3_challenges:
-            return {}
-        
-        function_mapping = {
-            'return_filing': 'Return filing & compliance (S.114)',
-            'amendments': 'Return amendments & rectifications',
-            'withholding': 'Withholding statements & compliance', 
-            'risk_assessment': 'Risk assessment procedures (S.122A)',
-            'tax_planning': 'Tax planning advisory services'
-        }
-        
-        level_mapping = {
-            'no_challenge': 'No Challenge',
-            'minor_challenge': 'Minor Challenge',
-            'moderate_challenge': 'Moderate Challenge',
-            'major_challenge': 'Major Challenge', 
-            'dont_perform': "Don't Perform"
-        }
-        
-        return {
-            function_mapping.get(func, func): level_mapping.get(level, level)
-            for func, level in self.lp3_challenges.items()
-        }
+        return self._display('lp3_challenges')
 
     def get_lp4_challenges_display(self):
         """Format LP4 grid data for display"""
-        if not self.lp4_challenges:
-            return {}
-        
-        function_mapping = {
-            'adr': 'Alternate Dispute Resolution (S.134A)',
-            'settlement': 'Settlement procedures',
-            'epayments': 'e-Payments & refund processing',
-            'cpr_corrections': 'CPR corrections',
-            'correspondence': 'FBR correspondence management'
-        }
-        
-        level_mapping = {
-            'no_challenge': 'No Challenge',
-            'minor_challenge': 'Minor Challenge',
-            'moderate_challenge': 'Moderate Challenge',
-            'major_challenge': 'Major Challenge',
-            'dont_perform': "Don't Perform"
-        }
-        
-        return {
-            function_mapping.get(func, func): level_mapping.get(level, level)
-            for func, level in self.lp4_challenges.items()
-        }
+        return self._display('lp4_challenges')
 
     def get_lp5_tax_types_display(self):
         """Format LP5 tax-type data for display"""
         if not self.lp5_tax_types:
             return {}
         
-        function_mapping = {
-            'appeals_commissioner': 'Appeal filings before Commissioner',
-            'appellate_tribunal': 'Appellate Tribunal representations',
-            'high_court': 'High Court/Supreme Court references',
-            'audit_responses': 'Audit responses & compliance',
-            'show_cause': 'Show cause notice responses',
-            'return_filing': 'Return filing & compliance',
-            'amendments': 'Return amendments & rectifications',
-            'withholding': 'Withholding statements & compliance',
-            'risk_assessment': 'Risk assessment procedures',
-            'tax_planning': 'Tax planning advisory services',
-            'adr': 'Alternate Dispute Resolution',
-            'settlement': 'Settlement procedures',
-            'epayments': 'e-Payments & refund processing',
-            'cpr_corrections': 'CPR corrections',
-            'correspondence': 'FBR correspondence management'
-        }
-        
         return {
-            function_mapping.get(func, func): {
+            LP5_FUNCTIONS.label(func): {
                 'income_tax': data.get('income_tax', False),
                 'sales_tax': data.get('sales_tax', False)
             }
@@ -258,100 +239,24 @@ class SurveyResponse(models.Model):
 
     # Display Methods for Customs Agent Questions
     def get_ca1_training_display(self):
-        mapping = {
-            'effective_both': 'Yes, effective training on both WeBOC and PSW',
-            'needs_improvement': 'Yes, but training needs improvement',
-            'no_training': 'No formal training received',
-            'not_applicable': 'Not applicable'
-        }
-        return mapping.get(self.ca1_training, self.ca1_training)
+        return self._display('ca1_training')
 
     def get_ca2_system_integration_display(self):
-        mapping = {
-            'very_well': 'Very well integrated',
-            'well': 'Well integrated',
-            'moderately': 'Moderately integrated',
-            'poorly': 'Poorly integrated',
-            'not_integrated': 'Not integrated'
-        }
-        return mapping.get(self.ca2_system_integration, self.ca2_system_integration)
+        return self._display('ca2_system_integration')
 
     def get_ca3_challenges_display(self):
         """Format CA3 grid data for display"""
-        if not self.ca3_challenges:
-            return {}
-        
-        function_mapping = {
-            'goods_declaration': 'Goods Declaration (S.79)',
-            'duty_assessment': 'Duty Assessment (S.81)',
-            'cargo_examination': 'Cargo Examination (S.26)',
-            'document_processing': 'Document Processing (S.79(2))',
-            'transit_warehousing': 'Transit/Warehousing (S.13, S.15)',
-            'record_keeping': 'Record Keeping (S.155(6))',
-            'audit_compliance': 'Audit Compliance (S.26A)',
-            'license_compliance': 'License Compliance (S.155(4))'
-        }
-        
-        level_mapping = {
-            'no_challenge': 'No Challenge',
-            'minor_challenge': 'Minor',
-            'moderate_challenge': 'Moderate', 
-            'major_challenge': 'Major',
-            'not_applicable': 'N/A'
-        }
-        
-        return {
-            function_mapping.get(func, func): level_mapping.get(level, level)
-            for func, level in self.ca3_challenges.items()
-        }
+        return self._display('ca3_challenges')
 
     def get_ca4_effectiveness_display(self):
         """Format CA4 grid data for display"""
-        if not self.ca4_effectiveness:
-            return {}
-        
-        process_mapping = {
-            'duty_assessment': 'Duty assessment',
-            'cargo_examination': 'Cargo examination',
-            'system_reliability': 'System reliability',
-            'client_representation': 'Client representation'
-        }
-        
-        level_mapping = {
-            'very_effective': 'Very Effective',
-            'effective': 'Effective',
-            'neutral': 'Neutral',
-            'ineffective': 'Ineffective',
-            'very_ineffective': 'Very Ineffective'
-        }
-        
-        return {
-            process_mapping.get(process, process): level_mapping.get(level, level)
-            for process, level in self.ca4_effectiveness.items()
-        }
+        return self._display('ca4_effectiveness')
 
     def get_ca5_policy_impact_display(self):
-        mapping = {
-            'very_positively': 'Very positively',
-            'positively': 'Positively',
-            'neutral': 'Neutral', 
-            'negatively': 'Negatively',
-            'very_negatively': 'Very negatively'
-        }
-        return mapping.get(self.ca5_policy_impact, self.ca5_policy_impact)
+        return self._display('ca5_policy_impact')
 
     def get_ca6_biggest_challenge_display(self):
-        mapping = {
-            'system_issues': 'System reliability and performance issues',
-            'policy_changes': 'Frequent policy or procedural changes',
-            'assessment_unpredictability': 'Unpredictable assessment outcomes',
-            'documentation_delays': 'Documentation processing delays',
-            'cargo_bottlenecks': 'Cargo examination bottlenecks',
-            'compliance_burden': 'Compliance and record-keeping burden',
-            'coordination_issues': 'Inter-agency coordination challenges',
-            'training_gaps': 'Training and knowledge gaps'
-        }
-        return mapping.get(self.ca6_biggest_challenge, self.ca6_biggest_challenge)
+        return self._display('ca6_biggest_challenge')
 
     # Display Method for Cross-System Questions
     def get_cross_system_answers_display(self):
@@ -359,29 +264,12 @@ class SurveyResponse(models.Model):
         cross_data = self.get_cross_system_data()
         if not cross_data or cross_data.get('skipped'):
             return {'status': 'Section Skipped'}
-            
-        level_mapping = {
-            'always': 'Always / Almost Always',
-            'often': 'Often',
-            'sometimes': 'Sometimes',
-            'rarely': 'Rarely',
-            'never': 'Never / Almost Never',
-            'not_applicable': 'Not Applicable / Don\'t know'
+
+        return {
+            XS_QUESTIONS.labels[key]: XS_LEVELS.label(cross_data[key])
+            for key in XS_QUESTIONS.codes
+            if key in cross_data
         }
-        
-        display_data = {}
-        
-        # XS1: Data Discrepancy/Reconciliation
-        xs1_key = 'xs1_data_discrepancy'
-        if xs1_key in cross_data:
-            display_data['XS1. Data Discrepancy/Reconciliation'] = level_mapping.get(cross_data[xs1_key], cross_data[xs1_key])
-            
-        # XS2: Unified Legal/Policy Interpretation
-        xs2_key = 'xs2_policy_consistency'
-        if xs2_key in cross_data:
-            display_data['XS2. Policy Consistency'] = level_mapping.get(cross_data[xs2_key], cross_data[xs2_key])
-            
-        return display_data
 
     # Utility Methods
     def get_cross_system_data(self):
@@ -394,7 +282,7 @@ class SurveyResponse(models.Model):
 
     def has_legal_answers(self):
         """Check if legal practitioner questions were answered"""
-        return self.professional_role in ['legal', 'both'] and any([
+        return self.is_legal and any([
             self.lp1_digital_support,
             self.lp2_challenges,
             self.lp3_challenges,
@@ -405,7 +293,7 @@ class SurveyResponse(models.Model):
 
     def has_customs_answers(self):
         """Check if customs agent questions were answered"""
-        return self.professional_role in ['customs', 'both'] and any([
+        return self.is_customs and any([
             self.ca1_training,
             self.ca2_system_integration,
             self.ca3_challenges,
@@ -424,4 +312,104 @@ class SurveyResponse(models.Model):
     class Meta:
         verbose_name = "Survey Response"
         verbose_name_plural = "Survey Responses"
-        ordering = ['-submission_date']
\ No newline at end of file
+        ordering = ['-submission_date']
+        indexes = [
+            # Covers the quota GROUP BY (province x role flags) without touching the table
+            models.Index(fields=['province', 'is_legal', 'is_customs'], name='survey_resp_prov_roles_idx'),
+            # One expression index per hot JSON path
+            *[
+                models.Index(
+                    json_path_expression(name), name=f'sr_{name}_idx',
+                    condition=json_valid_condition(ANALYTICS_JSON_PATHS[name][0]),
+                )
+                for name in ANALYTICS_JSON_PATHS
+            ],
+            # Covers get_advanced_analytics: role flags x province x JSON paths x experience
+            models.Index(
+                F('is_legal'), F('is_customs'), F('province'),
+                *[json_path_expression(name) for name in ANALYTICS_JSON_PATHS],
+                F('experience_legal'),
+                name='sr_advanced_analytics_idx',
+                condition=json_valid_condition('g1_policy_impact'),
+            ),
+        ]
+
+
+def prepare_bulk_create(responses):
+    """Fill in what SurveyResponse.save() would for rows about to be bulk_create()d.
+
+    Role flags and the normalized email are set per object; missing reference numbers
+    are drawn for the whole batch and checked against the table with one query per
+    round (collisions are redrawn, which is rare with 32-bit random numbers).
+
+    Args:
+        responses (list): Unsaved SurveyResponse objects.
+
+    Returns:
+        list: The objects.
+    """
+    taken = {response.reference_number for response in responses if response.reference_number}
+    missing = [response for response in responses if not response.reference_number]
+    while missing:
+        drawn = {}
+        for response in missing:
+            number = new_reference_number()
+            if number not in taken and number not in drawn:
+                drawn[number] = response
+        existing = set(
+            SurveyResponse.objects.filter(reference_number__in=list(drawn)).values_list('reference_number', flat=True)
+        )
+        for number, response in drawn.items():
+            if number not in existing:
+                response.reference_number = number
+                taken.add(number)
+        missing = [response for response in missing if not response.reference_number]
+
+    for response in responses:
+        response.set_role_flags()
+        response.email_normalized = normalize_email(response.email)
+    return responses
+
+
+class ExportJob(models.Model):
+    """A queued Excel/SPSS export, built by the process_export_jobs worker."""
+
+    TYPE_CHOICES = [('excel', 'Excel'), ('spss', 'SPSS (CSV)'), ('parquet', 'Parquet'), ('arrow', 'Arrow IPC')]
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'), (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'), (STATUS_FAILED, 'Failed'),
+    ]
+
+    export_type = models.CharField(max_length=10, choices=TYPE_CHOICES, default='excel')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='export_jobs'
+    )
+    response_ids = models.JSONField(null=True, blank=True, help_text="Selected response ids (null exports every response)")
+    rows_total = models.PositiveIntegerField(default=0)
+    rows_done = models.PositiveIntegerField(default=0)
+    file_path = models.CharField(max_length=500, blank=True)
+    filename = models.CharField(max_length=200, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.get_export_type_display()} export #{self.pk} ({self.status})"
+
+    @property
+    def progress(self):
+        """Completion percentage (0-100)."""
+        if self.status == self.STATUS_COMPLETED:
+            return 100
+        return int(self.rows_done * 100 / self.rows_total) if self.rows_total else 0
+
+    class Meta:
+        verbose_name = "Export Job"
+        verbose_name_plural = "Export Jobs"
+        ordering = ['-created_at']
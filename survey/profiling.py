@@ -0,0 +1,167 @@
+# survey/profiling.py
+import cProfile
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_profiling_settings = getattr(settings, 'ANALYTICS_PROFILING', {})
+
+# Time every dashboard analytics method, not just renders asked for with ?profile=1
+ANALYTICS_PROFILING_ENABLED = _profiling_settings.get('ENABLED', False)
+# Method timings kept in the ring buffer
+ANALYTICS_PROFILING_BUFFER_SIZE = _profiling_settings.get('BUFFER_SIZE', 200)
+# Where ?profile=1 writes its cProfile captures (.prof, readable with pstats / snakeviz)
+ANALYTICS_PROFILING_DUMP_DIR = _profiling_settings.get('DUMP_DIR', os.path.join(settings.BASE_DIR, 'logs', 'profiles'))
+# Functions listed in the cProfile summary shown on the dashboard
+ANALYTICS_PROFILING_TOP_FUNCTIONS = _profiling_settings.get('TOP_FUNCTIONS', 40)
+
+
+class RowCounter:
+    """connection.execute_wrapper hook counting queries and the rows they return.
+
+    Rows are counted through the sqlite3 cursor's ``row_factory``, which SQLite
+    calls once per fetched row; the rows themselves are returned unchanged.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+
+    def _count_row(self, cursor, row):
+        self.rows += 1
+        return row
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        raw_cursor = getattr(context['cursor'], 'cursor', None)
+        if raw_cursor is not None and getattr(raw_cursor, 'row_factory', False) is None:
+            raw_cursor.row_factory = self._count_row
+        return execute(sql, params, many, context)
+
+
+class AnalyticsProfiler:
+    """Ring buffer of per-method timings for the SurveyAnalytics calls behind the dashboard.
+
+    Each record holds wall time, SQL queries and rows fetched, and the memory
+    allocated (net and peak, via tracemalloc) while the method ran. Measuring is
+    opt-in: tracemalloc slows allocation-heavy pandas code noticeably.
+    """
+
+    def __init__(self, enabled=False, buffer_size=200):
+        self.enabled = enabled
+        self._records = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._tracing = 0  # measurements in progress that need tracemalloc running
+        self._started_tracemalloc = False
+
+    @contextmanager
+    def measure(self, method_name, records=None):
+        """Time the enclosed analytics call.
+
+        Args:
+            method_name (str): SurveyAnalytics method being measured.
+            records (list): Optional list that also receives the record (e.g. one
+                dashboard render). Passing it measures even when profiling is disabled.
+        """
+        if not self.enabled and records is None:
+            yield
+            return
+
+        with self._lock:
+            if self._tracing == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            self._tracing += 1
+        tracemalloc.reset_peak()
+        memory_before, _ = tracemalloc.get_traced_memory()
+        counter = RowCounter()
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(counter):
+                yield
+        finally:
+            wall = time.perf_counter() - start
+            memory_after, memory_peak = tracemalloc.get_traced_memory()
+            with self._lock:
+                self._tracing -= 1
+                if self._tracing == 0 and self._started_tracemalloc:
+                    tracemalloc.stop()
+                    self._started_tracemalloc = False
+            record = {
+                'method': method_name,
+                'at': timezone.now(),
+                'wall_ms': round(wall * 1000, 2),
+                'queries': counter.queries,
+                'rows': counter.rows,
+                'memory_kb': round((memory_after - memory_before) / 1024, 1),
+                'peak_kb': round((memory_peak - memory_before) / 1024, 1),
+            }
+            with self._lock:
+                self._records.append(record)
+            if records is not None:
+                records.append(record)
+
+    def recent(self):
+        """Return the buffered records, newest first."""
+        with self._lock:
+            return list(reversed(self._records))
+
+    def summary(self):
+        """Return count, mean and max wall time per method over the ring buffer, slowest first."""
+        methods = {}
+        for record in self.recent():
+            entry = methods.setdefault(record['method'], {'method': record['method'], 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            entry['count'] += 1
+            entry['total_ms'] += record['wall_ms']
+            entry['max_ms'] = max(entry['max_ms'], record['wall_ms'])
+        for entry in methods.values():
+            entry['mean_ms'] = round(entry.pop('total_ms') / entry['count'], 2)
+        return sorted(methods.values(), key=lambda entry: entry['mean_ms'], reverse=True)
+
+
+# Shared by every dashboard render in this process.
+analytics_profiler = AnalyticsProfiler(
+    enabled=ANALYTICS_PROFILING_ENABLED,
+    buffer_size=ANALYTICS_PROFILING_BUFFER_SIZE,
+)
+
+
+def profile_call(label, func, *args, **kwargs):
+    """Run ``func`` under cProfile and dump the capture to ANALYTICS_PROFILING_DUMP_DIR.
+
+    Args:
+        label (str): Prefix of the dump file name.
+        func (callable): Function to profile.
+
+    Returns:
+        tuple: (func's result, cumulative-time pstats summary text, dump file path or None)
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+
+    dump_path = None
+    try:
+        os.makedirs(ANALYTICS_PROFILING_DUMP_DIR, exist_ok=True)
+        dump_path = os.path.join(ANALYTICS_PROFILING_DUMP_DIR, f"{label}_{timezone.now():%Y%m%d_%H%M%S_%f}.prof")
+        profiler.dump_stats(dump_path)
+        logger.info(f"Wrote cProfile capture {dump_path}")
+    except OSError as e:
+        logger.error(f"Could not write cProfile capture: {e}")
+        dump_path = None
+
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output)
+    stats.strip_dirs().sort_stats('cumulative').print_stats(ANALYTICS_PROFILING_TOP_FUNCTIONS)
+    return result, output.getvalue(), dump_path
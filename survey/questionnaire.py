@@ -0,0 +1,328 @@
+# survey/questionnaire.py
+"""Compiled questionnaire schema: every question's options, labels and codes, built once at import.
+
+Views (form options and validation), model display methods, the admin, the
+session codec, analytics and exports all read from this module, so the option
+lists cannot drift apart and nothing is rebuilt per request. Everything here is
+immutable: option lists are tuples, lookups are frozensets and read-only
+mappings.
+
+The order of every option list is part of the stored session format (the
+session codec stores option indexes, see survey/session_codec.py): append new
+options at the end.
+"""
+from types import MappingProxyType
+
+# Question kinds
+CHOICE = 'choice'  # one option code
+MULTI = 'multi'  # list of option codes
+GRID = 'grid'  # {row code: option code}
+
+
+class Options:
+    """Immutable option list: (code, label) pairs with O(1) validation and integer codes.
+
+    Attributes:
+        choices (tuple): ((code, label), ...) in questionnaire order, as templates iterate them.
+        codes (tuple): Option codes in order.
+        valid (frozenset): Option codes, for membership tests.
+        labels (mappingproxy): code -> label.
+        index (mappingproxy): code -> integer code (position in ``codes``).
+    """
+
+    __slots__ = ('choices', 'codes', 'valid', 'labels', 'index')
+
+    def __init__(self, choices):
+        choices = tuple((code, label) for code, label in choices)
+        codes = tuple(code for code, _ in choices)
+        object.__setattr__(self, 'choices', choices)
+        object.__setattr__(self, 'codes', codes)
+        object.__setattr__(self, 'valid', frozenset(codes))
+        object.__setattr__(self, 'labels', MappingProxyType(dict(choices)))
+        object.__setattr__(self, 'index', MappingProxyType({code: i for i, code in enumerate(codes)}))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __iter__(self):
+        return iter(self.choices)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return code in self.valid
+
+    def label(self, code):
+        """Return the label of a code, or the code itself if it is not an option."""
+        return self.labels.get(code, code)
+
+
+class Question:
+    """One stored question: its SurveyResponse field, kind, options and (for grids) rows."""
+
+    __slots__ = ('field', 'kind', 'options', 'rows')
+
+    def __init__(self, field, kind, options, rows=None):
+        object.__setattr__(self, 'field', field)
+        object.__setattr__(self, 'kind', kind)
+        object.__setattr__(self, 'options', options)
+        object.__setattr__(self, 'rows', rows)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self):
+        return f"Question({self.field!r}, {self.kind!r})"
+
+
+def _grid_rows(rows):
+    """Split (code, label, statute) grid rows into row Options (labels with the statute) and template rows."""
+    options = Options((code, f"{label} ({statute})" if statute else label) for code, label, statute in rows)
+    return options, tuple((label, statute, code) for code, label, statute in rows)
+
+
+# --- Respondent information ---
+
+PROVINCES = Options((
+    ('ajk', 'Azad Jammu and Kashmir'),
+    ('balochistan', 'Balochistan'),
+    ('gb', 'Gilgit-Baltistan'),
+    ('ict', 'ICT'),
+    ('kpk', 'Khyber Pakhtunkhwa'),
+    ('punjab', 'Punjab'),
+    ('sindh', 'Sindh'),
+))
+PROFESSIONAL_ROLES = Options((('legal', 'Legal Practitioner'), ('customs', 'Customs Agent')))
+PRACTICE_AREAS = Options((
+    ('income_tax', 'Income Tax'), ('sales_tax', 'Sales Tax / Federal Excise Duty'), ('customs', 'Customs'),
+    ('international', 'International Taxation'),
+))
+EXPERIENCE_LEVELS = Options((
+    ('Less than 1 year', 'Less than 1 year'),
+    ('1-5 years', '1-5 years'),
+    ('6-10 years', '6-10 years'),
+    ('More than 10 years', 'More than 10 years'),
+))
+# Experience level -> (min years, max years), for numeric analytics
+EXPERIENCE_YEARS = MappingProxyType({
+    'Less than 1 year': (0, 1),
+    '1-5 years': (1, 5),
+    '6-10 years': (6, 10),
+    'More than 10 years': (11, 50),
+})
+KII_CONSENT = Options((('yes', 'Yes'), ('no', 'No')))
+
+# --- Generic questions (G1-G5) ---
+
+MATRIX = Options((
+    ('very_positive', 'Very Positive'), ('positive', 'Positive'), ('neutral', 'Neutral'),
+    ('negative', 'Negative'), ('very_negative', 'Very Negative'), ('na', 'N/A'), ('dont_know', "Don't Know"),
+))
+# Matrix option -> sentiment score (N/A and Don't Know count as neutral)
+MATRIX_SCORES = MappingProxyType({
+    'very_positive': 2, 'positive': 1, 'neutral': 0, 'negative': -1, 'very_negative': -2, 'na': 0, 'dont_know': 0,
+})
+G1_ASPECTS = Options((
+    ('service_delivery', 'Service delivery efficiency'),
+    ('client_numbers', 'Client numbers'),
+    ('revenue_fees', 'Revenue/fees'),
+    ('compliance_burden', 'Compliance burden'),
+))
+G2_ASPECTS = Options((
+    ('workflow_efficiency', 'Workflow efficiency'),
+    ('service_delivery', 'Service delivery'),
+    ('client_numbers', 'Client numbers'),
+))
+G3_TECHNICAL_ISSUES = Options((
+    ('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly'), ('rarely', 'Rarely'),
+    ('never', 'Never'), ('dont_know', "Don't Know"),
+))
+# G3 answers after which G4 is asked
+G3_VALUES_REQUIRING_G4 = frozenset(('daily', 'weekly', 'monthly', 'rarely'))
+G4_DISRUPTION = Options((
+    ('very_significantly', 'Very significantly'), ('significantly', 'Significantly'),
+    ('minimally', 'Minimally'), ('not_at_all', 'Not at all'),
+))
+G5_DIGITAL_LITERACY = Options((
+    ('very_significantly', 'Very significantly'), ('significantly', 'Significantly'), ('neutral', 'Neutral'),
+    ('minimally', 'Minimally'), ('not_at_all', 'Not at all'), ('dont_know', "Don't Know"),
+))
+
+# --- Legal practitioner questions (LP1-LP6) ---
+
+LP1_DIGITAL_SUPPORT = Options((
+    ('great_extent', 'To a great extent'),
+    ('considerable_extent', 'To a considerable extent'),
+    ('moderate_extent', 'To a moderate extent'),
+    ('slight_extent', 'To a slight extent'),
+    ('not_at_all', 'Not at all'),
+))
+LP_CHALLENGE_LEVELS = Options((
+    ('no_challenge', 'No Challenge'),
+    ('minor_challenge', 'Minor Challenge'),
+    ('moderate_challenge', 'Moderate Challenge'),
+    ('major_challenge', 'Major Challenge'),
+    ('dont_perform', "Don't Perform"),
+))
+# Challenge levels for which LP5 asks the affected tax types
+LP5_CHALLENGE_LEVELS = frozenset(('moderate_challenge', 'major_challenge'))
+_LP2_ROWS = (
+    ('appeals_commissioner', 'Appeal filings before Commissioner', 'S.127'),
+    ('appellate_tribunal', 'Appellate Tribunal representations', 'S.132'),
+    ('high_court', 'High Court/Supreme Court references', ''),
+    ('audit_responses', 'Audit responses & compliance', 'S.177'),
+    ('show_cause', 'Show cause notice responses', 'S.122'),
+)
+_LP3_ROWS = (
+    ('return_filing', 'Return filing & compliance', 'S.114'),
+    ('amendments', 'Return amendments & rectifications', ''),
+    ('withholding', 'Withholding statements & compliance', ''),
+    ('risk_assessment', 'Risk assessment procedures', 'S.122A'),
+    ('tax_planning', 'Tax planning advisory services', ''),
+)
+_LP4_ROWS = (
+    ('adr', 'Alternate Dispute Resolution', 'S.134A'),
+    ('settlement', 'Settlement procedures', ''),
+    ('epayments', 'e-Payments & refund processing', ''),
+    ('cpr_corrections', 'CPR corrections', ''),
+    ('correspondence', 'FBR correspondence management', ''),
+)
+LP2_FUNCTIONS, LP2_FUNCTION_ROWS = _grid_rows(_LP2_ROWS)
+LP3_FUNCTIONS, LP3_FUNCTION_ROWS = _grid_rows(_LP3_ROWS)
+LP4_FUNCTIONS, LP4_FUNCTION_ROWS = _grid_rows(_LP4_ROWS)
+# LP5 rows are the LP2-LP4 functions, labelled without their statute
+LP5_FUNCTIONS = Options((code, label) for code, label, _ in _LP2_ROWS + _LP3_ROWS + _LP4_ROWS)
+
+# --- Customs agent questions (CA1-CA6) ---
+
+CA1_TRAINING = Options((
+    ('effective_both', 'Yes, effective training on both WeBOC and PSW'),
+    ('needs_improvement', 'Yes, but training needs improvement'),
+    ('no_training', 'No formal training received'),
+    ('not_applicable', 'Not applicable'),
+))
+CA2_SYSTEM_INTEGRATION = Options((
+    ('very_well', 'Very well integrated'),
+    ('well', 'Well integrated'),
+    ('moderately', 'Moderately integrated'),
+    ('poorly', 'Poorly integrated'),
+    ('not_integrated', 'Not integrated'),
+))
+CA3_FUNCTIONS, CA3_FUNCTION_ROWS = _grid_rows((
+    ('goods_declaration', 'Goods Declaration', 'S.79'),
+    ('duty_assessment', 'Duty Assessment', 'S.81'),
+    ('cargo_examination', 'Cargo Examination', 'S.26'),
+    ('document_processing', 'Document Processing', 'S.79(2)'),
+    ('transit_warehousing', 'Transit/Warehousing', 'S.13, S.15'),
+    ('record_keeping', 'Record Keeping', 'S.155(6)'),
+    ('audit_compliance', 'Audit Compliance', 'S.26A'),
+    ('license_compliance', 'License Compliance', 'S.155(4)'),
+))
+CA3_LEVELS = Options((
+    ('no_challenge', 'No Challenge'),
+    ('minor_challenge', 'Minor'),
+    ('moderate_challenge', 'Moderate'),
+    ('major_challenge', 'Major'),
+    ('not_applicable', 'N/A'),
+))
+CA4_PROCESSES = Options((
+    ('duty_assessment', 'Duty assessment'),
+    ('cargo_examination', 'Cargo examination'),
+    ('system_reliability', 'System reliability'),
+    ('client_representation', 'Client representation'),
+))
+# (label, code) pairs, as the CA4 grid template iterates them
+CA4_PROCESS_ROWS = tuple((label, code) for code, label in CA4_PROCESSES.choices)
+CA4_LEVELS = Options((
+    ('very_effective', 'Very Effective'),
+    ('effective', 'Effective'),
+    ('neutral', 'Neutral'),
+    ('ineffective', 'Ineffective'),
+    ('very_ineffective', 'Very Ineffective'),
+))
+CA5_POLICY_IMPACT = Options((
+    ('very_positively', 'Very positively'),
+    ('positively', 'Positively'),
+    ('neutral', 'Neutral'),
+    ('negatively', 'Negatively'),
+    ('very_negatively', 'Very negatively'),
+))
+CA6_BIGGEST_CHALLENGE = Options((
+    ('system_issues', 'System reliability and performance issues'),
+    ('policy_changes', 'Frequent policy or procedural changes'),
+    ('assessment_unpredictability', 'Unpredictable assessment outcomes'),
+    ('documentation_delays', 'Documentation processing delays'),
+    ('cargo_bottlenecks', 'Cargo examination bottlenecks'),
+    ('compliance_burden', 'Compliance and record-keeping burden'),
+    ('coordination_issues', 'Inter-agency coordination challenges'),
+    ('training_gaps', 'Training and knowledge gaps'),
+))
+
+# --- Cross-system perspectives (XS1-XS2) ---
+
+XS_QUESTIONS = Options((
+    ('xs1_data_discrepancy', 'XS1. Data Discrepancy/Reconciliation'),
+    ('xs2_policy_consistency', 'XS2. Policy Consistency'),
+))
+XS_LEVELS = Options((
+    ('always', 'Always / Almost Always'),
+    ('often', 'Often'),
+    ('sometimes', 'Sometimes'),
+    ('rarely', 'Rarely'),
+    ('never', 'Never / Almost Never'),
+    ('not_applicable', "Not Applicable / Don't know"),
+))
+
+# --- Registry: SurveyResponse field -> Question ---
+
+QUESTIONS = MappingProxyType({question.field: question for question in (
+    Question('province', CHOICE, PROVINCES),
+    Question('professional_role', MULTI, PROFESSIONAL_ROLES),
+    Question('practice_areas', MULTI, PRACTICE_AREAS),
+    Question('experience_legal', CHOICE, EXPERIENCE_LEVELS),
+    Question('experience_customs', CHOICE, EXPERIENCE_LEVELS),
+    Question('kii_consent', CHOICE, KII_CONSENT),
+    Question('g1_policy_impact', GRID, MATRIX, G1_ASPECTS),
+    Question('g2_system_impact', GRID, MATRIX, G2_ASPECTS),
+    Question('g3_technical_issues', CHOICE, G3_TECHNICAL_ISSUES),
+    Question('g4_disruption', CHOICE, G4_DISRUPTION),
+    Question('g5_digital_literacy', CHOICE, G5_DIGITAL_LITERACY),
+    Question('lp1_digital_support', CHOICE, LP1_DIGITAL_SUPPORT),
+    Question('lp2_challenges', GRID, LP_CHALLENGE_LEVELS, LP2_FUNCTIONS),
+    Question('lp3_challenges', GRID, LP_CHALLENGE_LEVELS, LP3_FUNCTIONS),
+    Question('lp4_challenges', GRID, LP_CHALLENGE_LEVELS, LP4_FUNCTIONS),
+    Question('ca1_training', CHOICE, CA1_TRAINING),
+    Question('ca2_system_integration', CHOICE, CA2_SYSTEM_INTEGRATION),
+    Question('ca3_challenges', GRID, CA3_LEVELS, CA3_FUNCTIONS),
+    Question('ca4_effectiveness', GRID, CA4_LEVELS, CA4_PROCESSES),
+    Question('ca5_policy_impact', CHOICE, CA5_POLICY_IMPACT),
+    Question('ca6_biggest_challenge', CHOICE, CA6_BIGGEST_CHALLENGE),
+    Question('cross_system_answers', GRID, XS_LEVELS, XS_QUESTIONS),
+)})
+
+# Answer fields per questionnaire section, as the admin weighs completion
+SECTION_FIELDS = MappingProxyType({
+    'generic': ('g1_policy_impact', 'g2_system_impact', 'g3_technical_issues', 'g5_digital_literacy'),
+    'legal': ('lp1_digital_support', 'lp2_challenges', 'lp3_challenges', 'lp4_challenges', 'lp5_tax_types'),
+    'customs': (
+        'ca1_training', 'ca2_system_integration', 'ca3_challenges', 'ca4_effectiveness',
+        'ca5_policy_impact', 'ca6_biggest_challenge',
+    ),
+    'final': ('cross_system_answers', 'final_remarks'),
+})
+
+
+def choice_label(field, code):
+    """Return the label of a single-choice answer (the code itself if unknown)."""
+    question = QUESTIONS.get(field)
+    return question.options.label(code) if question else code
+
+
+def grid_display(field, answers):
+    """Return a grid answer as {row label: option label}, keeping unknown codes as they are."""
+    if not answers:
+        return {}
+    question = QUESTIONS[field]
+    row_label, option_label = question.rows.label, question.options.label
+    return {row_label(row): option_label(value) for row, value in answers.items()}
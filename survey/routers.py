@@ -0,0 +1,33 @@
+# survey/routers.py
+
+
+class SessionRouter:
+    """Keep django.contrib.sessions in the 'sessions' database.
+
+    Every wizard step and autosave writes a session row. In their own SQLite file
+    those writes do not wait for (or block) survey submissions on the default
+    database's single writer lock.
+    """
+
+    app_label = 'sessions'
+    database = 'sessions'
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == self.app_label:
+            return self.database
+        return None
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label == self.app_label:
+            return self.database
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == self.app_label:
+            return db == self.database
+        if db == self.database:
+            return False
+        return None
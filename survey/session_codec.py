@@ -0,0 +1,285 @@
+# survey/session_codec.py
+"""Compact encoding of wizard answers kept in the session.
+
+The wizard keeps its answers in four session dicts: respondent_info,
+generic_answers, role_specific_answers and cross_system_answers. Stored
+verbatim, every step re-serializes the option codes as strings
+('moderate_challenge', ...) together with every dict key. This codec stores
+each section as a list ordered by SESSION_SCHEMA:
+
+    [presence bitmask, value of each present field..., {unknown keys} (optional)]
+
+Single-choice answers become their index in the option list. A grid becomes
+[row bitmask, cell index, ...]. Values the schema does not know are kept
+verbatim, so encoding never loses data. A non-string value in a coded field is
+wrapped as {"=": value} so it cannot be mistaken for an option index.
+Session keys outside the schema go into "o" unchanged. The compact size of
+every key is stored under "z", so SessionStore can track the session size
+without serializing it again (see survey/session_store.py).
+
+Payloads without the version marker "~" are sessions written before this codec
+existed. They are returned unchanged.
+"""
+import json
+
+from survey.questionnaire import (
+    CA1_TRAINING, CA2_SYSTEM_INTEGRATION, CA3_FUNCTIONS, CA3_LEVELS, CA4_LEVELS, CA4_PROCESSES, CA5_POLICY_IMPACT,
+    CA6_BIGGEST_CHALLENGE, EXPERIENCE_LEVELS, G1_ASPECTS, G2_ASPECTS, G3_TECHNICAL_ISSUES, G4_DISRUPTION,
+    G5_DIGITAL_LITERACY, KII_CONSENT, LP1_DIGITAL_SUPPORT, LP2_FUNCTIONS, LP3_FUNCTIONS, LP4_FUNCTIONS,
+    LP_CHALLENGE_LEVELS, MATRIX, PRACTICE_AREAS, PROFESSIONAL_ROLES, PROVINCES, XS_LEVELS,
+)
+
+SESSION_FORMAT_VERSION = 1
+
+VERSION_KEY = '~'
+OTHER_KEYS = 'o'
+SIZES_KEY = 'z'
+RAW_MARKER = '='
+
+# Field kinds
+RAW = 'raw'  # stored verbatim (free text, ids, flags)
+CHOICE = 'choice'  # one option code -> index
+MULTI = 'multi'  # list of option codes -> list of indexes
+GRID = 'grid'  # {row: option code} -> [row bitmask, index, ...]
+
+# session key -> (short code, fields); a field is (name, kind[, Options[, grid row Options]])
+# (survey.questionnaire); a stored value is the position of its code in Options.codes
+SESSION_SCHEMA = {
+    'respondent_info': ('r', (
+        ('full_name', RAW),
+        ('email', RAW),
+        ('mobile', RAW),
+        ('province', CHOICE, PROVINCES),
+        ('district', RAW),
+        ('professional_roles', MULTI, PROFESSIONAL_ROLES),
+        ('practice_areas', MULTI, PRACTICE_AREAS),
+        ('experience_legal', CHOICE, EXPERIENCE_LEVELS),
+        ('experience_customs', CHOICE, EXPERIENCE_LEVELS),
+        ('kii_consent', CHOICE, KII_CONSENT),
+        ('id', RAW),
+        ('province_display', RAW),
+    )),
+    'generic_answers': ('g', (
+        ('g1', GRID, MATRIX, G1_ASPECTS),
+        ('g2', GRID, MATRIX, G2_ASPECTS),
+        ('g3_technical_issues', CHOICE, G3_TECHNICAL_ISSUES),
+        ('g4_disruption', CHOICE, G4_DISRUPTION),
+        ('g5_digital_literacy', CHOICE, G5_DIGITAL_LITERACY),
+    )),
+    'role_specific_answers': ('s', (
+        ('lp1_digital_support', CHOICE, LP1_DIGITAL_SUPPORT),
+        ('lp2_challenges', GRID, LP_CHALLENGE_LEVELS, LP2_FUNCTIONS),
+        ('lp3_challenges', GRID, LP_CHALLENGE_LEVELS, LP3_FUNCTIONS),
+        ('lp4_challenges', GRID, LP_CHALLENGE_LEVELS, LP4_FUNCTIONS),
+        ('lp5_tax_types', RAW),
+        ('lp5_visible', RAW),
+        ('lp6_priority_improvement', RAW),
+        ('ca1_training', CHOICE, CA1_TRAINING),
+        ('ca2_system_integration', CHOICE, CA2_SYSTEM_INTEGRATION),
+        ('ca3_challenges', GRID, CA3_LEVELS, CA3_FUNCTIONS),
+        ('ca4_effectiveness', GRID, CA4_LEVELS, CA4_PROCESSES),
+        ('ca5_policy_impact', CHOICE, CA5_POLICY_IMPACT),
+        ('ca6_biggest_challenge', CHOICE, CA6_BIGGEST_CHALLENGE),
+        ('ca6_improvement', RAW),
+    )),
+    'cross_system_answers': ('x', (
+        ('xs1_data_discrepancy', CHOICE, XS_LEVELS),
+        ('xs2_policy_consistency', CHOICE, XS_LEVELS),
+        ('skipped', RAW),
+        ('saved_as_draft', RAW),
+        ('timestamp', RAW),
+        ('draft_saved_at', RAW),
+        ('completed_at', RAW),
+    )),
+}
+
+
+def _compile(schema):
+    """Turn SESSION_SCHEMA into lookup tables: {session key: (code, [(name, kind, codes, rows)])}."""
+    compiled = {}
+    for session_key, (code, fields) in schema.items():
+        compiled_fields = []
+        for name, kind, *spec in fields:
+            codes = spec[0] if spec else None
+            rows = spec[1] if len(spec) > 1 else None
+            compiled_fields.append((name, kind, codes, rows))
+        compiled[session_key] = (code, compiled_fields)
+    return compiled
+
+
+_SECTIONS = _compile(SESSION_SCHEMA)
+_SECTIONS_BY_CODE = {code: (session_key, fields) for session_key, (code, fields) in _SECTIONS.items()}
+
+
+_encoder = json.JSONEncoder(separators=(',', ':'))
+
+
+def _dumps(value):
+    return _encoder.encode(value)
+
+
+def _encode_choice(value, codes):
+    if isinstance(value, str):
+        return codes.index.get(value, value)
+    return {RAW_MARKER: value}
+
+
+def _decode_choice(value, codes):
+    if type(value) is int:
+        return codes.codes[value]
+    if isinstance(value, dict):
+        return value[RAW_MARKER]
+    return value
+
+
+def _encode_value(value, kind, codes, rows):
+    if kind == CHOICE:
+        return _encode_choice(value, codes)
+    if kind == MULTI:
+        if isinstance(value, list) and all(item in codes.index for item in value):
+            return [codes.index[item] for item in value]
+        return {RAW_MARKER: value}
+    if kind == GRID:
+        if not isinstance(value, dict) or any(key not in rows.index for key in value):
+            return {RAW_MARKER: value}
+        mask = 0
+        cells = []
+        for position, row in enumerate(rows.codes):
+            if row in value:
+                mask |= 1 << position
+                cells.append(_encode_choice(value[row], codes))
+        return [mask, *cells]
+    return value
+
+
+def _decode_value(value, kind, codes, rows):
+    if kind == CHOICE:
+        return _decode_choice(value, codes)
+    if kind == MULTI:
+        if isinstance(value, dict):
+            return value[RAW_MARKER]
+        return [codes.codes[item] for item in value]
+    if kind == GRID:
+        if isinstance(value, dict):
+            return value[RAW_MARKER]
+        mask, cells = value[0], iter(value[1:])
+        return {row: _decode_choice(next(cells), codes) for position, row in enumerate(rows.codes) if mask & (1 << position)}
+    return value
+
+
+def encode_section(section, fields):
+    """Encode one answers dict as [bitmask, values..., {unknown keys}]."""
+    if not isinstance(section, dict):
+        return {RAW_MARKER: section}
+    mask = 0
+    encoded = [0]
+    for position, (name, kind, codes, rows) in enumerate(fields):
+        if name in section:
+            mask |= 1 << position
+            encoded.append(_encode_value(section[name], kind, codes, rows))
+    encoded[0] = mask
+    known = {name for name, *_ in fields}
+    extra = {key: value for key, value in section.items() if key not in known}
+    if extra:
+        encoded.append(extra)
+    return encoded
+
+
+def decode_section(encoded, fields):
+    """Inverse of encode_section."""
+    if isinstance(encoded, dict):
+        return encoded[RAW_MARKER]
+    mask, values = encoded[0], encoded[1:]
+    section = {}
+    position_in_values = 0
+    for position, (name, kind, codes, rows) in enumerate(fields):
+        if mask & (1 << position):
+            section[name] = _decode_value(values[position_in_values], kind, codes, rows)
+            position_in_values += 1
+    if position_in_values < len(values):
+        section.update(values[position_in_values])
+    return section
+
+
+def encode_session(session_dict):
+    """Serialize a session dict in the compact format.
+
+    Each value is serialized once; its length is recorded as it goes.
+
+    Args:
+        session_dict (dict): Session data as the views see it.
+
+    Returns:
+        tuple: (JSON text, {session key: compact size in bytes})
+    """
+    sizes = {}
+    size_codes = {}
+    sections = []
+    others = []
+    for key, value in session_dict.items():
+        if key in _SECTIONS:
+            code, fields = _SECTIONS[key]
+            text = _dumps(encode_section(value, fields))
+            sections.append(f'"{code}":{text}')
+            size_codes[code] = len(text)
+        else:
+            text = _dumps(value)
+            others.append(f'{_dumps(key)}:{text}')
+            size_codes[key] = len(text)
+        sizes[key] = len(text)
+    parts = [f'"{VERSION_KEY}":{SESSION_FORMAT_VERSION}', *sections]
+    if others:
+        parts.append(f'"{OTHER_KEYS}":{{{",".join(others)}}}')
+    parts.append(f'"{SIZES_KEY}":{_dumps(size_codes)}')
+    return '{' + ','.join(parts) + '}', sizes
+
+
+def decode_session(text):
+    """Parse a session payload written by encode_session, or a legacy plain JSON one.
+
+    Returns:
+        tuple: (session dict, {session key: compact size}); sizes is None for legacy payloads.
+    """
+    payload = json.loads(text)
+    if not isinstance(payload, dict) or VERSION_KEY not in payload:
+        return payload, None
+
+    session = {}
+    sizes = {}
+    size_codes = payload.get(SIZES_KEY, {})
+    for code, value in payload.items():
+        if code in _SECTIONS_BY_CODE:
+            session_key, fields = _SECTIONS_BY_CODE[code]
+            session[session_key] = decode_section(value, fields)
+            if code in size_codes:
+                sizes[session_key] = size_codes[code]
+    for key, value in payload.get(OTHER_KEYS, {}).items():
+        session[key] = value
+        if key in size_codes:
+            sizes[key] = size_codes[key]
+    return session, sizes
+
+
+def value_size(key, value):
+    """Return the compact size of one session value (what encode_session would record)."""
+    if key in _SECTIONS:
+        return len(_dumps(encode_section(value, _SECTIONS[key][1])))
+    return len(_dumps(value))
+
+
+class CompactSessionSerializer:
+    """Session serializer (SESSION_SERIALIZER) writing the compact format.
+
+    After ``dumps``/``loads`` the per-key compact sizes are available in ``sizes``.
+    """
+
+    def __init__(self):
+        self.sizes = None
+
+    def dumps(self, obj):
+        text, self.sizes = encode_session(obj)
+        return text.encode('latin-1')
+
+    def loads(self, data):
+        session, self.sizes = decode_session(data.decode('latin-1'))
+        return session
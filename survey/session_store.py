@@ -0,0 +1,317 @@
+# survey/session_store.py
+"""Session engine for the survey wizard (SESSION_ENGINE = 'survey.session_store').
+
+Database-backed sessions with a write-through cache, like cached_db, with three
+differences:
+
+- The payload uses the compact answer encoding in survey/session_codec.py.
+- The cache holds the same signed payload as the database. Cache hits decode a
+  few hundred bytes instead of unpickling the full answer dicts.
+- The size of each session key is tracked. Only keys written or read for
+  mutation since the last load are re-measured. ``payload_size()`` is therefore
+  cheap enough to call on every request (see validate_session_size).
+
+``save_deferred()`` writes the cache at once but leaves the database write to
+``session_write_behind``, which waits AUTOSAVE['COALESCE_SECONDS'] so that
+saves arriving in the meantime end up as one row update (survey/autosave.py).
+"""
+import atexit
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.db import DatabaseError, connections, router, transaction
+
+from survey.session_codec import CompactSessionSerializer, value_size
+
+logger = logging.getLogger(__name__)
+
+# Seconds a deferred session save waits for further saves before reaching the database
+SESSION_COALESCE_SECONDS = getattr(settings, 'AUTOSAVE', {}).get('COALESCE_SECONDS', 2.0)
+
+
+class SessionWriteBehind:
+    """Coalesces deferred session saves into one database write per session and window.
+
+    A pending entry holds the newest signed payload of a session. A daemon thread
+    writes it once the window since the first deferred save has passed. The
+    payload is only written while the cache still holds it: when another save
+    (in any process) has replaced it, that save already reached the database.
+    Pending entries are flushed when the process exits.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._pending = {}  # session key -> (store class, payload, expire_date, due)
+        # Striped locks serializing read-modify-write of a session within this process, for
+        # session engines without SessionStore.exclusive()
+        self._session_locks = [threading.Lock() for _ in range(64)]
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+        self.flushes = 0
+        self.coalesced = 0
+
+    def session_lock(self, session_key):
+        """Return the lock autosave requests of one session hold while they load, patch and save it.
+
+        Only serializes requests within this process; SessionStore.exclusive() also covers
+        other worker processes.
+        """
+        return self._session_locks[hash(session_key) % len(self._session_locks)]
+
+    def schedule(self, store):
+        """Queue the payload ``store`` last encoded for a database write at the end of the window."""
+        with self._wakeup:
+            previous = self._pending.get(store.session_key)
+            due = previous[3] if previous else time.monotonic() + self.window
+            if previous:
+                self.coalesced += 1
+            self._pending[store.session_key] = (type(store), store._encoded, store.get_expiry_date(), due)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='session-write-behind', daemon=True)
+                self._thread.start()
+            self._wakeup.notify()
+
+    def cancel(self, session_key):
+        """Drop the pending write of a session that is about to be saved (or deleted) directly."""
+        with self._lock:
+            self._pending.pop(session_key, None)
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self, due_only=False):
+        """Write pending payloads to the database; returns the number written."""
+        now = time.monotonic()
+        with self._lock:
+            keys = [key for key, entry in self._pending.items() if not due_only or entry[3] <= now]
+            entries = [(key, self._pending.pop(key)) for key in keys]
+        written = 0
+        for session_key, (store_class, payload, expire_date, _) in entries:
+            try:
+                if store_class._write_behind(session_key, payload, expire_date):
+                    written += 1
+            except Exception:
+                logger.exception(f"Deferred session write failed, session_id={session_key}")
+        with self._lock:
+            self.flushes += written
+        return written
+
+    def _run(self):
+        try:
+            while True:
+                with self._wakeup:
+                    while not self._pending:
+                        self._wakeup.wait()
+                    delay = min(entry[3] for entry in self._pending.values()) - time.monotonic()
+                    if delay > 0:
+                        self._wakeup.wait(delay)
+                        continue
+                self.flush(due_only=True)
+        finally:
+            connections.close_all()
+
+
+session_write_behind = SessionWriteBehind(SESSION_COALESCE_SECONDS)
+atexit.register(session_write_behind.flush)
+
+
+class SessionStore(cached_db.SessionStore):
+    cache_key_prefix = 'survey.session_store'
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self.serializer = self._make_serializer
+        self._value_sizes = {}  # session key -> compact size, as of the last load/save
+        self._stale_sizes = set()  # keys changed (or handed out mutable) since then
+        self._encoded = None  # payload written by the last encode()
+        self._last_serializer = None
+
+    def _make_serializer(self):
+        """Serializer factory for django.core.signing; keeps the instance to read its sizes."""
+        self._last_serializer = CompactSessionSerializer()
+        return self._last_serializer
+
+    def _serialize(self, operation, *args):
+        """Run a signing operation and return (result, per-key sizes its serializer recorded)."""
+        self._last_serializer = None
+        result = operation(*args)
+        return result, self._last_serializer.sizes if self._last_serializer else None
+
+    # --- Size tracking ---
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if isinstance(value, (dict, list)):
+            self._stale_sizes.add(key)
+        return value
+
+    def get(self, key, default=None):
+        value = super().get(key, default)
+        if isinstance(value, (dict, list)) and key in self._session:
+            self._stale_sizes.add(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._stale_sizes.add(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._value_sizes.pop(key, None)
+        self._stale_sizes.discard(key)
+
+    def pop(self, key, *args):
+        self._value_sizes.pop(key, None)
+        self._stale_sizes.discard(key)
+        return super().pop(key, *args)
+
+    def setdefault(self, key, value):
+        self._stale_sizes.add(key)
+        return super().setdefault(key, value)
+
+    def update(self, dict_):
+        super().update(dict_)
+        self._stale_sizes.update(dict_)
+
+    def clear(self):
+        super().clear()
+        self._value_sizes = {}
+        self._stale_sizes = set()
+
+    def payload_size(self):
+        """Return the compact size in bytes of the session data (sum over keys, before signing).
+
+        Only keys changed since the last load or save are serialized again.
+        """
+        session = self._session
+        for key in self._stale_sizes | (session.keys() - self._value_sizes.keys()):
+            if key in session:
+                self._value_sizes[key] = value_size(key, session[key])
+        self._stale_sizes = set()
+        return sum(size for key, size in self._value_sizes.items() if key in session)
+
+    # --- Encoding ---
+
+    def encode(self, session_dict):
+        encoded, sizes = self._serialize(super().encode, session_dict)
+        if sizes is not None:
+            self._value_sizes = sizes
+            self._stale_sizes = set()
+        self._encoded = encoded
+        return encoded
+
+    def decode(self, session_data):
+        session, sizes = self._serialize(super().decode, session_data)
+        self._value_sizes = sizes or {}
+        self._stale_sizes = set()
+        return session
+
+    # --- Cache: holds the signed payload, not the decoded dict ---
+
+    def load(self):
+        try:
+            session_data = self._cache.get(self.cache_key)
+        except Exception:
+            # Some backends raise on invalid cache keys; fall back to the database
+            session_data = None
+        if isinstance(session_data, str):
+            return self.decode(session_data)
+
+        s = self._get_session_from_db()
+        if not s:
+            return {}
+        data = self.decode(s.session_data)
+        try:
+            self._cache.set(self.cache_key, s.session_data, self.get_expiry_age(expiry=s.expire_date))
+        except Exception:
+            logger.exception(f"Error saving session to cache ({self._cache})")
+        return data
+
+    def save(self, must_create=False):
+        if self.session_key is not None:
+            session_write_behind.cancel(self.session_key)
+        DBStore.save(self, must_create)
+        try:
+            self._cache.set(self.cache_key, self._encoded, self.get_expiry_age())
+        except Exception:
+            logger.exception(f"Error saving session to cache ({self._cache})")
+
+    def delete(self, session_key=None):
+        session_write_behind.cancel(session_key or self.session_key)
+        super().delete(session_key)
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the session exclusively, across worker processes, while it is reloaded, changed and saved.
+
+        Runs in a transaction on the sessions database that locks the session row:
+        SELECT ... FOR UPDATE where the backend supports it, and on SQLite the
+        transaction_mode IMMEDIATE BEGIN, which takes the database write lock. The
+        session is reloaded inside it, so a check made on the loaded data (such as the
+        autosave version) sees every save that finished before and holds until the
+        save made inside the block.
+        """
+        model = self.get_model_class()
+        using = router.db_for_write(model)
+        with transaction.atomic(using=using):
+            list(model.objects.using(using).select_for_update().filter(session_key=self.session_key).values('pk'))
+            self._session_cache = self.load()
+            self.accessed = True
+            yield self
+
+    def save_deferred(self):
+        """Save to the cache now and to the database through ``session_write_behind``.
+
+        New sessions, and sessions the cache cannot hold, are saved directly.
+        Clears ``modified`` so SessionMiddleware does not save the session again.
+
+        Returns:
+            bool: True if the database write was deferred.
+        """
+        if self.session_key is None:
+            self.save()
+            self.modified = False
+            return False
+        self.encode(self._get_session())
+        try:
+            self._cache.set(self.cache_key, self._encoded, self.get_expiry_age())
+        except Exception:
+            logger.exception(f"Error saving session to cache ({self._cache}), saving to the database")
+            self.save()
+            self.modified = False
+            return False
+        session_write_behind.schedule(self)
+        self.modified = False
+        return True
+
+    @classmethod
+    def _write_behind(cls, session_key, payload, expire_date):
+        """Write a deferred payload to the database unless a newer save has replaced it in the cache.
+
+        Returns:
+            bool: True if the row was written.
+        """
+        store = cls(session_key)
+        try:
+            cached = store._cache.get(store.cache_key)
+        except Exception:
+            cached = payload
+        if cached != payload:
+            return False
+        obj = cls.get_model_class()(session_key=session_key, session_data=payload, expire_date=expire_date)
+        using = router.db_for_write(type(obj), instance=obj)
+        try:
+            with transaction.atomic(using=using):
+                obj.save(force_update=True, using=using)
+        except DatabaseError:
+            # The row was removed (e.g. clearsessions); the session still exists in the cache
+            with transaction.atomic(using=using):
+                obj.save(using=using)
+        return True
@@ -0,0 +1,38 @@
+# survey/staticfiles.py
+import os
+
+import plotly
+from django.contrib.staticfiles.finders import BaseFinder
+from django.core.files.storage import FileSystemStorage
+
+PLOTLY_JS_DIR = os.path.join(os.path.dirname(plotly.__file__), 'package_data')
+PLOTLY_JS_NAME = 'plotly.min.js'
+# Versioned so browsers can cache the bundle for as long as the plotly package is unchanged
+PLOTLY_STATIC_PREFIX = f'vendor/plotly-{plotly.__version__}'
+PLOTLY_STATIC_PATH = f'{PLOTLY_STATIC_PREFIX}/{PLOTLY_JS_NAME}'
+
+
+class PlotlyJsFinder(BaseFinder):
+    """Static files finder exposing the plotly.js bundle shipped with the plotly package.
+
+    Serves ``PLOTLY_STATIC_PATH`` through runserver and collectstatic, so dashboard
+    pages load plotly.js once as a cacheable asset instead of inlining it per chart.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.storage = FileSystemStorage(location=PLOTLY_JS_DIR)
+        self.storage.prefix = PLOTLY_STATIC_PREFIX
+
+    def check(self, **kwargs):
+        return []
+
+    def find(self, path, find_all=False, **kwargs):
+        find_all = find_all or kwargs.get('all', False)
+        matches = [os.path.join(PLOTLY_JS_DIR, PLOTLY_JS_NAME)] if path == PLOTLY_STATIC_PATH else []
+        if find_all:
+            return matches
+        return matches[0] if matches else []
+
+    def list(self, ignore_patterns):
+        yield PLOTLY_JS_NAME, self.storage
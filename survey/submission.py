@@ -0,0 +1,206 @@
+# survey/submission.py
+"""Final submission of a wizard session as one SurveyResponse row.
+
+``submit_survey`` runs in a single ``transaction.atomic`` block: the respondent
+row and any row already submitted with the same token are read with one
+``select_for_update`` query, then only the columns whose value changed are
+written with ``save(update_fields=...)``. Everything else (building the values
+from the session, validation) happens before the transaction, so the write
+lock is held for two statements.
+
+The final-remarks form carries a submission token (``SUBMISSION_TOKEN_KEY``,
+issued once per session). A retried or double-clicked submit with a token
+that is already stored returns the submitted row instead of writing again.
+"""
+import json
+import logging
+import re
+import uuid
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from survey.models import SurveyResponse
+from survey.utils.session_utils import sanitize_input
+
+logger = logging.getLogger(__name__)
+
+SUBMISSION_TOKEN_KEY = 'submission_token'
+_TOKEN_RE = re.compile(r'^[0-9A-Za-z-]{8,64}$')
+
+# Columns filled from the wizard session on submission
+RESPONDENT_FIELDS = (
+    'full_name', 'email', 'mobile', 'province', 'district',
+    'experience_legal', 'experience_customs', 'practice_areas', 'kii_consent',
+)
+ANSWER_FIELDS = (
+    'g1_policy_impact', 'g2_system_impact', 'g3_technical_issues', 'g4_disruption',
+    'g5_digital_literacy', 'lp1_digital_support', 'lp2_challenges', 'lp3_challenges',
+    'lp4_challenges', 'lp5_tax_types', 'lp5_visible', 'lp6_priority_improvement',
+    'ca1_training', 'ca2_system_integration', 'ca3_challenges', 'ca4_effectiveness',
+    'ca5_policy_impact', 'ca6_biggest_challenge', 'ca6_improvement',
+)
+SUBMISSION_FIELDS = set(RESPONDENT_FIELDS) | set(ANSWER_FIELDS) | {
+    'cross_system_answers', 'final_remarks', 'survey_feedback',
+}
+
+# Defaults for a row created at submission time (no earlier step saved one)
+NEW_ROW_DEFAULTS = {
+    'g1_policy_impact': {}, 'g2_system_impact': {}, 'g3_technical_issues': '', 'g4_disruption': None,
+    'g5_digital_literacy': '', 'lp1_digital_support': '', 'lp2_challenges': {}, 'lp3_challenges': {},
+    'lp4_challenges': {}, 'lp5_tax_types': {}, 'lp5_visible': False, 'lp6_priority_improvement': '',
+    'ca1_training': '', 'ca2_system_integration': '', 'ca3_challenges': {}, 'ca4_effectiveness': {},
+    'ca5_policy_impact': '', 'ca6_biggest_challenge': '', 'ca6_improvement': '', 'cross_system_answers': {},
+    'final_remarks': '', 'survey_feedback': '',
+}
+
+_JSON_FIELDS = {
+    field.name for field in SurveyResponse._meta.concrete_fields if isinstance(field, models.JSONField)
+}
+
+
+def issue_submission_token(session):
+    """Return the session's submission token, creating it on first use."""
+    token = session.get(SUBMISSION_TOKEN_KEY)
+    if not token:
+        token = uuid.uuid4().hex
+        session[SUBMISSION_TOKEN_KEY] = token
+    return token
+
+
+def clean_submission_token(token):
+    """Return the token if it is well formed, else None (the submission is then not deduplicated)."""
+    if isinstance(token, str) and _TOKEN_RE.match(token):
+        return token
+    return None
+
+
+def find_submission(token):
+    """Return the SurveyResponse already submitted with this token, or None."""
+    token = clean_submission_token(token)
+    if token is None:
+        return None
+    return SurveyResponse.objects.filter(submission_token=token).first()
+
+
+def submission_values(session, final_remarks, survey_feedback):
+    """Map the wizard session onto SurveyResponse columns.
+
+    Args:
+        session: request.session
+        final_remarks (str): Sanitized final remarks from the form.
+        survey_feedback (str): Sanitized survey feedback from the form.
+
+    Returns:
+        dict: Column name -> value for the columns present in the session.
+    """
+    respondent_info = session.get('respondent_info', {})
+    generic_answers = session.get('generic_answers', {})
+    role_answers = session.get('role_specific_answers', {})
+
+    values = {}
+    for field in RESPONDENT_FIELDS:
+        if field in respondent_info:
+            value = respondent_info[field]
+            if field == 'practice_areas' and isinstance(value, list):
+                value = ','.join(value)
+            values[field] = value
+    for field in ANSWER_FIELDS:
+        if field in generic_answers:
+            value = generic_answers[field]
+        elif field in role_answers:
+            value = role_answers[field]
+        else:
+            continue
+        if field in _JSON_FIELDS and isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except json.JSONDecodeError:
+                logger.warning(f"Invalid JSON for {field}: {value}, resetting to empty dict, session_id={session.session_key}")
+                value = {}
+        values[field] = value
+    values['cross_system_answers'] = session.get('cross_system_answers', {})
+    values['final_remarks'] = final_remarks
+    values['survey_feedback'] = survey_feedback
+
+    ignored = [
+        key for key in {**respondent_info, **generic_answers, **role_answers}
+        if key not in SUBMISSION_FIELDS and key not in ('id', 'professional_roles')
+    ]
+    if ignored:
+        logger.debug(f"Session fields not stored on submission: {ignored}, session_id={session.session_key}")
+    return values
+
+
+def _new_row_values(session):
+    """Initial columns for a respondent whose row is created at submission."""
+    respondent_info = session.get('respondent_info', {})
+    values = dict(NEW_ROW_DEFAULTS)
+    values.update(
+        full_name=sanitize_input(respondent_info.get('full_name', '')),
+        email=respondent_info.get('email', ''),
+        mobile=sanitize_input(respondent_info.get('mobile', '')),
+        province=sanitize_input(respondent_info.get('province', '')),
+        district=sanitize_input(respondent_info.get('district', '')),
+        professional_role=','.join(respondent_info.get('professional_roles', [])),
+        experience_legal=sanitize_input(respondent_info.get('experience_legal', '')),
+        experience_customs=sanitize_input(respondent_info.get('experience_customs', '')),
+        practice_areas=','.join(respondent_info.get('practice_areas', [])),
+        kii_consent=respondent_info.get('kii_consent', ''),
+    )
+    return values
+
+
+def submit_survey(session, final_remarks, survey_feedback, token=None):
+    """Write the wizard session to its SurveyResponse row, at most once per token.
+
+    Args:
+        session: request.session
+        final_remarks (str): Sanitized final remarks from the form.
+        survey_feedback (str): Sanitized survey feedback from the form.
+        token (str): Submission token sent with the form.
+
+    Returns:
+        tuple: (SurveyResponse, bool) - the row and whether this call wrote it
+            (False when the token had already been submitted).
+    """
+    token = clean_submission_token(token)
+    values = submission_values(session, final_remarks, survey_feedback)
+    respondent_id = session.get('respondent_info', {}).get('id')
+
+    lookup = Q()
+    if respondent_id:
+        lookup |= Q(pk=respondent_id)
+    if token:
+        lookup |= Q(submission_token=token)
+
+    try:
+        with transaction.atomic():
+            rows = list(SurveyResponse.objects.select_for_update().filter(lookup)) if lookup else []
+            for row in rows:
+                if token and row.submission_token == token:
+                    return row, False
+            # Any row left is the respondent's own
+            survey_response = rows[0] if rows else None
+
+            now = timezone.now()
+            if survey_response is None:
+                survey_response = SurveyResponse(**{**_new_row_values(session), **values})
+                survey_response.submission_date = now
+                survey_response.submission_token = token
+                survey_response.save()
+            else:
+                changed = [field for field, value in values.items() if getattr(survey_response, field) != value]
+                for field in changed:
+                    setattr(survey_response, field, values[field])
+                survey_response.submission_date = now
+                survey_response.submission_token = token
+                survey_response.save(update_fields=changed + ['submission_date', 'submission_token'])
+    except IntegrityError:
+        # A concurrent request with the same token inserted its row first
+        duplicate = find_submission(token)
+        if duplicate is None:
+            raise
+        return duplicate, False
+    return survey_response, True
@@ -0,0 +1,118 @@
+# survey/tests/test_analytics_parity.py
+"""The SQL analytics engine must return what the pandas engine computes from the DataFrame."""
+import random
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from survey.analytics_engines import create_analytics
+from survey.models import SurveyResponse
+from survey.questionnaire import G1_ASPECTS, G2_ASPECTS, G3_TECHNICAL_ISSUES, G4_DISRUPTION, G5_DIGITAL_LITERACY, MATRIX
+
+PROVINCES = ['ajk', 'balochistan', 'gb', 'ict', 'kpk', 'punjab', 'sindh']
+DISTRICTS = ['Lahore', 'Quetta', 'Karachi East', 'Islamabad', 'Peshawar', 'Multan', 'Gilgit']
+# Includes the legacy 'both' spelling and an unrecognised role
+ROLES = ['legal', 'customs', 'legal,customs', 'both', 'observer']
+
+
+class AnalyticsParityTests(TestCase):
+    """Seed a fixed set of responses and compare every pushed-down result between the engines."""
+
+    @classmethod
+    def setUpTestData(cls):
+        rnd = random.Random(20240501)
+
+        def choice(options, blank_rate=0.0):
+            return None if rnd.random() < blank_rate else rnd.choice(options)
+
+        def grid(aspects):
+            if rnd.random() < 0.1:
+                return {}
+            return {key: rnd.choice(MATRIX.codes) for key in aspects.codes if rnd.random() > 0.1}
+
+        now = timezone.now()
+        for i in range(120):
+            response = SurveyResponse.objects.create(
+                full_name=f'Parity Test {i}',
+                email=f'parity{i}@example.com',
+                province=rnd.choice(PROVINCES),
+                district=rnd.choice(DISTRICTS),
+                professional_role=rnd.choice(ROLES),
+                kii_consent=choice(['yes', 'no'], blank_rate=0.2),
+                g1_policy_impact=grid(G1_ASPECTS),
+                g2_system_impact=grid(G2_ASPECTS),
+                g3_technical_issues=choice(G3_TECHNICAL_ISSUES.codes),
+                g4_disruption=choice(G4_DISRUPTION.codes, blank_rate=0.3),
+                g5_digital_literacy=choice(G5_DIGITAL_LITERACY.codes),
+            )
+            # submission_date is auto_now_add; spread the rows over the last two weeks
+            SurveyResponse.objects.filter(pk=response.pk).update(
+                submission_date=now - timedelta(days=rnd.randint(0, 14), minutes=rnd.randint(0, 1439))
+            )
+
+    def setUp(self):
+        self.pandas_engine = create_analytics('pandas')
+        self.sql_engine = create_analytics('sql')
+
+    def assertEnginesAgree(self, method_name, **kwargs):
+        expected = getattr(self.pandas_engine, method_name)(**kwargs)
+        actual = getattr(self.sql_engine, method_name)(**kwargs)
+        self.assertTrue(expected, f"pandas {method_name} returned nothing")
+        self.assertEqual(expected, actual)
+        return expected, actual
+
+    def test_summary_stats(self):
+        expected, actual = self.assertEnginesAgree('get_summary_stats')
+        self.assertEqual(list(expected['district_distribution']), list(actual['district_distribution']))
+
+    def test_generic_questions_analysis(self):
+        self.assertEnginesAgree('get_generic_questions_analysis')
+
+    def test_quota_status(self):
+        self.assertEnginesAgree('get_quota_status')
+
+    def test_response_timeline(self):
+        for days in (7, 30):
+            with self.subTest(days=days):
+                self.assertEnginesAgree('get_response_timeline', days=days)
+
+    def test_sql_engine_does_not_load_the_dataframe(self):
+        self.sql_engine.get_summary_stats()
+        self.sql_engine.get_generic_questions_analysis()
+        self.sql_engine.get_quota_status()
+        self.assertIsNone(self.sql_engine.df)
+
+    def test_role_by_province_cross_tab(self):
+        pandas_counts = self.pandas_engine.get_cross_tabulations()['role_by_province']['counts']
+        expected = {
+            (role, province): count
+            for province, role_counts in pandas_counts.items() if province != 'All'
+            for role, count in role_counts.items() if role != 'All' and count
+        }
+        sql_cross_tab = self.sql_engine.get_sql_based_cross_tabs()['sql_role_by_province_enhanced']
+        actual = {
+            (role, province): cell['count']
+            for role, provinces in sql_cross_tab.items()
+            for province, cell in provinces.items()
+        }
+        self.assertTrue(expected)
+        self.assertEqual(expected, actual)
+
+    def test_policy_impact_by_role_cross_tab(self):
+        pandas_cross_tab = self.pandas_engine.get_cross_tabulations()['policy_impact_by_role']
+        key = self.pandas_engine._grid_columns('g1_policy_impact')[0].split('__', 1)[1]
+        # pandas counts unanswered cells as 'N/A'; the SQL cross-tab only counts answers
+        expected = {
+            (rating, role): count
+            for role, rating_counts in pandas_cross_tab.items() if role != 'All'
+            for rating, count in rating_counts.items() if rating not in ('All', 'N/A') and count
+        }
+        sql_cross_tab = self.sql_engine.get_sql_based_cross_tabs()[f'sql_policy_{key}_by_role']
+        actual = {
+            (rating, role): count
+            for rating, role_counts in sql_cross_tab.items()
+            for role, count in role_counts.items()
+        }
+        self.assertTrue(expected)
+        self.assertEqual(expected, actual)
@@ -0,0 +1,74 @@
+# survey/tests/test_autosave.py
+"""Versioned autosave deltas: applied in version order, stale ones rejected with 409."""
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from survey.autosave import AUTOSAVE_VERSION_KEY, StaleVersion, apply_autosave
+from survey.session_store import SessionStore, session_write_behind
+
+SESSION_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'autosave-tests'},
+}
+
+
+@override_settings(CACHES=SESSION_CACHES, SESSION_ENGINE='survey.session_store')
+class AutosaveTests(TestCase):
+    databases = {'default', 'sessions'}
+
+    def setUp(self):
+        session = self.client.session
+        session['generic_answers'] = {'g1': {'service_delivery': 'minor_challenge'}}
+        session[AUTOSAVE_VERSION_KEY] = 3
+        session.save()
+        self.session_key = session.session_key
+
+    def tearDown(self):
+        # Deferred writes are not flushed into the test transaction
+        session_write_behind.cancel(self.session_key)
+
+    def autosave(self, version, value):
+        ops = [{'op': 'replace', 'path': '/generic_answers/g1/service_delivery', 'value': value}]
+        return self.client.post(
+            reverse('survey:save_progress'), json.dumps({'version': version, 'ops': ops}),
+            content_type='application/json',
+        )
+
+    def stored_session(self):
+        return SessionStore(self.session_key)
+
+    def test_newer_version_is_applied(self):
+        response = self.autosave(4, 'major_challenge')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['version'], 4)
+        session = self.stored_session()
+        self.assertEqual(session['generic_answers']['g1']['service_delivery'], 'major_challenge')
+        self.assertEqual(session[AUTOSAVE_VERSION_KEY], 4)
+
+    def test_stale_version_is_rejected_with_409(self):
+        self.assertEqual(self.autosave(5, 'major_challenge').status_code, 200)
+
+        for version in (5, 4):
+            with self.subTest(version=version):
+                response = self.autosave(version, 'no_challenge')
+                self.assertEqual(response.status_code, 409)
+                self.assertEqual(response.json()['version'], 5)
+        self.assertEqual(
+            self.stored_session()['generic_answers']['g1']['service_delivery'], 'major_challenge'
+        )
+
+    def test_version_is_checked_against_the_stored_session(self):
+        # Two requests load the session at version 3; the other one saves version 5 first
+        stale = self.stored_session()
+        self.assertEqual(stale[AUTOSAVE_VERSION_KEY], 3)
+        other = self.stored_session()
+        apply_autosave(other, 5, [{'op': 'replace', 'path': '/final_remarks', 'value': 'Saved first'}])
+        other.save_deferred()
+
+        with self.assertRaises(StaleVersion) as raised, stale.exclusive():
+            apply_autosave(stale, 4, [{'op': 'replace', 'path': '/final_remarks', 'value': 'Overwrites'}])
+        self.assertEqual(raised.exception.current, 5)
+        self.assertEqual(self.stored_session()['final_remarks'], 'Saved first')
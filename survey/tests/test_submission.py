@@ -0,0 +1,156 @@
+# survey/tests/test_submission.py
+"""Final submission: one SurveyResponse write per submission token, however often the form is posted."""
+from unittest import mock
+
+from django.db.models.query import QuerySet
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from survey.models import SurveyResponse
+from survey.questionnaire import GRID, QUESTIONS
+from survey.session_store import SessionStore
+from survey.submission import SUBMISSION_TOKEN_KEY, submit_survey
+
+SESSION_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'submission-tests'},
+}
+TOKEN = 'a' * 32
+
+
+def answer(field):
+    """First option of a question (every row of a grid)."""
+    question = QUESTIONS[field]
+    if question.kind == GRID:
+        return {row: question.options.codes[0] for row in question.rows.codes}
+    return question.options.codes[0]
+
+
+def wizard_data(respondent):
+    """Session keys of a legal practitioner who completed every step up to the final remarks."""
+    return {
+        'survey_started': True,
+        'respondent_info': {
+            'id': respondent.pk, 'full_name': respondent.full_name, 'email': respondent.email,
+            'province': respondent.province, 'district': respondent.district, 'professional_roles': ['legal'],
+            'experience_legal': answer('experience_legal'),
+        },
+        'generic_answers': {
+            field: answer(field)
+            for field in ('g1_policy_impact', 'g2_system_impact', 'g3_technical_issues', 'g5_digital_literacy')
+        },
+        'role_specific_answers': {
+            field: answer(field)
+            for field in ('lp1_digital_support', 'lp2_challenges', 'lp3_challenges', 'lp4_challenges')
+        },
+    }
+
+
+def create_respondent(**values):
+    return SurveyResponse.objects.create(**{
+        'full_name': 'Submission Test', 'email': 'submission@example.com', 'province': 'punjab',
+        'district': 'Lahore', 'professional_role': 'legal', **values,
+    })
+
+
+@override_settings(CACHES=SESSION_CACHES)
+class SubmitSurveyTests(TestCase):
+    def setUp(self):
+        self.respondent = create_respondent()
+        self.session = SessionStore()
+        self.session.update(wizard_data(self.respondent))
+
+    def test_submits_the_respondent_row(self):
+        survey_response, written = submit_survey(self.session, 'Remarks', '', token=TOKEN)
+
+        self.assertTrue(written)
+        self.assertEqual(survey_response.pk, self.respondent.pk)
+        self.respondent.refresh_from_db()
+        self.assertEqual(self.respondent.submission_token, TOKEN)
+        self.assertEqual(self.respondent.final_remarks, 'Remarks')
+        self.assertEqual(self.respondent.lp1_digital_support, answer('lp1_digital_support'))
+
+    def test_duplicate_token_returns_the_submitted_row(self):
+        first, _ = submit_survey(self.session, 'Remarks', '', token=TOKEN)
+        submitted_at = SurveyResponse.objects.get(pk=first.pk).submission_date
+
+        second, written = submit_survey(self.session, 'Changed remarks', '', token=TOKEN)
+
+        self.assertFalse(written)
+        self.assertEqual(second.pk, first.pk)
+        stored = SurveyResponse.objects.get(pk=first.pk)
+        self.assertEqual(stored.final_remarks, 'Remarks')
+        self.assertEqual(stored.submission_date, submitted_at)
+        self.assertEqual(SurveyResponse.objects.count(), 1)
+
+    def test_duplicate_token_without_respondent_row_creates_no_second_row(self):
+        self.session['respondent_info'] = {**self.session['respondent_info'], 'id': None}
+        self.respondent.delete()
+
+        first, written = submit_survey(self.session, 'Remarks', '', token=TOKEN)
+        second, written_again = submit_survey(self.session, 'Remarks', '', token=TOKEN)
+
+        self.assertTrue(written)
+        self.assertFalse(written_again)
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(SurveyResponse.objects.count(), 1)
+
+    def test_concurrent_insert_with_the_same_token_returns_that_row(self):
+        # The other request's row is committed after this one's locking read found nothing
+        other = create_respondent(email='other@example.com', submission_token=TOKEN)
+        self.session['respondent_info'] = {**self.session['respondent_info'], 'id': None}
+
+        with mock.patch.object(QuerySet, 'select_for_update', lambda queryset, *args, **kwargs: queryset.none()):
+            survey_response, written = submit_survey(self.session, 'Remarks', '', token=TOKEN)
+
+        self.assertFalse(written)
+        self.assertEqual(survey_response.pk, other.pk)
+        self.assertEqual(SurveyResponse.objects.filter(submission_token=TOKEN).count(), 1)
+        self.assertEqual(SurveyResponse.objects.count(), 2)
+
+
+@override_settings(CACHES=SESSION_CACHES, SESSION_ENGINE='survey.session_store')
+class FinalRemarksSubmitTests(TestCase):
+    databases = {'default', 'sessions'}
+
+    def setUp(self):
+        self.respondent = create_respondent()
+        session = self.client.session
+        session.update(wizard_data(self.respondent))
+        session[SUBMISSION_TOKEN_KEY] = TOKEN
+        session.save()
+
+    def submit(self, headers=None):
+        return self.client.post(reverse('survey:final_remarks'), {
+            'confirm_submit': 'true', 'final_remarks': 'Remarks', 'submission_token': TOKEN,
+        }, headers=headers)
+
+    def test_retry_after_the_session_was_cleared_redirects_to_the_confirmation(self):
+        self.assertRedirects(self.submit(), reverse('survey:confirmation'), fetch_redirect_response=False)
+        reference_number = SurveyResponse.objects.get(pk=self.respondent.pk).reference_number
+        self.assertNotIn('survey_started', self.client.session)
+
+        response = self.submit()
+
+        self.assertRedirects(response, reverse('survey:confirmation'), fetch_redirect_response=False)
+        self.assertEqual(self.client.session['reference_number'], reference_number)
+        self.assertEqual(SurveyResponse.objects.count(), 1)
+
+    def test_ajax_retry_after_the_session_was_cleared_reports_success(self):
+        self.submit()
+
+        response = self.submit(headers={'X-Requested-With': 'XMLHttpRequest'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'success')
+        self.assertEqual(SurveyResponse.objects.count(), 1)
+
+    def test_retry_with_an_unknown_token_starts_over(self):
+        self.submit()
+
+        response = self.client.post(reverse('survey:final_remarks'), {
+            'confirm_submit': 'true', 'final_remarks': 'Remarks', 'submission_token': 'b' * 32,
+        })
+
+        self.assertRedirects(response, reverse('survey:welcome'), fetch_redirect_response=False)
+        self.assertEqual(SurveyResponse.objects.count(), 1)
@@ -5,7 +5,12 @@ from .views import (
     cross_system_perspectives_view, final_remarks_view, confirmation_view, save_progress_view,
     debug_admin_urls_view
 )
-from .views.analytics_dashboard_views import admin_dashboard_view, export_data, api_dashboard_stats, export_qualitative_data 
+from .views.analytics_dashboard_views import (
+    admin_dashboard_view, export_data, api_dashboard_stats, api_dashboard_events, api_grid_cross_tabs,
+    export_qualitative_data,
+)
+from .views.export_job_views import create_export_job, export_job_status, download_export_job
+from .views.metrics_views import request_metrics_view, api_request_metrics
 
 app_name = 'survey'
 
@@ -25,8 +30,17 @@ urlpatterns = [
     path('admin/dashboard/', admin.site.admin_view(admin_dashboard_view), name='admin_dashboard'),
     path('admin/export/', admin.site.admin_view(export_data), name='export_survey_data'),
     path('admin/api/stats/', admin.site.admin_view(api_dashboard_stats), name='api_dashboard_stats'),
+    path('admin/api/events/', admin.site.admin_view(api_dashboard_events), name='api_dashboard_events'),
+    path('admin/api/cross-tabs/', admin.site.admin_view(api_grid_cross_tabs), name='api_grid_cross_tabs'),
+    path('admin/metrics/', admin.site.admin_view(request_metrics_view), name='request_metrics'),
+    path('admin/api/metrics/', admin.site.admin_view(api_request_metrics), name='api_request_metrics'),
     
     # for qualitative data export
     #path('admin/export/qualitative/', admin.site.admin_view(export_data), name='export_qualitative_data'),
     path('admin/export/qualitative/', admin.site.admin_view(export_qualitative_data), name='export_qualitative_data'),
+
+    # Background export jobs (built by the process_export_jobs worker)
+    path('admin/export/jobs/', admin.site.admin_view(create_export_job), name='create_export_job'),
+    path('admin/export/jobs/<int:job_id>/', admin.site.admin_view(export_job_status), name='export_job_status'),
+    path('admin/export/jobs/<int:job_id>/download/', admin.site.admin_view(download_export_job), name='export_job_download'),
 ]
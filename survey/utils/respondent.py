@@ -0,0 +1,56 @@
+"""
+Respondent resolution for the survey wizard: find the SurveyResponse a session is filling in.
+"""
+
+import logging
+
+from survey.models import SurveyResponse, normalize_email
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_respondent(request):
+    """
+    Return the SurveyResponse for the current wizard session, or None.
+
+    respondent_info_view stores the new row id in session['respondent_info']['id'], so
+    normally this is a single primary-key lookup. Older sessions without an id fall
+    back to the indexed normalized email; the id found is then kept in the session.
+
+    Args:
+        request: Django request object
+
+    Returns:
+        SurveyResponse: The respondent's row, or None if it does not exist yet
+    """
+    respondent_info = request.session.get('respondent_info', {})
+
+    respondent_id = respondent_info.get('id')
+    if respondent_id:
+        try:
+            return SurveyResponse.objects.get(pk=respondent_id)
+        except SurveyResponse.DoesNotExist:
+            logger.warning(f"Session respondent id {respondent_id} not found, falling back to email, session_id={request.session.session_key}")
+
+    email = normalize_email(respondent_info.get('email'))
+    if not email:
+        return None
+    survey_response = SurveyResponse.objects.filter(email_normalized=email).order_by('-id').first()
+    if survey_response is not None:
+        remember_respondent(request, survey_response)
+    return survey_response
+
+
+def remember_respondent(request, survey_response):
+    """
+    Store the respondent's row id in the session so later steps resolve it by primary key.
+
+    Args:
+        request: Django request object
+        survey_response (SurveyResponse): Saved respondent row
+    """
+    respondent_info = request.session.get('respondent_info')
+    if respondent_info is None or respondent_info.get('id') == survey_response.pk:
+        return
+    respondent_info['id'] = survey_response.pk
+    request.session.modified = True
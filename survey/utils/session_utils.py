@@ -39,9 +39,11 @@ def validate_session_size(request):
         ValueError: If session size exceeds reasonable limits
     """
     try:
-        # Estimate session size by converting to string
-        session_data = dict(request.session)
-        session_size = len(str(session_data))
+        # Compact stores track their size per key; only changed keys are measured again
+        if hasattr(request.session, 'payload_size'):
+            session_size = request.session.payload_size()
+        else:
+            session_size = len(str(dict(request.session)))
         
         # Warn if approaching limit (Django sessions typically have 4KB limit)
         if session_size > 3500:
@@ -1,17 +1,25 @@
 import csv
+import hashlib
 import json
 import logging
 import os
 import tempfile
+import time
+from datetime import timezone as dt_timezone
 
-from django.http import JsonResponse, HttpResponse
+from django.http import FileResponse, JsonResponse, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect
 from django.urls import get_resolver
 from django.db import DatabaseError
 from django.views.decorators.csrf import csrf_protect
+from django.views.decorators.http import condition, require_GET, require_http_methods
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ImproperlyConfigured
 from django.core.serializers.json import DjangoJSONEncoder
 
 # Third-party libraries (assuming pandas and numpy are used by SurveyAnalytics)
@@ -20,7 +28,18 @@ import numpy as np
 
 
 # Local application imports
-from survey.admin_dashboard import SurveyAnalytics
+from survey.analytics_cache import analytics_cache
+from survey.analytics_engines import create_analytics
+from survey.live_updates import (
+    LIVE_KEEPALIVE_SECONDS, LIVE_RETRY_MS, LIVE_STREAM_MAX_SECONDS, LIVE_UPDATES_ENABLED, dashboard_delta,
+    dashboard_snapshot, format_event, response_notifier,
+)
+from survey.exports import (
+    COLUMNAR_FORMATS, XLSX_CONTENT_TYPE, export_filename, iter_csv_export, stream_columnar_export,
+    stream_excel_export,
+)
+from survey.profiling import analytics_profiler, profile_call
+from survey.staticfiles import PLOTLY_STATIC_PATH
 
 
 logger = logging.getLogger(__name__)
@@ -65,24 +84,34 @@ def debug_admin_urls_view(request):
     return JsonResponse({'all_urls': all_patterns, 'admin_urls': admin_patterns})
 
 
-def get_analytics_data(analytics):
-    """Prepare analytics data for dashboard and API views."""
+def get_analytics_data(analytics, timings=None):
+    """Prepare analytics data for dashboard and API views.
+
+    Args:
+        analytics: SurveyAnalytics (or cached stand-in).
+        timings (list): Optional list that receives one profiling record per analytics
+            method (see survey.profiling); methods are also timed when profiling is enabled.
+    """
+    def timed(method_name, func, *args):
+        with analytics_profiler.measure(method_name, timings):
+            return func(*args)
+
     try:
-        if not analytics.load_data():
+        if not timed('load_data', analytics.load_data):
             raise ValueError("Failed to load survey data from database")
 
         data = {
-            'summary_stats': analytics.get_summary_stats() or {},
-            'quota_status': analytics.get_quota_status() or {},
-            'generic_analysis': analytics.get_generic_questions_analysis() or {},
-            'qualitative_insights': analytics.get_qualitative_insights() or {},
-            'timeline_data': analytics.get_response_timeline() or {},
-            'cross_tabs': safe_cross_tabs(analytics),
-            'sql_cross_tabs': analytics.get_sql_based_cross_tabs() or {},
-            'advanced_analytics': analytics.get_advanced_analytics() or {},
+            'summary_stats': timed('get_summary_stats', analytics.get_summary_stats) or {},
+            'quota_status': timed('get_quota_status', analytics.get_quota_status) or {},
+            'generic_analysis': timed('get_generic_questions_analysis', analytics.get_generic_questions_analysis) or {},
+            'qualitative_insights': timed('get_qualitative_insights', analytics.get_qualitative_insights) or {},
+            'timeline_data': timed('get_response_timeline', analytics.get_response_timeline) or {},
+            'cross_tabs': timed('get_cross_tabulations', safe_cross_tabs, analytics),
+            'sql_cross_tabs': timed('get_sql_based_cross_tabs', analytics.get_sql_based_cross_tabs) or {},
+            'advanced_analytics': timed('get_advanced_analytics', analytics.get_advanced_analytics) or {},
             'visualizations': {
-                'quota_chart': analytics.create_quota_chart() or '',
-                **(analytics.create_cross_tab_charts() or {})
+                'quota_chart': timed('create_quota_chart', analytics.create_quota_chart) or {},
+                **(timed('create_cross_tab_charts', analytics.create_cross_tab_charts) or {})
             }
         }
         logger.debug(f"Qualitative insights sections: {list(data['qualitative_insights'].keys())}")
@@ -98,6 +127,7 @@ def safe_cross_tabs(analytics):
         ct = analytics.get_cross_tabulations()
         if not ct or 'percentages' not in ct:
             return ct or {}
+        ct = dict(ct)  # cached results are shared between requests
         raw = ct['percentages']
         
         # Check if the object has a .map method (Pandas Series) or .apply (Pandas DataFrame)
@@ -121,8 +151,16 @@ def safe_cross_tabs(analytics):
 def admin_dashboard_view(request):
     """Render the admin dashboard with survey analytics and visualizations."""
     try:
-        analytics = SurveyAnalytics()
-        data = get_analytics_data(analytics)
+        # ?profile=1: time each analytics method and capture a cProfile of this render,
+        # computed uncached so the capture shows the real work
+        profile = request.GET.get('profile') == '1'
+        timings = [] if profile or analytics_profiler.enabled else None
+        profile_stats = profile_dump = None
+        if profile:
+            data, profile_stats, profile_dump = profile_call('dashboard', get_analytics_data, create_analytics(), timings)
+            logger.info(f"Profiled dashboard render for {request.user}, capture={profile_dump}")
+        else:
+            data = get_analytics_data(analytics_cache.analytics(), timings)
 
         if not data:
             messages.error(request, "Failed to load survey data")
@@ -132,8 +170,18 @@ def admin_dashboard_view(request):
             'title': 'Survey Analytics Dashboard',
             'total_responses': data['summary_stats'].get('total_responses', 0),
             'total_target': data['quota_status'].get('total', {}).get('target', 60),
+            'plotly_js': PLOTLY_STATIC_PATH,
+            'live_updates_enabled': LIVE_UPDATES_ENABLED,
             **data
         }
+        if timings is not None:
+            context['profiling'] = {
+                'timings': timings,
+                'total_ms': round(sum(record['wall_ms'] for record in timings), 2),
+                'recent': analytics_profiler.summary(),
+                'stats': profile_stats,
+                'dump': profile_dump,
+            }
         return render(request, 'survey/analytics_dashboard.html', context)
 
     except Exception as e:
@@ -142,41 +190,62 @@ def admin_dashboard_view(request):
         return redirect('admin:index')
 
 
+def make_serializable(obj):
+    """Convert numpy/pandas values nested in dicts and lists to JSON-serializable types."""
+    if isinstance(obj, (np.integer, np.int64)):
+        return int(obj)
+    elif isinstance(obj, (np.floating, np.float64)):
+        return float(obj)
+    elif isinstance(obj, (np.bool_)):
+        return bool(obj)
+    elif isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    elif isinstance(obj, dict):
+        return {k: make_serializable(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [make_serializable(item) for item in obj]
+    # Fallback for complex objects that DjangoJSONEncoder might handle or should be stringified
+    elif isinstance(obj, (str, int, float, bool, type(None))):
+        return obj
+    else:
+        return str(obj)
+
+
+def dashboard_stats_etag(request):
+    """ETag for api_dashboard_stats: changes whenever the survey data version changes."""
+    version = analytics_cache.get_data_version()
+    return hashlib.md5(f"{settings.ANALYTICS_ENGINE}:{version}".encode()).hexdigest()
+
+
+def dashboard_stats_last_modified(request):
+    """Last-Modified for api_dashboard_stats: the latest submission date, if any."""
+    last_submission = parse_datetime(analytics_cache.get_data_version()[1])
+    if last_submission is not None and timezone.is_naive(last_submission):
+        last_submission = timezone.make_aware(last_submission, dt_timezone.utc)
+    return last_submission
+
+
 @staff_member_required_api
+@require_http_methods(['GET', 'HEAD', 'POST'])
+@condition(etag_func=dashboard_stats_etag, last_modified_func=dashboard_stats_last_modified)
 def api_dashboard_stats(request):
-    """API endpoint for real-time dashboard analytics (Deduplicated and uses custom decorator)."""
-    try:
-        analytics = SurveyAnalytics()
-        data = get_analytics_data(analytics)
+    """API endpoint for real-time dashboard analytics (Deduplicated and uses custom decorator).
 
-        if not data:
+    Responses carry an ETag and Last-Modified derived from the survey data version, so a
+    poll sending ``If-None-Match`` gets a 304 without any analytics being computed while
+    no new responses have arrived. Only the four sections returned are computed, and never
+    from stale cache entries, so the body always matches its ETag.
+    """
+    try:
+        analytics = analytics_cache.analytics(allow_stale=False)
+        if not analytics.load_data():
             return JsonResponse({'error': 'Failed to load analytics data'}, status=500)
 
-        # Convert data to JSON-serializable format (Consolidated logic for clarity)
-        def make_serializable(obj):
-            if isinstance(obj, (np.integer, np.int64)):
-                return int(obj)
-            elif isinstance(obj, (np.floating, np.float64)):
-                return float(obj)
-            elif isinstance(obj, (np.bool_)):
-                return bool(obj)
-            elif isinstance(obj, pd.Timestamp):
-                return obj.isoformat()
-            elif isinstance(obj, dict):
-                return {k: make_serializable(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [make_serializable(item) for item in obj]
-            # Fallback for complex objects that DjangoJSONEncoder might handle or should be stringified
-            elif isinstance(obj, (str, int, float, bool, type(None))):
-                return obj
-            else:
-                return str(obj)
-
         serializable_data = {
-            'summary': make_serializable(data['summary_stats']),
-            'quota_status': make_serializable(data['quota_status']),
-            'timeline': make_serializable(data['timeline_data']),
-            'advanced_analytics': make_serializable(data['advanced_analytics'])
+            'summary': make_serializable(analytics.get_summary_stats() or {}),
+            'quota_status': make_serializable(analytics.get_quota_status() or {}),
+            'timeline': make_serializable(analytics.get_response_timeline() or {}),
+            'advanced_analytics': make_serializable(analytics.get_advanced_analytics() or {}),
         }
 
         # Note: JsonResponse uses DjangoJSONEncoder by default, but the manual serialization 
@@ -188,17 +257,117 @@ def api_dashboard_stats(request):
         return JsonResponse({'error': f'Error loading stats: {str(e)}'}, status=500)
 
 
+@staff_member_required_api
+@require_GET
+def api_dashboard_events(request):
+    """Server-Sent Events feed of dashboard changes.
+
+    Sends a ``stats`` event with the current totals on connect, then a small delta
+    (new response count, changed quota cells, new timeline buckets) only when a
+    response is saved. Between changes the stream only sends keep-alive comments.
+    The stream closes after LIVE_STREAM_MAX_SECONDS and the browser reconnects.
+
+    Disabled (404) unless DASHBOARD_LIVE_UPDATES['ENABLED'] is set; the dashboard then
+    polls api_dashboard_stats instead.
+    """
+    if not LIVE_UPDATES_ENABLED:
+        return JsonResponse({'error': 'Live updates are disabled'}, status=404)
+
+    def event_stream():
+        yield f"retry: {LIVE_RETRY_MS}\n\n"
+        sequence = response_notifier.sequence
+        snapshot = None
+        version = None
+        deadline = time.monotonic() + LIVE_STREAM_MAX_SECONDS
+        try:
+            while True:
+                current_version = analytics_cache.get_data_version(force=True)
+                if current_version != version:
+                    version = current_version
+                    current = dashboard_snapshot(analytics_cache.analytics(allow_stale=False))
+                    delta = dashboard_delta(snapshot, current)
+                    snapshot = current
+                    if delta is not None:
+                        yield format_event('stats', make_serializable(delta), event_id=sequence)
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                new_sequence = response_notifier.wait(sequence, timeout=min(LIVE_KEEPALIVE_SECONDS, remaining))
+                if new_sequence == sequence:
+                    yield ": keep-alive\n\n"
+                sequence = new_sequence
+        except Exception as e:
+            logger.error(f"Dashboard event stream error: {e}", exc_info=True)
+            yield format_event('error', {'error': 'Live updates unavailable'})
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    return response
+
+
+@staff_member_required_api
+def api_grid_cross_tabs(request):
+    """API endpoint returning grid answer x role cross-tabs for every JSON grid column.
+
+    An optional ``columns`` query parameter (comma-separated) limits the grid columns.
+    """
+    try:
+        columns = request.GET.get('columns')
+        columns = tuple(sorted(c.strip() for c in columns.split(',') if c.strip())) if columns else None
+
+        analytics = analytics_cache.analytics()
+        return JsonResponse({'cross_tabs': analytics.get_sql_grid_cross_tabs(columns)})
+
+    except Exception as e:
+        logger.error(f"API cross-tabs error: {e}")
+        return JsonResponse({'error': f'Error loading cross-tabs: {str(e)}'}, status=500)
+
+
 @staff_member_required
 def export_data(request):
-    """Export survey data to Excel or SPSS format."""
+    """Export survey data to Excel or SPSS format.
+
+    ``?type=excel&mode=stream`` streams a constant-memory workbook (raw data and
+    summary sheets) instead of building the full analysis workbook in pandas;
+    ``?type=spss&mode=stream`` streams a flattened CSV straight from the database;
+    ``?type=parquet`` / ``?type=arrow`` return a typed columnar file with value labels.
+    """
     export_type = request.GET.get('type', 'excel')
-    if export_type not in {'excel', 'spss'}:
+    if export_type not in {'excel', 'spss', *COLUMNAR_FORMATS}:
         logger.warning(f"Invalid export type: {export_type}")
         messages.error(request, "Invalid export type specified")
         return redirect('admin:index')
 
+    if export_type == 'spss' and request.GET.get('mode') == 'stream':
+        filename = export_filename('spss')
+        response = StreamingHttpResponse(iter_csv_export(bom=True), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    if export_type in COLUMNAR_FORMATS:
+        try:
+            output, filename = stream_columnar_export(export_type)
+            return FileResponse(output, as_attachment=True, filename=filename,
+                                content_type=COLUMNAR_FORMATS[export_type][1])
+        except (DatabaseError, IOError, ImproperlyConfigured) as e:
+            logger.error(f"Columnar export error (type={export_type}): {e}")
+            messages.error(request, f"Failed to export data: {str(e)}")
+            return redirect('admin:index')
+
+    if export_type == 'excel' and request.GET.get('mode') == 'stream':
+        try:
+            # The summary sheets come from the SQL engine, so the DataFrame is never loaded
+            output, filename = stream_excel_export()
+            return FileResponse(output, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+        except (DatabaseError, IOError) as e:
+            logger.error(f"Streaming export error: {e}")
+            messages.error(request, f"Failed to export data: {str(e)}")
+            return redirect('admin:index')
+
     try:
-        analytics = SurveyAnalytics()
+        analytics = analytics_cache.analytics()
         suffix = '.xlsx' if export_type == 'excel' else '.csv'
         content_type = (
             'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
@@ -235,7 +404,7 @@ def export_data(request):
 def export_qualitative_data(request):
     """Export qualitative insights to CSV format."""
     try:
-        analytics = SurveyAnalytics()
+        analytics = analytics_cache.analytics()
         if not analytics.load_data():
             messages.error(request, "Failed to load survey data for export")
             return redirect('survey:admin_dashboard')
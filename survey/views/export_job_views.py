@@ -0,0 +1,61 @@
+# survey/views/export_job_views.py
+import logging
+import os
+
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_GET, require_POST
+
+from survey.models import ExportJob
+from survey.views.analytics_dashboard_views import staff_member_required_api
+
+logger = logging.getLogger(__name__)
+
+
+def export_job_payload(job):
+    """Return the JSON-serializable status of an export job."""
+    ready = job.status == ExportJob.STATUS_COMPLETED and bool(job.file_path) and os.path.exists(job.file_path)
+    return {
+        'id': job.pk,
+        'export_type': job.export_type,
+        'status': job.status,
+        'progress': job.progress,
+        'rows_done': job.rows_done,
+        'rows_total': job.rows_total,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'status_url': reverse('survey:export_job_status', args=[job.pk]),
+        'download_url': reverse('survey:export_job_download', args=[job.pk]) if ready else None,
+    }
+
+
+@require_POST
+@staff_member_required_api
+def create_export_job(request):
+    """Queue an export for the export worker and return its status."""
+    export_type = request.POST.get('type') or request.GET.get('type', 'excel')
+    if export_type not in dict(ExportJob.TYPE_CHOICES):
+        return JsonResponse({'error': f'Invalid export type: {export_type}'}, status=400)
+
+    job = ExportJob.objects.create(export_type=export_type, requested_by=request.user)
+    logger.info(f"Queued export job {job.pk} ({export_type}) for {request.user}")
+    return JsonResponse(export_job_payload(job), status=202)
+
+
+@require_GET
+@staff_member_required_api
+def export_job_status(request, job_id):
+    """Report the progress of an export job."""
+    job = get_object_or_404(ExportJob, pk=job_id)
+    return JsonResponse(export_job_payload(job))
+
+
+@require_GET
+@staff_member_required_api
+def download_export_job(request, job_id):
+    """Send the file built by a completed export job."""
+    job = get_object_or_404(ExportJob, pk=job_id, status=ExportJob.STATUS_COMPLETED)
+    if not job.file_path or not os.path.exists(job.file_path):
+        raise Http404("Export file is no longer available")
+    return FileResponse(open(job.file_path, 'rb'), as_attachment=True, filename=job.filename)
@@ -1,16 +1,33 @@
 from django.shortcuts import render, redirect
 from django.http import JsonResponse
+from django.db import transaction
 from django.utils import timezone
 from survey.utils.progress import get_progress_context
 from survey.utils.session_utils import sanitize_input, validate_session_size
-from survey.models import SurveyResponse
+from survey.utils.respondent import resolve_respondent
+from survey.autosave import AUTOSAVE_VERSION_KEY
+from survey.submission import find_submission, issue_submission_token, submit_survey
+from survey.live_updates import response_notifier
 import logging
-import json
 
 logger = logging.getLogger(__name__)
 
 def final_remarks_view(request):
     """Render the final remarks page (step 6)"""
+    if request.method == 'POST' and request.POST.get('confirm_submit') == 'true' and not request.session.get('survey_started'):
+        # A retried submit arriving after the first one cleared the session
+        survey_response = find_submission(request.POST.get('submission_token'))
+        if survey_response is not None:
+            logger.info(f"Duplicate submission ignored, reference_number={survey_response.reference_number}, session_id={request.session.session_key}")
+            request.session['reference_number'] = survey_response.reference_number
+            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                return JsonResponse({
+                    'status': 'success',
+                    'message': 'Survey submitted successfully',
+                    'redirect_url': '/confirmation/'
+                })
+            return redirect('survey:confirmation')
+
     if not request.session.get('survey_started'):
         logger.warning(f"Redirecting to welcome: missing survey_started, session_id={request.session.session_key}")
         return redirect('survey:welcome')
@@ -25,6 +42,8 @@ def final_remarks_view(request):
         context['error'] = "No professional role specified. Please start the survey again."
         return render(request, 'survey/final_remarks.html', context)
 
+    issue_submission_token(request.session)
+
     if request.method == 'POST':
         # --- START NEW/UPDATED LOGIC ---
         final_remarks = sanitize_input(request.POST.get('final_remarks', '').strip())
@@ -77,22 +96,7 @@ def final_remarks_view(request):
         if confirm_submit:
             errors = []
             respondent_info = request.session.get('respondent_info', {})
-            generic_answers = request.session.get('generic_answers', {})
             role_answers = request.session.get('role_specific_answers', {})
-            cross_system_answers = request.session.get('cross_system_answers', {})
-            email = respondent_info.get('email', '')
-
-            # Define valid SurveyResponse fields
-            valid_fields = {
-                'full_name', 'email', 'mobile', 'province', 'district', 'professional_role',
-                'experience_legal', 'experience_customs', 'practice_areas', 'kii_consent',
-                'g1_policy_impact', 'g2_system_impact', 'g3_technical_issues', 'g4_disruption',
-                'g5_digital_literacy', 'lp1_digital_support', 'lp2_challenges', 'lp3_challenges',
-                'lp4_challenges', 'lp5_tax_types', 'lp5_visible', 'lp6_priority_improvement',
-                'ca1_training', 'ca2_system_integration', 'ca3_challenges', 'ca4_effectiveness',
-                'ca5_policy_impact', 'ca6_biggest_challenge', 'ca6_improvement',
-                'cross_system_answers', 'final_remarks', 'survey_feedback', 'submission_date', 'reference_number' # ADDED: 'survey_feedback'
-            }
 
             # Check required fields (survey_feedback is optional, final_remarks is required)
             required_role_fields = []
@@ -129,86 +133,22 @@ def final_remarks_view(request):
                 return render(request, 'survey/final_remarks.html', context, status=400)
 
             try:
-                # Retrieve or create SurveyResponse
-                survey_response = SurveyResponse.objects.filter(email=email).first()
-                if not survey_response:
-                    # Initializing a new instance with session data
-                    survey_response = SurveyResponse(
-                        full_name=sanitize_input(respondent_info.get('full_name', '')),
-                        email=email,
-                        mobile=sanitize_input(respondent_info.get('mobile', '')),
-                        province=sanitize_input(respondent_info.get('province', '')),
-                        district=sanitize_input(respondent_info.get('district', '')),
-                        professional_role=','.join(professional_roles),
-                        experience_legal=sanitize_input(respondent_info.get('experience_legal', '')),
-                        experience_customs=sanitize_input(respondent_info.get('experience_customs', '')),
-                        practice_areas=','.join(respondent_info.get('practice_areas', [])),
-                        kii_consent=respondent_info.get('kii_consent', ''),
-                        # Initialize fields to prevent DB errors on first save
-                        g1_policy_impact={}, g2_system_impact={}, g3_technical_issues='', g4_disruption=None, g5_digital_literacy='',
-                        lp1_digital_support='', lp2_challenges={}, lp3_challenges={}, lp4_challenges={}, lp5_tax_types={},
-                        lp5_visible=False, lp6_priority_improvement='', ca1_training='', ca2_system_integration='',
-                        ca3_challenges={}, ca4_effectiveness={}, ca5_policy_impact='', ca6_biggest_challenge='',
-                        ca6_improvement='', cross_system_answers={}, final_remarks='', survey_feedback='', submission_date=None # ADDED: survey_feedback
-                    )
-
-                # Update SurveyResponse with session data
-                for field in valid_fields:
-                    if field == 'submission_date' or field == 'reference_number':
-                        continue
-                    
-                    if field == 'final_remarks':
-                        setattr(survey_response, field, final_remarks)
-                        continue
-                        
-                    # --- NEW LOGIC: Handle survey_feedback separately ---
-                    if field == 'survey_feedback':
-                        setattr(survey_response, field, survey_feedback)
-                        continue
-                    # ----------------------------------------------------
-
-                    if field in respondent_info:
-                        value = respondent_info[field]
-                        if field == 'practice_areas' and isinstance(value, list):
-                            value = ','.join(value)
-                        setattr(survey_response, field, value)
-                    elif field in generic_answers:
-                        value = generic_answers[field]
-                        if isinstance(getattr(survey_response, field, None), dict) and isinstance(value, str):
-                            try:
-                                value = json.loads(value)
-                            except json.JSONDecodeError:
-                                logger.warning(f"Invalid JSON for {field}: {value}, resetting to empty dict, session_id={request.session.session_key}")
-                                value = {}
-                        setattr(survey_response, field, value)
-                    elif field in role_answers:
-                        value = role_answers[field]
-                        if isinstance(getattr(survey_response, field, None), dict) and isinstance(value, str):
-                            try:
-                                value = json.loads(value)
-                            except json.JSONDecodeError:
-                                logger.warning(f"Invalid JSON for {field}: {value}, resetting to empty dict, session_id={request.session.session_key}")
-                                value = {}
-                        setattr(survey_response, field, value)
-                    elif field == 'cross_system_answers': 
-                        # Correctly assigns the entire dictionary stored in the session key to the model's JSONField
-                        setattr(survey_response, field, cross_system_answers)
-
-                survey_response.submission_date = timezone.now()
-
-                # Log ignored session fields
-                all_session_fields = {**respondent_info, **generic_answers, **role_answers, **cross_system_answers, 'survey_feedback': survey_feedback} # Added survey_feedback to check
-                ignored_fields = [key for key in all_session_fields if key not in valid_fields and key not in ['final_remarks']]
-                if ignored_fields:
-                    logger.warning(f"Ignored unexpected session fields: {ignored_fields}, session_id={request.session.session_key}")
-
-                survey_response.save()
-                request.session['reference_number'] = survey_response.reference_number
+                if not respondent_info.get('id'):
+                    # Older sessions: find the row by email once and keep its id in the session
+                    resolve_respondent(request)
+                survey_response, written = submit_survey(
+                    request.session, final_remarks, survey_feedback,
+                    token=request.POST.get('submission_token'),
+                )
+                if written:
+                    # Wake live dashboards once the row is visible to other connections
+                    transaction.on_commit(lambda: response_notifier.notify(survey_response.pk))
+                else:
+                    logger.info(f"Duplicate submission ignored, reference_number={survey_response.reference_number}, session_id={request.session.session_key}")
 
                 # Clear session data except reference_number
-                for key in list(request.session.keys()):
-                    if key != 'reference_number':
-                        del request.session[key]
+                request.session.clear()
+                request.session['reference_number'] = survey_response.reference_number
 
                 logger.info(f"Survey submitted successfully, reference_number={survey_response.reference_number}, session_id={request.session.session_key}")
                 if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -238,6 +178,7 @@ def final_remarks_view(request):
     context['final_remarks'] = request.session.get('final_remarks', '')
     context['survey_feedback'] = request.session.get('survey_feedback', '') # NEW: Load survey feedback from session
     context['final_remarks_timestamp'] = request.session.get('final_remarks_timestamp', '')
+    context['autosave_version'] = request.session.get(AUTOSAVE_VERSION_KEY, 0)
     context['professional_role'] = professional_role
     logger.debug(f"Rendering final_remarks, session final_remarks='{context['final_remarks'][:50]}{'...' if len(context['final_remarks']) > 50 else ''}', timestamp={context['final_remarks_timestamp']}, session_id={request.session.session_key}")
     return render(request, 'survey/final_remarks.html', context)
\ No newline at end of file
@@ -1,59 +1,39 @@
 from django.shortcuts import render, redirect
 from survey.utils.progress import get_progress_context
 from survey.utils.session_utils import validate_session_size
-from survey.models import SurveyResponse
+from survey.utils.respondent import resolve_respondent
+from survey.questionnaire import (
+    G1_ASPECTS, G2_ASPECTS, G3_TECHNICAL_ISSUES, G3_VALUES_REQUIRING_G4, G4_DISRUPTION, G5_DIGITAL_LITERACY, MATRIX,
+)
+from types import MappingProxyType
 import logging
 import json
 
 logger = logging.getLogger(__name__)
 
+# Form options and validation sets, built once from the questionnaire schema
+GENERIC_QUESTIONS_CONTEXT = MappingProxyType({
+    'g1_matrix_options': MATRIX.choices,
+    'g2_matrix_options': MATRIX.choices,
+    'g3_options': G3_TECHNICAL_ISSUES.choices,
+    'g4_options': G4_DISRUPTION.choices,
+    'g5_options': G5_DIGITAL_LITERACY.choices,
+    'g1_aspects': G1_ASPECTS.choices,
+    'g2_aspects': G2_ASPECTS.choices,
+    'g3_values_requiring_g4': G3_VALUES_REQUIRING_G4,
+    'valid_options': MappingProxyType({
+        'g1': MATRIX.valid,
+        'g2': MATRIX.valid,
+        'g3_technical_issues': G3_TECHNICAL_ISSUES.valid,
+        'g4_disruption': G4_DISRUPTION.valid,
+        'g5_digital_literacy': G5_DIGITAL_LITERACY.valid,
+    }),
+})
+
+
 def get_generic_questions_context():
-    """Return standardized context for generic questions form options."""
-    matrix_options = [
-        ('very_positive', 'Very Positive'), ('positive', 'Positive'), ('neutral', 'Neutral'),
-        ('negative', 'Negative'), ('very_negative', 'Very Negative'), ('na', 'N/A'), ('dont_know', 'Don’t Know')
-    ]
-    g3_options = [
-        ('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly'),
-        ('rarely', 'Rarely'), ('never', 'Never'), ('dont_know', 'Don’t Know')
-    ]
-    g4_options = [
-        ('very_significantly', 'Very significantly'), ('significantly', 'Significantly'),
-        ('minimally', 'Minimally'), ('not_at_all', 'Not at all')
-    ]
-    g5_options = [
-        ('very_significantly', 'Very significantly'), ('significantly', 'Significantly'), ('neutral', 'Neutral'),
-        ('minimally', 'Minimally'), ('not_at_all', 'Not at all'), ('dont_know', 'Don’t Know')
-    ]
-    g1_aspects = [
-        ('service_delivery', 'Service delivery efficiency'),
-        ('client_numbers', 'Client numbers'),
-        ('revenue_fees', 'Revenue/fees'),
-        ('compliance_burden', 'Compliance burden')
-    ]
-    g2_aspects = [
-        ('workflow_efficiency', 'Workflow efficiency'),
-        ('service_delivery', 'Service delivery'),
-        ('client_numbers', 'Client numbers')
-    ]
-    
-    return {
-        'g1_matrix_options': matrix_options,
-        'g2_matrix_options': matrix_options,
-        'g3_options': g3_options,
-        'g4_options': g4_options,
-        'g5_options': g5_options,
-        'g1_aspects': g1_aspects,
-        'g2_aspects': g2_aspects,
-        'g3_values_requiring_g4': ['daily', 'weekly', 'monthly', 'rarely'],
-        'valid_options': {
-            'g1': [opt[0] for opt in matrix_options],
-            'g2': [opt[0] for opt in matrix_options],
-            'g3_technical_issues': [opt[0] for opt in g3_options],
-            'g4_disruption': [opt[0] for opt in g4_options],
-            'g5_digital_literacy': [opt[0] for opt in g5_options]
-        }
-    }
+    """Return standardized context for generic questions form options (read-only, shared)."""
+    return GENERIC_QUESTIONS_CONTEXT
 
 def validate_matrix_fields(request, aspects, prefix, valid_options, errors, answers):
     """Validate matrix fields (G1 or G2) and populate answers."""
@@ -167,9 +147,8 @@ def generic_questions_view(request):
             request.session.modified = True
 
             # Save to database
-            respondent_id = request.session.get('respondent_info', {}).get('id')
-            if respondent_id:
-                survey_response = SurveyResponse.objects.get(id=respondent_id)
+            survey_response = resolve_respondent(request)
+            if survey_response is not None:
                 survey_response.g1_policy_impact = generic_answers['g1']
                 survey_response.g2_system_impact = generic_answers['g2']
                 survey_response.g3_technical_issues = generic_answers['g3_technical_issues']
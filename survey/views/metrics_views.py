@@ -0,0 +1,40 @@
+# survey/views/metrics_views.py
+import logging
+from datetime import datetime, timezone as dt_timezone
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.shortcuts import render
+from django.views.decorators.http import require_GET, require_http_methods
+
+from survey.metrics import MEASURES, PERCENTILES, REQUEST_METRICS_ENABLED, request_metrics
+from survey.views.analytics_dashboard_views import staff_member_required_api
+
+logger = logging.getLogger(__name__)
+
+
+@require_GET
+@staff_member_required
+def request_metrics_view(request):
+    """Render the per-view latency and query histograms of this worker process."""
+    snapshot = request_metrics.snapshot()
+    context = {
+        'title': 'Request Metrics',
+        'enabled': REQUEST_METRICS_ENABLED,
+        'measures': MEASURES,
+        'percentiles': [f'p{percentile}' for percentile in PERCENTILES],
+        'started_at': datetime.fromtimestamp(snapshot['started_at'], tz=dt_timezone.utc),
+        'sample_size': snapshot['sample_size'],
+        'views': snapshot['views'],
+    }
+    return render(request, 'survey/request_metrics.html', context)
+
+
+@require_http_methods(['GET', 'POST'])
+@staff_member_required_api
+def api_request_metrics(request):
+    """Return the per-view metrics as JSON; POST clears them first."""
+    if request.method == 'POST':
+        request_metrics.reset()
+        logger.info(f"Request metrics reset by {request.user}")
+    return JsonResponse({'enabled': REQUEST_METRICS_ENABLED, **request_metrics.snapshot()})
@@ -2,6 +2,7 @@ from django.shortcuts import render, redirect
 from survey.utils.progress import get_progress_context
 from survey.utils.session_utils import sanitize_input, validate_session_size
 from survey.models import SurveyResponse
+from survey.questionnaire import PROVINCES as PROVINCE_OPTIONS
 import logging
 import json
 import re
@@ -9,15 +10,7 @@ import re
 logger = logging.getLogger(__name__)
 
 # --- Constants (Module Level) ---
-PROVINCES = [
-    ('ajk', 'Azad Jammu and Kashmir'),
-    ('balochistan', 'Balochistan'),
-    ('gb', 'Gilgit-Baltistan'),
-    ('ict', 'ICT'),
-    ('kpk', 'Khyber Pakhtunkhwa'),
-    ('punjab', 'Punjab'),
-    ('sindh', 'Sindh'),
-]
+PROVINCES = PROVINCE_OPTIONS.choices
 
 DISTRICTS = [
     # AJK
@@ -76,7 +69,7 @@ DISTRICTS = [
 EMAIL_REGEX = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
 
 # --- Pre-calculated Maps (Module Level for DRY) ---
-PROVINCE_DISPLAY_MAP = {value: display for value, display in PROVINCES}
+PROVINCE_DISPLAY_MAP = PROVINCE_OPTIONS.labels
 PROVINCE_DISTRICT_MAP = {d[0]: d[1] for d in DISTRICTS}
 
 # --- Respondent Info Views ---
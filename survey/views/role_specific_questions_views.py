@@ -5,110 +5,64 @@ from django.core.exceptions import ValidationError
 from survey.models import SurveyResponse
 from survey.utils.progress import get_progress_context
 from survey.utils.session_utils import sanitize_input, validate_session_size
+from survey.utils.respondent import remember_respondent, resolve_respondent
+from survey.questionnaire import (
+    CA1_TRAINING, CA2_SYSTEM_INTEGRATION, CA3_FUNCTION_ROWS, CA3_LEVELS, CA4_LEVELS, CA4_PROCESS_ROWS, CA5_POLICY_IMPACT,
+    CA6_BIGGEST_CHALLENGE, LP1_DIGITAL_SUPPORT, LP2_FUNCTION_ROWS, LP3_FUNCTION_ROWS, LP4_FUNCTION_ROWS,
+    LP5_CHALLENGE_LEVELS, LP_CHALLENGE_LEVELS,
+)
+from types import MappingProxyType
 import logging
 import json
 
 logger = logging.getLogger(__name__)
 
+# Form options and validation sets per role section, built once from the questionnaire schema
+LEGAL_CONTEXT = MappingProxyType({
+    'lp1_options': LP1_DIGITAL_SUPPORT.choices,
+    'lp2_functions': LP2_FUNCTION_ROWS,
+    'lp3_functions': LP3_FUNCTION_ROWS,
+    'lp4_functions': LP4_FUNCTION_ROWS,
+})
+LEGAL_VALID_OPTIONS = MappingProxyType({
+    'lp1_digital_support': LP1_DIGITAL_SUPPORT.valid,
+    'lp2_challenge_levels': LP_CHALLENGE_LEVELS.valid,
+    'lp3_challenge_levels': LP_CHALLENGE_LEVELS.valid,
+    'lp4_challenge_levels': LP_CHALLENGE_LEVELS.valid,
+})
+CUSTOMS_CONTEXT = MappingProxyType({
+    'ca1_options': CA1_TRAINING.choices,
+    'ca2_options': CA2_SYSTEM_INTEGRATION.choices,
+    'ca3_functions': CA3_FUNCTION_ROWS,
+    'ca4_processes': CA4_PROCESS_ROWS,
+    'ca5_options': CA5_POLICY_IMPACT.choices,
+    'ca6_challenge_options': CA6_BIGGEST_CHALLENGE.choices,
+})
+CUSTOMS_VALID_OPTIONS = MappingProxyType({
+    'ca1_training': CA1_TRAINING.valid,
+    'ca2_system_integration': CA2_SYSTEM_INTEGRATION.valid,
+    'ca3_challenge_levels': CA3_LEVELS.valid,
+    'ca4_effectiveness_levels': CA4_LEVELS.valid,
+    'ca5_policy_impact': CA5_POLICY_IMPACT.valid,
+    'ca6_biggest_challenge': CA6_BIGGEST_CHALLENGE.valid,
+})
+
+
 def get_role_specific_context(professional_role):
-    """Return context for role-specific questions based on professional role"""
-    context = {'valid_options': {}}
-    if professional_role in ['legal', 'both']:
-        context.update({
-            'lp1_options': [
-                ('great_extent', 'To a great extent'),
-                ('considerable_extent', 'To a considerable extent'),
-                ('moderate_extent', 'To a moderate extent'),
-                ('slight_extent', 'To a slight extent'),
-                ('not_at_all', 'Not at all'),
-            ],
-            'lp2_functions': [
-                ('Appeal filings before Commissioner', 'S.127', 'appeals_commissioner'),
-                ('Appellate Tribunal representations', 'S.132', 'appellate_tribunal'),
-                ('High Court/Supreme Court references', '', 'high_court'),
-                ('Audit responses & compliance', 'S.177', 'audit_responses'),
-                ('Show cause notice responses', 'S.122', 'show_cause'),
-            ],
-            'lp3_functions': [
-                ('Return filing & compliance', 'S.114', 'return_filing'),
-                ('Return amendments & rectifications', '', 'amendments'),
-                ('Withholding statements & compliance', '', 'withholding'),
-                ('Risk assessment procedures', 'S.122A', 'risk_assessment'),
-                ('Tax planning advisory services', '', 'tax_planning'),
-            ],
-            'lp4_functions': [
-                ('Alternate Dispute Resolution', 'S.134A', 'adr'),
-                ('Settlement procedures', '', 'settlement'),
-                ('e-Payments & refund processing', '', 'epayments'),
-                ('CPR corrections', '', 'cpr_corrections'),
-                ('FBR correspondence management', '', 'correspondence'),
-            ],
-            'valid_options': {
-                'lp1_digital_support': ['great_extent', 'considerable_extent', 'moderate_extent', 'slight_extent', 'not_at_all'],
-                'lp2_challenge_levels': ['no_challenge', 'minor_challenge', 'moderate_challenge', 'major_challenge', 'dont_perform'],
-                'lp3_challenge_levels': ['no_challenge', 'minor_challenge', 'moderate_challenge', 'major_challenge', 'dont_perform'],
-                'lp4_challenge_levels': ['no_challenge', 'minor_challenge', 'moderate_challenge', 'major_challenge', 'dont_perform'],
-            }
-        })
+    """Return context for role-specific questions based on professional role.
 
+    The option lists are shared and immutable; the returned dict itself is new, so
+    preprocess_grid_data can add the per-request grid rows to it.
+    """
+    context = {}
+    valid_options = {}
+    if professional_role in ['legal', 'both']:
+        context.update(LEGAL_CONTEXT)
+        valid_options.update(LEGAL_VALID_OPTIONS)
     if professional_role in ['customs', 'both']:
-        context.update({
-            'ca1_options': [
-                ('effective_both', 'Yes, effective training on both WeBOC and PSW'),
-                ('needs_improvement', 'Yes, but training needs improvement'),
-                ('no_training', 'No formal training received'),
-                ('not_applicable', 'Not applicable'),
-            ],
-            'ca2_options': [
-                ('very_well', 'Very well integrated'),
-                ('well', 'Well integrated'),
-                ('moderately', 'Moderately integrated'),
-                ('poorly', 'Poorly integrated'),
-                ('not_integrated', 'Not integrated'),
-            ],
-            'ca3_functions': [
-                ('Goods Declaration', 'S.79', 'goods_declaration'),
-                ('Duty Assessment', 'S.81', 'duty_assessment'),
-                ('Cargo Examination', 'S.26', 'cargo_examination'),
-                ('Document Processing', 'S.79(2)', 'document_processing'),
-                ('Transit/Warehousing', 'S.13, S.15', 'transit_warehousing'),
-                ('Record Keeping', 'S.155(6)', 'record_keeping'),
-                ('Audit Compliance', 'S.26A', 'audit_compliance'),
-                ('License Compliance', 'S.155(4)', 'license_compliance'),
-            ],
-            'ca4_processes': [
-                ('Duty assessment', 'duty_assessment'),
-                ('Cargo examination', 'cargo_examination'),
-                ('System reliability', 'system_reliability'),
-                ('Client representation', 'client_representation'),
-            ],
-            'ca5_options': [
-                ('very_positively', 'Very positively'),
-                ('positively', 'Positively'),
-                ('neutral', 'Neutral'),
-                ('negatively', 'Negatively'),
-                ('very_negatively', 'Very negatively'),
-            ],
-            'ca6_challenge_options': [
-                ('system_issues', 'System reliability and performance issues'),
-                ('policy_changes', 'Frequent policy or procedural changes'),
-                ('assessment_unpredictability', 'Unpredictable assessment outcomes'),
-                ('documentation_delays', 'Documentation processing delays'),
-                ('cargo_bottlenecks', 'Cargo examination bottlenecks'),
-                ('compliance_burden', 'Compliance and record-keeping burden'),
-                ('coordination_issues', 'Inter-agency coordination challenges'),
-                ('training_gaps', 'Training and knowledge gaps'),
-            ],
-            'valid_options': {
-                **context['valid_options'],  # Merge with existing valid_options
-                'ca1_training': ['effective_both', 'needs_improvement', 'no_training', 'not_applicable'],
-                'ca2_system_integration': ['very_well', 'well', 'moderately', 'poorly', 'not_integrated'],
-                'ca3_challenge_levels': ['no_challenge', 'minor_challenge', 'moderate_challenge', 'major_challenge', 'not_applicable'],
-                'ca4_effectiveness_levels': ['very_effective', 'effective', 'neutral', 'ineffective', 'very_ineffective'],
-                'ca5_policy_impact': ['very_positively', 'positively', 'neutral', 'negatively', 'very_negatively'],
-                'ca6_biggest_challenge': ['system_issues', 'policy_changes', 'assessment_unpredictability', 'documentation_delays', 'cargo_bottlenecks', 'compliance_burden', 'coordination_issues', 'training_gaps'],
-            }
-        })
+        context.update(CUSTOMS_CONTEXT)
+        valid_options.update(CUSTOMS_VALID_OPTIONS)
+    context['valid_options'] = valid_options
     return context
 
 def preprocess_grid_data(professional_role, role_answers, context_data):
@@ -204,7 +158,7 @@ def role_specific_questions_view(request):
 
         # Retrieve or create SurveyResponse instance
         email = respondent_info.get('email', '')
-        survey_response = SurveyResponse.objects.filter(email=email).first()
+        survey_response = resolve_respondent(request)
         if not survey_response:
             survey_response = SurveyResponse(
                 full_name=respondent_info.get('full_name', ''),
@@ -308,7 +262,7 @@ def role_specific_questions_view(request):
                 all_challenges = {**lp2_challenges, **lp3_challenges, **lp4_challenges}
                 challenging_functions = [
                     func for func, level in all_challenges.items()
-                    if level in ['moderate_challenge', 'major_challenge']
+                    if level in LP5_CHALLENGE_LEVELS
                 ]
                 for function in challenging_functions:
                     income_tax = bool(request.POST.get(f'lp5_{function}_income', ''))
@@ -438,6 +392,7 @@ def role_specific_questions_view(request):
         try:
             logger.debug(f"Before saving session: role_specific_answers={role_answers}")
             survey_response.save()
+            remember_respondent(request, survey_response)
             logger.debug(f"Saved role-specific answers for {email}: lp6={survey_response.lp6_priority_improvement}, ca6_improvement={survey_response.ca6_improvement}")
             request.session['role_specific_answers'] = role_answers
             request.session.modified = True
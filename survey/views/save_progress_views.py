@@ -1,7 +1,10 @@
 # survey/views/save_progress_views.py
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_protect
-from .utils import sanitize_input, validate_session_size
+from survey.autosave import PatchError, StaleVersion, apply_autosave, legacy_ops
+from survey.session_store import session_write_behind
+from survey.utils.session_utils import validate_session_size
+from .utils import sanitize_input
 import json
 import logging
 
@@ -9,28 +12,45 @@ logger = logging.getLogger(__name__)
 
 @csrf_protect
 def save_progress_view(request):
-    """Save survey progress via AJAX"""
-    if request.method == 'POST':
-        try:
-            data = json.loads(request.body)
-            allowed_keys = [
-                'respondent_info', 'generic_answers', 'role_specific_answers',
-                'cross_system_answers'  # Exclude final_remarks to avoid overwrite
-            ]
-            sanitized_data = {}
-            for key, value in data.items():
-                if key in allowed_keys:
-                    if isinstance(value, str):
-                        sanitized_data[key] = sanitize_input(value)
-                    elif isinstance(value, (list, dict)):
-                        sanitized_data[key] = value
-                    else:
-                        sanitized_data[key] = value
+    """Autosave survey progress via AJAX (protocol in survey/autosave.py).
+
+    Accepts versioned JSON-patch-style deltas ({"version": n, "ops": [...]}) and,
+    for older clients, whole sections without a version. Returns 409 with the
+    current version when the delta is stale.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': 'Invalid request method'}, status=405)
+    try:
+        data = json.loads(request.body)
+        if isinstance(data, dict) and 'ops' in data:
+            version, ops = data.get('version'), data['ops']
+        else:
+            version, ops = None, legacy_ops(data)
+        if isinstance(ops, list):
+            for op in ops:
+                if isinstance(op, dict) and isinstance(op.get('value'), str):
+                    op['value'] = sanitize_input(op['value'])
+        if not ops and version is None:
+            return JsonResponse({'status': 'success', 'applied': 0})
+
+        session = request.session
+        if session.session_key is None:
+            session.save()
+        # Reload, check, patch and queue the session while holding it exclusively, so concurrent
+        # deltas from any worker process apply in order and stale ones are rejected
+        exclusive = getattr(session, 'exclusive', None)
+        with exclusive() if exclusive else session_write_behind.session_lock(session.session_key):
+            version, changed = apply_autosave(session, version, ops)
             validate_session_size(request)
-            request.session.update(sanitized_data)
-            logger.info(f"Progress saved: keys={list(sanitized_data.keys())}, session_id={request.session.session_key}")
-            return JsonResponse({'status': 'success'})
-        except Exception as e:
-            logger.error(f"Error in save_progress: {e}, session_id={request.session.session_key}")
-            return JsonResponse({'status': 'error', 'message': f"Failed to save progress: {str(e)}"}, status=400)
-    return JsonResponse({'status': 'error', 'message': 'Invalid request method'}, status=405)
\ No newline at end of file
+            deferred = session.save_deferred() if hasattr(session, 'save_deferred') else False
+        logger.debug(f"Progress autosaved: version={version}, keys={sorted(changed)}, deferred={deferred}, session_id={session.session_key}")
+        return JsonResponse({'status': 'success', 'version': version, 'applied': len(ops), 'deferred': deferred})
+    except StaleVersion as e:
+        logger.info(f"Stale autosave rejected: current version={e.current}, session_id={request.session.session_key}")
+        return JsonResponse({'status': 'conflict', 'message': str(e), 'version': e.current}, status=409)
+    except (ValueError, PatchError) as e:
+        logger.warning(f"Invalid autosave: {e}, session_id={request.session.session_key}")
+        return JsonResponse({'status': 'error', 'message': f"Failed to save progress: {str(e)}"}, status=400)
+    except Exception as e:
+        logger.error(f"Error in save_progress: {e}, session_id={request.session.session_key}")
+        return JsonResponse({'status': 'error', 'message': f"Failed to save progress: {str(e)}"}, status=400)